@@ -0,0 +1,155 @@
+# benchmarks/fixtures.py
+"""
+离线基准测试用的合成输入：
+- 正弦 + 噪声的 16k 单声道 wav（纯 Python 生成，不依赖 numpy）
+- 伪造的多分P下载目录（ffmpeg lavfi 生成带音轨的小视频）
+- 读取本地目录的 FakeDownloader 与只记录笔记的 StubSyncer
+"""
+import array
+import math
+import os
+import random
+import shutil
+import subprocess
+import wave
+from pathlib import Path
+from typing import List
+
+from video2note.config_manager.loader import dict_to_namespace
+from video2note.downloader.base import VideoDownloader
+from video2note.notion.base import Syncer
+from video2note.types.note import Note, NoteSection
+from video2note.types.transcript import Segment, Transcript
+from video2note.types.video import DownloadedVideo
+
+
+def has_ffmpeg() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def make_wav(path: str, seconds: float, sample_rate: int = 16000, freq: float = 440.0,
+             noise: float = 0.05, seed: int = 0) -> str:
+    """生成正弦 + 均匀噪声的 16-bit PCM wav"""
+    rng = random.Random(seed)
+    n = int(seconds * sample_rate)
+    step = 2 * math.pi * freq / sample_rate
+    samples = array.array("h", (
+        int(32767 * max(-1.0, min(1.0, 0.5 * math.sin(i * step) + noise * (rng.random() * 2 - 1))))
+        for i in range(n)
+    ))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(samples.tobytes())
+    return path
+
+
+def make_video(path: str, seconds: float, freq: float = 440.0, size: str = "320x180") -> str:
+    """用 ffmpeg lavfi 生成带正弦音轨的测试视频"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate=25:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency={freq}:sample_rate=44100:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-g", "50",
+        "-c:a", "aac", "-shortest",
+        path,
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+    return path
+
+
+def make_slides_video(path: str, slides: int, seconds_per_slide: float, size: str = "320x180") -> str:
+    """生成幻灯片式测试视频：若干静止画面轮流出现（第 3 页起重复前面的画面），用于关键帧去重"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    sources = ["smptebars", "rgbtestsrc", "color=c=navy", "color=c=white"]
+    cmd = ["ffmpeg", "-y", "-loglevel", "error"]
+    for i in range(slides):
+        src = sources[i % len(sources)]
+        sep = ":" if "=" in src else "="
+        cmd += ["-f", "lavfi", "-i", f"{src}{sep}size={size}:rate=25:duration={seconds_per_slide}"]
+    inputs = "".join(f"[{i}:v]" for i in range(slides))
+    cmd += ["-filter_complex", f"{inputs}concat=n={slides}:v=1:a=0",
+            "-c:v", "libx264", "-preset", "ultrafast", path]
+    subprocess.run(cmd, check=True, capture_output=True)
+    return path
+
+
+def make_download_dir(root: str, parts: int, seconds: float) -> List[str]:
+    """伪造一个多分P下载目录 root/P001.mp4 ... ，返回按分P顺序的视频路径"""
+    return [make_video(os.path.join(root, f"P{i + 1:03d}.mp4"), seconds, freq=220.0 * (i + 1))
+            for i in range(parts)]
+
+
+def make_transcript(segments: int, words_per_segment: int = 12) -> Transcript:
+    rng = random.Random(1)
+    vocab = ["视频", "笔记", "模型", "数据", "转写", "pipeline", "cache", "latency", "音频", "摘要"]
+    segs = []
+    t = 0.0
+    for _ in range(segments):
+        text = " ".join(rng.choice(vocab) for _ in range(words_per_segment))
+        segs.append(Segment(t, t + 2.5, text, 0.9))
+        t += 2.5
+    return Transcript(segs)
+
+
+def make_note(sections: int, paragraph_chars: int = 400) -> Note:
+    body = ("这是一段用于基准测试的笔记内容。" * (paragraph_chars // 16 + 1))[:paragraph_chars]
+    return Note(
+        title="benchmark note",
+        sections=[NoteSection(f"章节 {i + 1}", "\n".join([body] * 3)) for i in range(sections)],
+        frames=[f"frames/frame_{i:04d}.jpg" for i in range(sections // 4)],
+    )
+
+
+class FakeDownloader(VideoDownloader):
+    """把本地目录当作“已下载”的多分P视频返回，不访问网络"""
+
+    def __init__(self, config, video_paths: List[str]):
+        super().__init__(config)
+        self.video_paths = list(video_paths)
+
+    def download(self, url: str, on_part=None) -> DownloadedVideo:
+        if on_part is not None:
+            for idx, path in enumerate(self.video_paths):
+                on_part(idx, path)
+        return DownloadedVideo(
+            video_path=self.video_paths[0] if self.video_paths else None,
+            audio_path="",
+            meta={"all_video_paths": list(self.video_paths)},
+        )
+
+
+class StubSyncer(Syncer):
+    """只记录笔记，不调用 Notion"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.synced: List[str] = []
+
+    def sync(self, note: Note) -> bool:
+        note.to_markdown()
+        self.synced.append(note.title)
+        return True
+
+
+def make_config(workdir: str, streaming: bool = False):
+    """离线 pipeline 配置：mock 转写 + rule 摘要，所有输出写到 workdir"""
+    workdir = str(Path(workdir).resolve())
+    return dict_to_namespace({
+        "app": {"log_level": "WARNING"},
+        "video": {
+            "provider": "bilibili",
+            "url": "bench://offline-video",
+            "download_path": os.path.join(workdir, "downloads"),
+            "source": "benchmark",
+        },
+        "transcriber": {"provider": "mock", "extract_workers": 0},
+        "ai": {"provider": "rule"},
+        "output": {"markdown_path": os.path.join(workdir, "notes")},
+        "notion": {"provider": "notion"},
+        "cache": {"enabled": False},
+        "pipeline": {"streaming": streaming, "queue_size": 2, "sync": True},
+    })
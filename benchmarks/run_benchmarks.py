@@ -0,0 +1,305 @@
+# benchmarks/run_benchmarks.py
+"""
+pipeline 热点路径的离线基准测试（不访问网络、不调用任何付费 API）。
+
+用法（在项目根目录）：
+    python benchmarks/run_benchmarks.py                      # 运行全部，结果写到 benchmarks/results/<commit>.json
+    python benchmarks/run_benchmarks.py -k extract -r 5      # 只跑名字包含 extract 的用例，每个重复 5 次
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json   # 与旧结果对比
+
+缺少 ffmpeg / numpy / notion_client 时，相关用例会标记为 skipped，而不是失败。
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks import fixtures  # noqa: E402
+
+BENCHMARKS = []
+
+
+class Skip(Exception):
+    pass
+
+
+def benchmark(name: str, unit: str = None):
+    """
+    注册基准用例。被装饰的函数接收 workdir，返回 (run, work)：
+      run()  为被计时的函数；
+      work   为每次 run 处理的工作量（按 unit 计，如音频秒数），用于计算吞吐，可为 None。
+    """
+
+    def deco(fn):
+        BENCHMARKS.append((name, unit, fn))
+        return fn
+
+    return deco
+
+
+def require_ffmpeg():
+    if not fixtures.has_ffmpeg():
+        raise Skip("ffmpeg not found")
+
+
+# -------------------------------
+# 音频 / 帧提取
+# -------------------------------
+
+@benchmark("extract_audio", unit="audio_s")
+def bench_extract_audio(workdir):
+    require_ffmpeg()
+    from video2note.transcriber.base import extract_audio
+
+    video = fixtures.make_video(os.path.join(workdir, "src", "single.mp4"), 30)
+    out_dir = os.path.join(workdir, "audio_single")
+    return (lambda: extract_audio(video, out_dir)), 30.0
+
+
+@benchmark("extract_audio_batch", unit="audio_s")
+def bench_extract_audio_batch(workdir):
+    require_ffmpeg()
+    from video2note.transcriber.base import extract_audio_batch
+
+    videos = fixtures.make_download_dir(os.path.join(workdir, "batch_src"), parts=4, seconds=15)
+    out_dir = os.path.join(workdir, "audio_batch")
+    return (lambda: extract_audio_batch(videos, out_dir)), 60.0
+
+
+@benchmark("decode_audio", unit="audio_s")
+def bench_decode_audio(workdir):
+    require_ffmpeg()
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise Skip("numpy not installed")
+    from video2note.transcriber.base import decode_audio
+
+    video = fixtures.make_video(os.path.join(workdir, "src", "decode.mp4"), 30)
+    return (lambda: decode_audio(video)), 30.0
+
+
+@benchmark("extract_key_frames", unit="video_s")
+def bench_extract_key_frames(workdir):
+    require_ffmpeg()
+    from video2note.transcriber.base import extract_key_frames
+
+    video = fixtures.make_video(os.path.join(workdir, "src", "frames.mp4"), 30)
+    out_dir = os.path.join(workdir, "frames")
+
+    def run():
+        shutil.rmtree(out_dir, ignore_errors=True)
+        return extract_key_frames(video, out_dir, interval=5)
+
+    return run, 30.0
+
+
+@benchmark("extract_keyframes_scene", unit="video_s")
+def bench_extract_keyframes_scene(workdir):
+    require_ffmpeg()
+    from video2note.transcriber.keyframes import KeyframeExtractor
+
+    video = fixtures.make_slides_video(os.path.join(workdir, "src", "slides.mp4"), slides=8, seconds_per_slide=5)
+    out_dir = os.path.join(workdir, "keyframes")
+    extractor = KeyframeExtractor(mode="scene")
+    return (lambda: extractor.extract(video, out_dir)), 40.0
+
+
+@benchmark("grab_frames_seek", unit="frames")
+def bench_grab_frames_seek(workdir):
+    require_ffmpeg()
+    from video2note.transcriber.keyframes import KeyframeExtractor
+
+    video = fixtures.make_video(os.path.join(workdir, "src", "frames.mp4"), 30)
+    out_dir = os.path.join(workdir, "grabbed")
+    extractor = KeyframeExtractor(mode="segments", hash_distance=-1)
+    times = [2.5 + 5 * i for i in range(6)]
+    return (lambda: extractor.grab(video, times, out_dir)), float(len(times))
+
+
+# -------------------------------
+# 文本 / 笔记
+# -------------------------------
+
+@benchmark("transcript_join", unit="segments")
+def bench_transcript_join(workdir):
+    transcript = fixtures.make_transcript(20000)
+    # 切片得到不带全文缓存的新视图，每轮都测一次完整解码
+    return (lambda: transcript[:].get_full_text()), 20000
+
+
+@benchmark("transcript_load_slice", unit="segments")
+def bench_transcript_load_slice(workdir):
+    from video2note.types.transcript import Transcript
+
+    path = fixtures.make_transcript(20000).save(os.path.join(workdir, "transcript.trs"))
+
+    def run():
+        transcript = Transcript.load(path)
+        return transcript.slice(1000.0, 2000.0).get_full_text()
+
+    return run, 20000
+
+
+@benchmark("note_to_markdown", unit="sections")
+def bench_note_to_markdown(workdir):
+    note = fixtures.make_note(500)
+    return note.to_markdown, 500
+
+
+@benchmark("markdown_to_notion_blocks", unit="lines")
+def bench_markdown_to_notion_blocks(workdir):
+    try:
+        from video2note.notion.md_parser import markdown_to_notion_blocks
+    except ImportError as e:
+        raise Skip(f"notion parser unavailable: {e}")
+    md = fixtures.make_note(500).to_markdown()
+    return (lambda: markdown_to_notion_blocks(md)), len(md.splitlines())
+
+
+# -------------------------------
+# 端到端 Runner
+# -------------------------------
+
+def _runner_bench(workdir, streaming: bool):
+    require_ffmpeg()
+    from video2note.core.runner import Runner
+    from video2note.summarizer.rule_summarizer import RuleSummarizer
+    from video2note.transcriber.mock_transcriber import MockTranscriber
+
+    videos = fixtures.make_download_dir(os.path.join(workdir, "e2e_src"), parts=3, seconds=10)
+    config = fixtures.make_config(os.path.join(workdir, "e2e_streaming" if streaming else "e2e_serial"),
+                                  streaming=streaming)
+
+    def run():
+        runner = Runner(config,
+                        downloader=fixtures.FakeDownloader(config, videos),
+                        transcriber=MockTranscriber(config),
+                        summarizer=RuleSummarizer(config),
+                        syncer=fixtures.StubSyncer(config))
+        ctx = runner.run_full()
+        assert len(ctx["notes"]) == len(videos)
+
+    return run, 30.0
+
+
+@benchmark("runner_end_to_end", unit="audio_s")
+def bench_runner_serial(workdir):
+    return _runner_bench(workdir, streaming=False)
+
+
+@benchmark("runner_end_to_end_streaming", unit="audio_s")
+def bench_runner_streaming(workdir):
+    return _runner_bench(workdir, streaming=True)
+
+
+# -------------------------------
+# 执行与对比
+# -------------------------------
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_all(pattern: str = None, repeat: int = 3, warmup: int = 1) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="v2n-bench-") as tmp:
+        for name, unit, setup in BENCHMARKS:
+            if pattern and pattern not in name:
+                continue
+            workdir = os.path.join(tmp, name)
+            os.makedirs(workdir, exist_ok=True)
+            try:
+                fn, work = setup(workdir)
+            except Skip as e:
+                results[name] = {"skipped": str(e)}
+                print(f"{name:<30} skipped ({e})")
+                continue
+            for _ in range(warmup):
+                fn()
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - start)
+            median = statistics.median(times)
+            entry = {"median_s": median, "min_s": min(times), "max_s": max(times), "runs": repeat}
+            if work:
+                entry["throughput"] = work / median if median > 0 else None
+                entry["unit"] = f"{unit}/s"
+            results[name] = entry
+            tp = f"{entry['throughput']:>12.1f} {entry['unit']}" if work else ""
+            print(f"{name:<30} median {median * 1000:>10.2f} ms  min {min(times) * 1000:>10.2f} ms  {tp}")
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """打印对比表；任一用例的 median 变慢超过 threshold 时返回 True"""
+    regressed = False
+    print(f"\n{'benchmark':<30}{'baseline_ms':>14}{'current_ms':>14}{'change':>10}")
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "median_s" not in base or "median_s" not in cur:
+            continue
+        change = cur["median_s"] / base["median_s"] - 1 if base["median_s"] > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{name:<30}{base['median_s'] * 1000:>14.2f}{cur['median_s'] * 1000:>14.2f}{change * 100:>9.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="video2note offline benchmarks")
+    parser.add_argument("-k", dest="pattern", default=None, help="只运行名字包含该子串的用例")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("-o", "--output", default=None,
+                        help="结果 JSON 路径，默认 benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", default=None, help="与之对比的旧结果 JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="判定为性能回退的 median 变慢比例")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": run_all(args.pattern, args.repeat, args.warmup),
+    }
+
+    output = Path(args.output) if args.output else PROJECT_ROOT / "benchmarks" / "results" / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,19 +8,35 @@ import sys
 from video2note.config_manager.loader import load_config
 from video2note.core.runner import Runner
 from video2note.utils.logger import setup_logging
+from video2note.utils.tracing import Tracer, set_tracer
 
 
 def main():
     parser = argparse.ArgumentParser(prog="video2note")
     parser.add_argument("--config", "-c", type=str, help="path to config yaml", default="config/base_config.yaml")
     parser.add_argument("--mode", type=str,
-                        choices=["full", "download-only", "transcribe-only", "summarize-only", "sync-only"],
+                        choices=["full", "download-only", "transcribe-only", "summarize-only", "sync-only", "batch",
+                                 "watch"],
                         default="full")
+    parser.add_argument("--input", "-i", type=str, default="-",
+                        help="batch 模式下的 URL 列表文件，每行一个；'-' 表示从 stdin 读取；"
+                             "watch 模式下为监视目录（默认取 watch.path）")
+    parser.add_argument("--once", action="store_true",
+                        help="watch 模式下只处理目录中当前已有的文件，然后退出")
+    parser.add_argument("--trace", type=str, default=None,
+                        help="输出 Chrome trace-event JSON 到该路径（可用 Perfetto 打开），并打印阶段耗时汇总表")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="配合 --trace 使用，开启 tracemalloc 记录 Python 堆分配峰值（有额外开销）")
     args = parser.parse_args()
 
     config = load_config(args.config)
     setup_logging(config.app.log_level)
 
+    tracer = None
+    if args.trace:
+        tracer = Tracer(trace_memory=args.trace_memory)
+        set_tracer(tracer)
+
     runner = Runner(config)
     try:
         if args.mode == "download-only":
@@ -31,12 +47,27 @@ def main():
             runner.run_summarize_only()
         elif args.mode == "sync-only":
             runner.run_sync_only()
+        elif args.mode == "batch":
+            report = runner.run_batch(args.input)
+            print(report.summary())
+            if report.failed:
+                sys.exit(1)
+        elif args.mode == "watch":
+            report = runner.run_watch(None if args.input == "-" else args.input, once=args.once)
+            if report is not None:
+                print(report.summary())
+                if report.failed:
+                    sys.exit(1)
         else:
             runner.run_full()
     except Exception as e:
         # 你可以引入 traceback / logger 打印更详细错误
         print(f"[Error] {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if tracer is not None:
+            print(tracer.export(args.trace))
+            print(f"[trace] written to {args.trace}")
 
 
 if __name__ == "__main__":
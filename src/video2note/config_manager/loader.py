@@ -52,3 +52,21 @@ def load_config(config_path: str = None):
 
     # validate_config(cfg)
     return dict_to_namespace(cfg)
+
+
+def get_config_value(config, path: str, default=None):
+    """
+    按点号路径读取嵌套配置，例如 get_config_value(config, "pipeline.queue_size", 2)。
+    config 可以是 SimpleNamespace 或 dict，任一层级缺失时返回 default。
+    """
+    node = config
+    for key in path.split("."):
+        if isinstance(node, dict):
+            if key not in node:
+                return default
+            node = node[key]
+        else:
+            if not hasattr(node, key):
+                return default
+            node = getattr(node, key)
+    return default if node is None else node
@@ -0,0 +1,291 @@
+# src/video2note/core/batch.py
+"""
+批量模式：在一个进程内处理一组 URL。
+- downloader / transcriber / summarizer / syncer 只创建一次，在所有视频之间共享
+- 所有视频的分P由同一个全局线程池调度（batch.max_concurrency）
+- 每个 provider 可单独限流（batch.provider_limits，例如 {qwen: 2, notion: 1}）
+- 结束时输出吞吐统计：videos/hour 与 audio-minutes/hour
+"""
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from video2note.config_manager.loader import get_config_value
+from video2note.core.manifest import video_key_from_url
+from video2note.core.pipeline import DownloadStage, TranscribeStage, SummarizeStage, SyncStage
+from video2note.core.storage import StorageManager
+from video2note.core.streaming import PartResult
+from video2note.transcriber.base import get_audio_duration
+from video2note.transcriber.model_registry import warm_up_from_config
+from video2note.utils.tracing import get_tracer
+
+
+def read_urls(source: str) -> List[str]:
+    """
+    从文件读取 URL 列表，source 为 "-" 时读取 stdin。
+    空行与 # 开头的注释行会被忽略，重复 URL 只保留第一次出现。
+    """
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    urls: List[str] = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#") and line not in urls:
+            urls.append(line)
+    return urls
+
+
+class ProviderLimiter:
+    """按 provider 名称限制并发；未配置的 provider 只受全局并发限制"""
+
+    def __init__(self, limits: Optional[dict] = None):
+        self._sems: Dict[str, threading.BoundedSemaphore] = {}
+        for name, n in (limits or {}).items():
+            if n and int(n) > 0:
+                self._sems[str(name).lower()] = threading.BoundedSemaphore(int(n))
+
+    @contextmanager
+    def slot(self, provider: Optional[str]):
+        sem = self._sems.get(str(provider).lower()) if provider else None
+        if sem is None:
+            yield
+            return
+        with sem:
+            yield
+
+
+class VideoJob:
+    def __init__(self, url: str):
+        self.url = url
+        self.video = None
+        self.parts: List[PartResult] = []
+        self.error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and all(p.error is None for p in self.parts)
+
+    @property
+    def audio_seconds(self) -> float:
+        return sum(p.audio_seconds for p in self.parts)
+
+
+class BatchReport:
+    def __init__(self, jobs: List[VideoJob], elapsed: float):
+        self.jobs = jobs
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self) -> List[VideoJob]:
+        return [j for j in self.jobs if j.ok]
+
+    @property
+    def failed(self) -> List[VideoJob]:
+        return [j for j in self.jobs if not j.ok]
+
+    @property
+    def audio_minutes(self) -> float:
+        return sum(j.audio_seconds for j in self.jobs) / 60.0
+
+    @property
+    def bytes_written(self) -> int:
+        return sum(p.bytes_written for j in self.jobs for p in j.parts)
+
+    @property
+    def bytes_uploaded(self) -> int:
+        return sum(p.bytes_uploaded for j in self.jobs for p in j.parts)
+
+    @property
+    def videos_per_hour(self) -> float:
+        return len(self.succeeded) / (self.elapsed / 3600.0) if self.elapsed > 0 else 0.0
+
+    @property
+    def audio_minutes_per_hour(self) -> float:
+        return self.audio_minutes / (self.elapsed / 3600.0) if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            "========== video2note batch summary ==========",
+            f"videos        : {len(self.succeeded)} ok / {len(self.failed)} failed / {len(self.jobs)} total",
+            f"parts         : {sum(len(j.parts) for j in self.jobs)}",
+            f"audio         : {self.audio_minutes:.1f} min",
+            f"audio bytes   : written {self.bytes_written / 1024 / 1024:.1f} MB / "
+            f"uploaded {self.bytes_uploaded / 1024 / 1024:.1f} MB",
+            f"elapsed       : {self.elapsed:.1f} s",
+            f"throughput    : {self.videos_per_hour:.2f} videos/hour, "
+            f"{self.audio_minutes_per_hour:.1f} audio-minutes/hour",
+        ]
+        for job in self.failed:
+            reasons = [f"download: {job.error}"] if job.error is not None else []
+            reasons += [f"P{p.index + 1}@{p.failed_stage}: {p.error}" for p in job.parts if p.error is not None]
+            done = sum(1 for p in job.parts if p.error is None)
+            if job.error is not None and done:
+                reasons.append(f"{done} part(s) completed")
+            lines.append(f"FAILED {job.url}: {'; '.join(reasons)}")
+        return "\n".join(lines)
+
+
+class BatchRunner:
+    """
+    配置（均可选）：
+        batch.max_concurrency        全局同时处理的分P数，默认 4
+        batch.download_concurrency   同时下载的视频数，默认 2
+        batch.provider_limits        {provider: 并发上限}，provider 取自 video.provider /
+                                     transcriber.provider / ai.provider / notion.provider
+        pipeline.sync                是否执行同步阶段，默认 True
+        storage.max_size_mb          下载目录配额，每个视频的所有分P处理完后按 LRU 淘汰旧产物（见 core/storage.py）
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.limiter = ProviderLimiter(self._as_dict(get_config_value(config, "batch.provider_limits", {})))
+        self.max_concurrency = int(get_config_value(config, "batch.max_concurrency", 4))
+        self.download_concurrency = int(get_config_value(config, "batch.download_concurrency", 2))
+
+        # 共享的阶段实例：各自内部只会创建一次 downloader / transcriber / summarizer / syncer
+        self.download_stage = DownloadStage(config)
+        self.transcribe_stage = TranscribeStage(config)
+        self.summarize_stage = SummarizeStage(config)
+        self.sync_stage = SyncStage(config) if get_config_value(config, "pipeline.sync", True) else None
+
+        self.video_provider = get_config_value(config, "video.provider")
+        self.transcriber_provider = get_config_value(config, "transcriber.provider",
+                                                     get_config_value(config, "ai.provider"))
+        self.summarizer_provider = get_config_value(config, "ai.provider",
+                                                    get_config_value(config, "summarizer.provider"))
+        self.sync_provider = get_config_value(config, "notion.provider", "notion")
+        self.storage = StorageManager.from_config(config)
+
+    @staticmethod
+    def _as_dict(obj) -> dict:
+        return obj if isinstance(obj, dict) else dict(vars(obj))
+
+    def run(self, urls: List[str]) -> BatchReport:
+        jobs = [VideoJob(u) for u in urls]
+        warm_up_from_config(self.config)
+        # 提前创建共享实例，避免多个工作线程并发懒加载时重复创建
+        self.download_stage.get_downloader()
+        self.transcribe_stage.get_transcriber()
+        self.summarize_stage.get_summarizer()
+        if self.sync_stage is not None:
+            self.sync_stage.get_syncer()
+        logging.info(f"[BatchRunner] 共 {len(jobs)} 个视频，全局并发 {self.max_concurrency}")
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="v2n-part") as part_pool, \
+                ThreadPoolExecutor(self.download_concurrency, thread_name_prefix="v2n-download") as dl_pool:
+            dl_futures = [dl_pool.submit(self._download, job, part_pool) for job in jobs]
+            part_futures = []
+            for job, fut in zip(jobs, dl_futures):
+                # 下载中途失败时 futures 仍包含已提交的分P，等它们结束后才解除 pin
+                futures = fut.result()
+                self._release_when_done(job, futures)
+                part_futures.extend(futures)
+            wait(part_futures)
+
+        report = BatchReport(jobs, time.monotonic() - start)
+        logging.info(f"[BatchRunner] 完成：{len(report.succeeded)}/{len(jobs)} 个视频成功")
+        return report
+
+    def _release_when_done(self, job: VideoJob, futures: list):
+        """视频的所有分P都处理完（或下载失败）后解除 pin，并按配额淘汰其他视频的旧产物"""
+        if self.storage is None:
+            return
+        key = video_key_from_url(job.url)
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def _done(_fut=None):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] <= 0
+            if last:
+                self.storage.release(key)
+
+        if not futures:
+            _done()
+        for f in futures:
+            f.add_done_callback(_done)
+
+    def _download(self, job: VideoJob, part_pool: ThreadPoolExecutor) -> list:
+        # 每个视频用独立的 ctx，但共享同一个 downloader 实例；
+        # 分P一下载完就提交到全局分P线程池，不等整个合集下载结束。
+        # 下载失败记在 job.error 上，不抛出：返回已提交分P的 futures，这些分P照常处理完并计入报告
+        ctx = {}
+        parts: Dict[int, PartResult] = {}
+        futures = []
+        lock = threading.Lock()
+
+        def on_part(idx: int, path: str):
+            part = PartResult(idx, path)
+            with lock:
+                parts[idx] = part
+                futures.append(part_pool.submit(self._process_part, job, part))
+
+        stage = DownloadStage(self.config, url=job.url, downloader=self.download_stage.get_downloader(),
+                              on_part=on_part)
+        if self.storage is not None:
+            # 由 _release_when_done 在所有分P结束后解除
+            self.storage.pin(video_key_from_url(job.url))
+        try:
+            with self.limiter.slot(self.video_provider), get_tracer().span("DownloadStage", url=job.url):
+                stage.run(ctx)
+            job.video = ctx["video"]
+            # 不支持 on_part 回调的 downloader：下载完成后补交其余分P
+            for idx, path in enumerate(job.video.part_paths()):
+                if idx not in parts:
+                    on_part(idx, path)
+        except Exception as e:
+            job.error = e
+            logging.error(f"[BatchRunner] 下载失败 {job.url}: {e}"
+                          + (f"（已提交的 {len(futures)} 个分P继续处理）" if futures else ""))
+        finally:
+            job.parts = [parts[i] for i in sorted(parts)]
+        return futures
+
+    def _process_part(self, job: VideoJob, part: PartResult):
+        step = "extract"
+        try:
+            part.transcript = self.transcribe_stage.subtitle_transcript(part.video_path)
+            if part.transcript is not None:
+                # 字幕快速路径：时长取最后一条字幕的结束时间
+                segments = part.transcript.segments
+                part.audio_seconds = segments[-1].end if segments else 0.0
+            else:
+                part.audio_path = self.transcribe_stage.prepare_audio(part.video_path, video_key_from_url(job.url))
+                part.keyframes = self.transcribe_stage.pop_keyframes(part.video_path)
+                part.audio_seconds = get_audio_duration(part.audio_path)
+
+                step = "transcribe"
+                with self.limiter.slot(self.transcriber_provider):
+                    part.transcript = self.transcribe_stage.transcribe_part(part.audio_path)
+                stats = self.transcribe_stage.bytes_for(part.audio_path)
+                part.bytes_written, part.bytes_uploaded = stats["written"], stats["uploaded"]
+
+            step = "summarize"
+            with self.limiter.slot(self.summarizer_provider):
+                result = self.summarize_stage.summarize_part(part.index, part.transcript, part.video_path,
+                                                             part.keyframes)
+            part.note = result["note"]
+            part.md_path = result["md_path"]
+
+            if self.sync_stage is not None:
+                step = "sync"
+                with self.limiter.slot(self.sync_provider):
+                    part.sync_success = self.sync_stage.sync_part(part.note)
+        except Exception as e:
+            part.error = e
+            part.failed_stage = step
+            logging.error(f"[BatchRunner] {job.url} P{part.index + 1} {step} 失败: {e}")
+        finally:
+            if self.storage is not None:
+                key = video_key_from_url(job.url)
+                self.storage.track(key, [part.video_path], "download")
+                self.storage.track(key, [getattr(part.audio_path, "wav_path", part.audio_path)], "intermediate")
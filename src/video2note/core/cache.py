@@ -0,0 +1,149 @@
+# src/video2note/core/cache.py
+"""
+内容寻址的阶段缓存：
+- key = hash(输入内容) + provider / 模型 / prompt 等设置，输入或设置任一变化都会换成新 key
+- 条目以 JSON 文件存放在本地目录，按总大小做 LRU 淘汰（以文件 mtime 作为最近访问时间）
+用于 TranscribeStage / SummarizeStage：重跑同一个视频时，已完成的分P直接命中缓存，不会重复调用付费 API。
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from video2note.config_manager.loader import get_config_value
+from video2note.utils.file_utils import resolve_project_path
+
+# 参与签名时忽略的敏感字段
+_SECRET_MARKERS = ("key", "token", "secret", "password")
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_bytes(data) -> str:
+    """data 可以是 bytes / memoryview / 支持缓冲区协议的数组（如 numpy.ndarray）"""
+    return hashlib.sha256(memoryview(data).cast("B")).hexdigest()
+
+
+def make_key(*parts) -> str:
+    """把任意可 JSON 序列化的部件组合成稳定的 sha256 key"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def settings_signature(obj) -> dict:
+    """
+    提取对象上影响输出的简单设置（模型名、温度、prompt 等），忽略密钥类字段。
+    Transcriber / Summarizer 的 cache_signature 默认基于它实现。
+    """
+    sig = {"class": type(obj).__name__}
+    for name, value in sorted(vars(obj).items()):
+        if name.startswith("_") or any(m in name.lower() for m in _SECRET_MARKERS):
+            continue
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            sig[name] = value
+    return sig
+
+
+class StageCache:
+    """
+    目录结构：{root}/{namespace}/{key[:2]}/{key}.json
+    """
+
+    def __init__(self, root, max_bytes: int = 512 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._total = sum(size for _, size, _ in self._scan())
+
+    @classmethod
+    def from_config(cls, config) -> Optional["StageCache"]:
+        """根据 config.cache 创建缓存；未启用时返回 None"""
+        if not get_config_value(config, "cache.enabled", False):
+            return None
+        root = resolve_project_path(get_config_value(config, "cache.path", "downloads/.cache"))
+        max_mb = float(get_config_value(config, "cache.max_size_mb", 512))
+        return cls(root, int(max_mb * 1024 * 1024))
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / key[:2] / f"{key}.json"
+
+    def _scan(self):
+        """返回 [(path, size, mtime)]"""
+        entries = []
+        for dirpath, _, files in os.walk(self.root):
+            for f in files:
+                if not f.endswith(".json"):
+                    continue
+                p = os.path.join(dirpath, f)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((p, st.st_size, st.st_mtime))
+        return entries
+
+    def get(self, namespace: str, key: str) -> Optional[dict]:
+        path = self._path(namespace, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"[StageCache] 缓存条目损坏，忽略: {path} ({e})")
+            return None
+        # 命中即刷新 mtime，作为 LRU 的访问时间
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        logging.info(f"[StageCache] 命中 {namespace}/{key[:12]}")
+        return value
+
+    def put(self, namespace: str, key: str, value: dict):
+        path = self._path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        # 先写临时文件再原子替换，避免崩溃时留下半截条目
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._total += len(data) - old_size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        # 淘汰到上限的 90%，避免每次写入都触发全量扫描
+        target = int(self.max_bytes * 0.9)
+        for p, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(p)
+                total -= size
+            except OSError:
+                continue
+        logging.info(f"[StageCache] LRU 淘汰后占用 {total / 1024 / 1024:.1f} MB")
+        self._total = total
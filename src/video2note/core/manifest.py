@@ -0,0 +1,184 @@
+# src/video2note/core/manifest.py
+"""
+按视频持久化的运行清单（run manifest），位于 {download_path}/{video_key}/run_manifest.json：
+- download:    DownloadedVideo（各分P视频路径等）
+- transcripts: 每个分P的源视频、音频路径、转写结果文件（transcripts/<stem>.trs，列式二进制，加载时 mmap）
+- notes:       每个分P的 markdown 路径与 Note 序列化文件（notes/<stem>.json）
+- sync:        最近一次同步结果
+
+各阶段完成后由 Runner 写入；transcribe-only / summarize-only / sync-only 模式启动时
+只按需加载下游阶段所需的那一部分，从而可以例如换一个 prompt 只重跑摘要。
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from video2note.config_manager.loader import get_config_value
+from video2note.types.note import Note
+from video2note.types.transcript import Transcript
+from video2note.types.video import DownloadedVideo
+from video2note.utils.file_utils import resolve_project_path
+
+_BVID_RE = re.compile(r"(BV[0-9A-Za-z]{10})")
+_AID_RE = re.compile(r"\bav(\d+)", re.IGNORECASE)
+
+
+def video_key_from_url(url: str) -> str:
+    """
+    由 URL 推导视频目录名：B 站取 bvid（与 BilibiliDownloader 的下载目录一致），
+    av 号取 av<id>，其他来源取 URL 的 sha1 前 16 位。
+    """
+    m = _BVID_RE.search(url or "")
+    if m:
+        return m.group(1)
+    m = _AID_RE.search(url or "")
+    if m:
+        return f"av{m.group(1)}"
+    return hashlib.sha1((url or "").encode("utf-8")).hexdigest()[:16]
+
+
+class RunManifest:
+    FILENAME = "run_manifest.json"
+    VERSION = 1
+
+    def __init__(self, path, url: str = ""):
+        self.path = Path(path)
+        self.dir = self.path.parent
+        self.data = {"version": self.VERSION, "url": url}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"[RunManifest] 清单损坏，忽略: {self.path} ({e})")
+
+    @classmethod
+    def for_url(cls, config, url: Optional[str] = None) -> "RunManifest":
+        url = url or get_config_value(config, "video.url", "")
+        root = resolve_project_path(get_config_value(config, "video.download_path", "downloads"))
+        return cls(root / video_key_from_url(url) / cls.FILENAME, url)
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.data["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp, self.path)
+
+    def _write_json(self, sub: str, name: str, obj: dict) -> str:
+        out = self.dir / sub / f"{name}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False)
+        return str(out)
+
+    def _write_transcript(self, name: str, transcript: Transcript) -> str:
+        out = self.dir / "transcripts" / f"{name}.trs"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        return transcript.save(out)
+
+    @staticmethod
+    def _read_json(path: str) -> dict:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # ---------- 写入 ----------
+
+    def record_download(self, video: DownloadedVideo):
+        self.data["download"] = {
+            "video_path": video.video_path,
+            "audio_path": video.audio_path,
+            "frame_paths": video.frame_paths,
+            "duration": video.duration,
+            "meta": video.meta,
+        }
+
+    def record_transcripts(self, sources: List[str], transcripts: List[Transcript],
+                           audio_paths: Optional[List[Optional[str]]] = None):
+        entries = []
+        for idx, (src, transcript) in enumerate(zip(sources, transcripts)):
+            name = Path(src).stem if src else f"part_{idx + 1}"
+            entries.append({
+                "source": src,
+                "audio_path": audio_paths[idx] if audio_paths and idx < len(audio_paths) else None,
+                "path": self._write_transcript(name, transcript),
+            })
+        self.data["transcripts"] = entries
+
+    def record_notes(self, notes: List[dict]):
+        entries = []
+        for item in notes:
+            note: Note = item["note"]
+            name = Path(item["md_path"]).stem if item.get("md_path") else note.title
+            entries.append({
+                "md_path": item.get("md_path"),
+                "path": self._write_json("notes", name, note.to_dict()),
+            })
+        self.data["notes"] = entries
+
+    def update_from_ctx(self, ctx: dict):
+        """把 ctx 中已有的阶段产物写入清单并保存"""
+        if ctx.get("video") is not None:
+            self.record_download(ctx["video"])
+        if ctx.get("transcripts"):
+            sources = ctx.get("transcript_sources") or []
+            if not sources and ctx.get("video") is not None:
+                sources = ctx["video"].part_paths()
+            self.record_transcripts(sources, ctx["transcripts"], ctx.get("audio_paths"))
+        if ctx.get("notes"):
+            self.record_notes(ctx["notes"])
+        if "sync_success" in ctx:
+            self.data["sync"] = {"success": ctx["sync_success"], "at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        self.save()
+
+    # ---------- 读取（按需） ----------
+
+    def load_video(self) -> Optional[DownloadedVideo]:
+        d = self.data.get("download")
+        if not d:
+            return None
+        return DownloadedVideo(d.get("video_path"), d.get("audio_path"), d.get("frame_paths"),
+                               d.get("duration"), d.get("meta"))
+
+    def load_transcripts(self) -> List[Transcript]:
+        # 新清单为 mmap 映射的二进制转写（.trs），兼容旧清单的 JSON
+        return [Transcript.from_dict(self._read_json(e["path"])) if e["path"].endswith(".json")
+                else Transcript.load(e["path"]) for e in self.data.get("transcripts", [])]
+
+    def load_notes(self) -> List[dict]:
+        return [{"note": Note.from_dict(self._read_json(e["path"])), "md_path": e.get("md_path")}
+                for e in self.data.get("notes", [])]
+
+    def restore(self, ctx: dict, keys: Iterable[str]):
+        """
+        只加载 keys 指定的部分到 ctx：video / transcripts / notes。
+        ctx 中已有的键不会被覆盖。
+        """
+        if not self.exists:
+            logging.warning(f"[RunManifest] 未找到运行清单 {self.path}，需先运行上游阶段")
+            return ctx
+        for key in keys:
+            if key in ctx:
+                continue
+            if key == "video":
+                video = self.load_video()
+                if video is not None:
+                    ctx["video"] = video
+            elif key == "transcripts" and self.data.get("transcripts"):
+                ctx["transcripts"] = self.load_transcripts()
+                ctx["transcript_sources"] = [e.get("source") for e in self.data["transcripts"]]
+                ctx["audio_paths"] = [e.get("audio_path") for e in self.data["transcripts"]]
+            elif key == "notes" and self.data.get("notes"):
+                ctx["notes"] = self.load_notes()
+        logging.info(f"[RunManifest] 从 {self.path} 恢复: {[k for k in keys if k in ctx]}")
+        return ctx
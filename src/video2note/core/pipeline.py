@@ -1,83 +1,519 @@
 # src/video2note/core/pipeline.py
+import asyncio
 import logging
+import os
 from pathlib import Path
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, List, Dict, Tuple, Union
 
-from video2note.summarizer.base import SummarizerFactory
+from video2note.config_manager.loader import get_config_value
+from video2note.core.cache import StageCache, hash_bytes, hash_file, hash_text, make_key
+from video2note.core.exceptions import TranscriptionError
+from video2note.core.manifest import video_key_from_url
+from video2note.summarizer.base import SummarizerFactory, Summarizer
 from video2note.transcriber.base import TranscriberFactory, Transcriber
-from video2note.transcriber.base import extract_audio
+from video2note.transcriber.base import extract_audio, extract_audio_batch, decode_audio, write_wav, PCMAudio
+from video2note.transcriber.base import audio_codec_args, write_audio, extract_audio_and_frames
+from video2note.transcriber.keyframes import KeyFrame, KeyframeExtractor, extract_keyframes, link_segments
+from video2note.transcriber.subtitles import load_subtitles
+from video2note.transcriber.vad import TimeMap, VoiceActivityDetector
 from video2note.types.note import Note
 from video2note.types.transcript import Transcript
 from video2note.types.video import DownloadedVideo
+from video2note.utils.aio import run_in_thread
+from video2note.utils.http import aclose_async_client
+from video2note.utils.tracing import get_tracer
+
+# 可直接送入转写、无需抽音的文件后缀
+AUDIO_SUFFIXES = (".wav", ".mp3", ".m4a", ".flac")
+
+# transcriber.subtitle_policy 的取值
+SUBTITLE_POLICIES = ("prefer_subtitles", "asr_only", "subtitles_only")
+
+
+def keyframes_dir(config, video_path: str) -> Path:
+    """分P关键帧截图目录：{output.markdown_path}/frames/{分P名}/（笔记中的图片引用指向这里）"""
+    project_root = Path(__file__).resolve().parents[2]
+    md_output = Path(getattr(config.output, "markdown_path", "notes"))
+    if not md_output.is_absolute():
+        md_output = (project_root / md_output).resolve()
+    return md_output / "frames" / Path(video_path).stem
 
 
 class Stage:
     def __init__(self, config):
         self.config = config
+        self._cache: Optional[StageCache] = None
+        self._cache_loaded = False
+
+    @property
+    def cache(self) -> Optional[StageCache]:
+        """按 config.cache 懒加载的阶段缓存，未启用时为 None"""
+        if not self._cache_loaded:
+            self._cache = StageCache.from_config(self.config)
+            self._cache_loaded = True
+        return self._cache
 
     def run(self, ctx: dict):
         raise NotImplementedError
 
 
 class DownloadStage(Stage):
+    def __init__(self, config, url: Optional[str] = None, downloader=None,
+                 on_part: Optional[Callable[[int, str], None]] = None):
+        super().__init__(config)
+        # url / downloader 可由调用方指定（批量模式下共享同一个 downloader）
+        self.url = url
+        self._downloader = downloader
+        # 每个分P就绪时的回调（流式 / 批量模式用它在整个合集下载完之前开始处理）
+        self.on_part = on_part
+
+    def get_downloader(self):
+        if self._downloader is None:
+            from video2note.downloader.base import DownloaderFactory
+            video_provider = self.config.video.provider
+            self._downloader = DownloaderFactory.create(video_provider, self.config)
+        return self._downloader
+
     def run(self, ctx: dict):
-        from video2note.downloader.base import DownloaderFactory
-        video_provider = self.config.video.provider
-        downloader = DownloaderFactory.create(video_provider, self.config)
-        url = self.config.video.url
-        video_obj = downloader.download(url)
+        downloader = self.get_downloader()
+        url = self.url or self.config.video.url
+        with get_tracer().external(f"{type(downloader).__name__}.download", url=url):
+            if self.on_part is not None:
+                video_obj = downloader.download(url, on_part=self.on_part)
+            else:
+                video_obj = downloader.download(url)
         ctx["video"] = video_obj
 
 
 class TranscribeStage(Stage):
     """
     TranscribeStage 支持两种使用模式：
-    1) pipeline 模式：ctx 中包含 "video"（DownloadedVideo），则对 video.meta['all_video_paths'] 中每个视频抽取音频并转写
+    1) pipeline 模式：ctx 中包含 "video"（DownloadedVideo），则对 video.part_paths() 中每个分P抽取音频并转写
+       （仅音频下载时直接使用下载到的音频）
     2) debug 模式：在构造的时候传入 input_paths（list[str]），则直接对这些路径转写（便于单元/调试）
+
+    transcriber.subtitle_policy 控制字幕快速路径：
+      prefer_subtitles  分P有可用字幕（SRT / JSON / ASS）时直接解析字幕，跳过抽音与 ASR（默认）
+      asr_only          忽略字幕，全部走 ASR
+      subtitles_only    只用字幕，没有字幕的分P记为失败
+
+    transcriber.concurrency 控制同时转写的分P数（asyncio 信号量，默认 4）；
+    只对支持并发的 provider（云端 API）生效，本地模型一次只转写一个分P。
+
+    抽音的中间编码由 transcriber 决定（Transcriber.audio_codec，见 AUDIO_CODECS）：本地模型用 pcm wav，
+    云端 provider 默认 opus。每个音频写出 / 上传的字节数记录在 audio_bytes 中。
+
+    transcriber.vad.enabled 时在抽音与转写之间做一次 VAD（见 transcriber/vad.py），只把语音部分送去转写，
+    结果的时间戳按 TimeMap 映射回原视频时间轴。
+
+    keyframes.enabled 时（文件模式）抽音与截取关键帧在同一个 ffmpeg 进程里完成（extract_audio_and_frames），
+    视频只解码一次；得到的关键帧经 ctx["keyframes"] 交给 SummarizeStage。内存模式下仍由 SummarizeStage 单独截帧。
     """
 
-    def __init__(self, config, input_paths: Optional[List[str]] = None):
+    def __init__(self, config, input_paths: Optional[List[str]] = None, transcriber: Optional[Transcriber] = None):
         super().__init__(config)
         self.input_paths = input_paths
+        self._transcriber = transcriber
+        # {音频路径: {"written": 抽音写出的字节数, "uploaded": 上传到云端的字节数}}
+        self.audio_bytes: Dict[str, Dict[str, int]] = {}
+        self._vad: Optional[VoiceActivityDetector] = None
+        # {分P视频路径: 与抽音一起提取的关键帧}
+        self.keyframes: Dict[str, List[KeyFrame]] = {}
 
-    def run(self, ctx: dict):
+    def get_transcriber(self) -> Transcriber:
+        # 同一个 stage 实例内只创建一次 transcriber（流式模式下会被多个分P复用）
+        if self._transcriber is None:
+            provider = self.config.transcriber.provider if hasattr(self.config, "transcriber") else getattr(
+                self.config.ai, "provider", "local")
+            self._transcriber = TranscriberFactory.create(provider, self.config)
+        return self._transcriber
 
-        provider = self.config.transcriber.provider if hasattr(self.config, "transcriber") else getattr(self.config.ai,
-                                                                                                        "provider",
-                                                                                                        "local")
-        transcriber: Transcriber = TranscriberFactory.create(provider, self.config)
+    def audio_tmp_root(self, video_key: Optional[str] = None) -> Path:
+        # 临时音频目录放在 downloads/tmp_audios/<video_key>/：不同视频的同名分P不会互相覆盖，
+        # StorageManager 按视频记录的中间文件也随该视频的 pin 受保护。
+        # 未指定 video_key 时取 video.url 对应的 key，没有 URL（只转写本地文件）时直接放在 tmp_audios/
+        project_root = Path(__file__).resolve().parents[2]
+        audio_tmp_root = (project_root / (getattr(self.config.video, "download_path", "downloads"))) / "tmp_audios"
+        if video_key is None:
+            url = get_config_value(self.config, "video.url", "")
+            video_key = video_key_from_url(url) if url else None
+        if video_key:
+            audio_tmp_root = audio_tmp_root / video_key
+        audio_tmp_root = audio_tmp_root.resolve()
+        audio_tmp_root.mkdir(parents=True, exist_ok=True)
+        return audio_tmp_root
 
-        targets: List[str] = []
+    def resolve_targets(self, ctx: dict) -> List[str]:
         # 优先使用 input_paths（单独调试）
         if self.input_paths:
-            targets = list(self.input_paths)
+            return list(self.input_paths)
+        video_obj: DownloadedVideo = ctx.get("video")
+        if not video_obj:
+            raise RuntimeError("TranscribeStage: no video in ctx and no input_paths provided")
+        return video_obj.part_paths()  # list of video / audio file paths
+
+    def subtitle_policy(self) -> str:
+        policy = str(get_config_value(self.config, "transcriber.subtitle_policy", "prefer_subtitles")).lower()
+        if policy not in SUBTITLE_POLICIES:
+            logging.warning(f"[TranscribeStage] 未知的 subtitle_policy: {policy}，按 prefer_subtitles 处理")
+            return "prefer_subtitles"
+        return policy
+
+    def subtitle_transcript(self, media_path: str) -> Optional[Transcript]:
+        """
+        按 subtitle_policy 查找并解析分P的字幕；返回 None 表示需要走 ASR。
+        subtitles_only 且没有可用字幕时抛出 TranscriptionError。
+        """
+        policy = self.subtitle_policy()
+        if policy == "asr_only":
+            return None
+        with get_tracer().span("subtitle_part", part=Path(media_path).name):
+            transcript = load_subtitles(media_path)
+        if transcript is None and policy == "subtitles_only":
+            raise TranscriptionError(f"No usable subtitles for {media_path} (subtitle_policy=subtitles_only)")
+        return transcript
+
+    def use_in_memory_audio(self) -> bool:
+        """
+        transcriber.in_memory_audio 开启且 transcriber 支持数组输入时，
+        ffmpeg 只解码一次到内存 PCM 并直接送入转写，省去 wav 落盘后再由转写器二次解码。
+        """
+        return bool(get_config_value(self.config, "transcriber.in_memory_audio", False)) \
+            and self.get_transcriber().supports_array_input
+
+    def prepare_audio(self, video_path: str, video_key: Optional[str] = None) -> Union[str, PCMAudio]:
+        """
+        抽取单个分P的音频，返回音频路径；内存模式下返回 PCMAudio。
+        video_key 为分P所属视频（批量模式下各视频共用一个 stage），决定中间音频的目录，见 audio_tmp_root。
+        """
+        if self.use_in_memory_audio():
+            return self._decode_part(video_path, video_key)
+        # 如果 vp 本身是音频文件（.wav/.mp3），直接传入；否则先抽音
+        p = Path(video_path)
+        if p.suffix.lower() in AUDIO_SUFFIXES:
+            return str(p)
+        if self.extract_keyframes_with_audio():
+            return self._extract_media(p, video_key)
+        transcriber = self.get_transcriber()
+        with get_tracer().span("extract_part", part=p.name):
+            audio_path = extract_audio(str(p), str(self.audio_tmp_root(video_key)),
+                                       codec=transcriber.audio_codec, bitrate=transcriber.audio_bitrate)
+        if audio_path is None:
+            raise RuntimeError(f"Failed to extract audio from {video_path}")
+        self._record_bytes(audio_path, written=os.path.getsize(audio_path))
+        return audio_path
+
+    def extract_keyframes_with_audio(self) -> bool:
+        # segments 模式需要转写结果里的时间点，只能在 SummarizeStage 中 seek 截帧
+        return bool(get_config_value(self.config, "keyframes.enabled", False)) \
+            and str(get_config_value(self.config, "keyframes.mode", "scene")).lower() != "segments"
+
+    def _extract_media(self, p: Path, video_key: Optional[str] = None) -> str:
+        """一次 ffmpeg 同时抽音与截取关键帧，关键帧记录在 self.keyframes 中"""
+        transcriber = self.get_transcriber()
+        with get_tracer().span("extract_media_part", part=p.name):
+            try:
+                audio_path, frames = extract_audio_and_frames(
+                    str(p), str(self.audio_tmp_root(video_key)), str(keyframes_dir(self.config, str(p))),
+                    KeyframeExtractor.from_config(self.config),
+                    codec=transcriber.audio_codec, bitrate=transcriber.audio_bitrate)
+            except RuntimeError as e:
+                raise RuntimeError(f"Failed to extract audio from {p}: {e}")
+        self.keyframes[str(p)] = frames
+        self._record_bytes(audio_path, written=os.path.getsize(audio_path))
+        return audio_path
+
+    def pop_keyframes(self, video_path: Optional[str]) -> Optional[List[KeyFrame]]:
+        """取出与抽音一起提取的关键帧；没有时返回 None（由 SummarizeStage 自行截帧）"""
+        return self.keyframes.pop(str(video_path), None) if video_path else None
+
+    def _decode_part(self, video_path: str, video_key: Optional[str] = None) -> PCMAudio:
+        p = Path(video_path)
+        with get_tracer().span("decode_part", part=p.name):
+            samples = decode_audio(str(p))
+            audio = PCMAudio(samples, 16000, source=str(p))
+            # transcriber.write_audio=false 时完全不落盘；否则用同一份 buffer 写出 wav 备用（不再二次解码）
+            if get_config_value(self.config, "transcriber.write_audio", True):
+                audio.wav_path = write_wav(samples, str(self.audio_tmp_root(video_key) / f"{p.stem}.wav"))
+        return audio
+
+    def _iter_in_memory(self, targets: List[str], errors: Dict[int, str]):
+        """
+        逐个分P解码并产出 (video_path, PCMAudio)；后台预取下一个分P，
+        内存中最多同时存在两个分P的 PCM。
+        """
+        if not targets:
+            return
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="v2n-decode") as pool:
+            fut = pool.submit(self._decode_part, targets[0])
+            for idx, vp in enumerate(targets):
+                nxt = pool.submit(self._decode_part, targets[idx + 1]) if idx + 1 < len(targets) else None
+                try:
+                    audio = fut.result()
+                except Exception as e:
+                    errors[idx] = str(e)
+                    logging.error(f"[TranscribeStage] P{idx + 1} 解码失败: {e}")
+                    audio = None
+                yield vp, audio
+                fut = nxt
+
+    def prepare_audio_batch(self, video_paths: List[str]) -> Tuple[List[Optional[str]], Dict[int, str]]:
+        """
+        并行抽取所有分P的音频（transcriber.extract_workers，默认 CPU 核数）。
+        返回与 video_paths 顺序一致的音频路径列表（失败处为 None）以及 {分P下标: 错误信息}。
+        """
+        audio_paths: List[Optional[str]] = [None] * len(video_paths)
+        pending = []
+        for idx, vp in enumerate(video_paths):
+            if Path(vp).suffix.lower() in AUDIO_SUFFIXES:
+                audio_paths[idx] = str(vp)
+            else:
+                pending.append(idx)
+
+        workers = get_config_value(self.config, "transcriber.extract_workers", None) or os.cpu_count()
+        errors: Dict[int, str] = {}
+        if self.extract_keyframes_with_audio() and pending:
+            with ThreadPoolExecutor(max_workers=min(workers, len(pending)),
+                                    thread_name_prefix="v2n-extract") as pool:
+                futures = {idx: pool.submit(self._extract_media, Path(video_paths[idx])) for idx in pending}
+                for idx, fut in futures.items():
+                    try:
+                        audio_paths[idx] = fut.result()
+                    except Exception as e:
+                        errors[idx] = str(e)
+                        logging.error(f"[TranscribeStage] P{idx + 1} 抽音失败: {e}")
+            return audio_paths, errors
+
+        transcriber = self.get_transcriber()
+        extracted, batch_errors = extract_audio_batch(
+            [video_paths[i] for i in pending], str(self.audio_tmp_root()), workers=workers,
+            codec=transcriber.audio_codec, bitrate=transcriber.audio_bitrate)
+        for j, idx in enumerate(pending):
+            audio_paths[idx] = extracted[j]
+            if j in batch_errors:
+                errors[idx] = batch_errors[j]
+            elif extracted[j] is not None:
+                self._record_bytes(extracted[j], written=os.path.getsize(extracted[j]))
+        return audio_paths, errors
+
+    def _record_bytes(self, audio_path: str, written: Optional[int] = None, uploaded: Optional[int] = None):
+        stats = self.audio_bytes.setdefault(str(audio_path), {"written": 0, "uploaded": 0})
+        if written is not None:
+            stats["written"] = written
+        if uploaded is not None:
+            stats["uploaded"] = uploaded
+
+    def bytes_for(self, audio: Union[str, PCMAudio, None]) -> Dict[str, int]:
+        """单个音频的 {"written", "uploaded"} 字节数（未记录时为 0）"""
+        if isinstance(audio, PCMAudio):
+            audio = audio.wav_path
+        return dict(self.audio_bytes.get(str(audio), {"written": 0, "uploaded": 0})) if audio \
+            else {"written": 0, "uploaded": 0}
+
+    def vad(self) -> VoiceActivityDetector:
+        if self._vad is None:
+            self._vad = VoiceActivityDetector.from_config(self.config)
+        return self._vad
+
+    def apply_vad(self, audio: Union[str, PCMAudio]) -> Tuple[Union[str, PCMAudio, None], Optional[TimeMap]]:
+        """
+        VAD 启用时裁掉静音，返回 (送去转写的音频, TimeMap)；未启用或无需裁剪时返回 (audio, None)。
+        整段都没有语音时返回 (None, TimeMap)。文件输入的裁剪结果按 transcriber 的中间编码写到
+        音频所在的 tmp_audios/<video_key>/vad/（直接输入的音频文件写到 audio_tmp_root()/vad/）。
+        """
+        vad = self.vad()
+        if not vad.enabled:
+            return audio, None
+        p = Path(str(audio))
+        with get_tracer().span("vad_part", part=p.name):
+            if isinstance(audio, PCMAudio):
+                samples, sample_rate = audio.samples, audio.sample_rate
+            else:
+                sample_rate = 16000
+                samples = decode_audio(str(audio), sample_rate)
+            trimmed, time_map = vad.trim(samples, sample_rate)
+            if time_map is None:
+                return audio, None
+            total = len(samples) / float(sample_rate)
+            logging.info(f"[TranscribeStage] VAD {p.name}: 保留 {time_map.kept_seconds:.0f}s / {total:.0f}s 语音")
+            if not len(trimmed):
+                return None, time_map
+            if isinstance(audio, PCMAudio):
+                return PCMAudio(trimmed, sample_rate, source=audio.source), time_map
+            transcriber = self.get_transcriber()
+            suffix, _ = audio_codec_args(transcriber.audio_codec, transcriber.audio_bitrate)
+            vad_dir = (p.parent if "tmp_audios" in p.parts else self.audio_tmp_root()) / "vad"
+            out = write_audio(trimmed, str(vad_dir / f"{p.stem}{suffix}"), sample_rate,
+                              transcriber.audio_codec, transcriber.audio_bitrate)
+        self._record_bytes(audio, written=self.bytes_for(audio)["written"] + os.path.getsize(out))
+        return out, time_map
+
+    @staticmethod
+    def _discard_trimmed(audio: Union[str, PCMAudio], source: Union[str, PCMAudio, None]):
+        # VAD 裁剪出的临时文件转写完即删除
+        if isinstance(source, str) and source != audio:
+            try:
+                os.remove(source)
+            except OSError:
+                pass
+
+    def transcribe_part(self, audio: Union[str, PCMAudio]) -> Transcript:
+        """转写单个音频（文件路径或内存 PCM）；启用缓存时按 音频内容 + 转写设置 命中"""
+        transcriber = self.get_transcriber()
+        tracer = get_tracer()
+        part = Path(str(audio)).name
+        with tracer.span("transcribe_part", part=part):
+            cache = self.cache
+            key = None
+            if cache is not None:
+                key = self._cache_key(audio)
+                cached = cache.get("transcripts", key)
+                if cached is not None:
+                    return Transcript.from_dict(cached)
+            source, time_map = self.apply_vad(audio)
+            try:
+                with tracer.external(f"{type(transcriber).__name__}.transcribe", part=part):
+                    if source is None:
+                        transcript = Transcript()
+                    elif isinstance(source, PCMAudio):
+                        transcript = transcriber.transcribe_array(source.samples, source.sample_rate)
+                    else:
+                        transcript = transcriber.transcribe(source)
+                        self._record_bytes(audio, uploaded=transcriber.uploaded_bytes(source))
+            finally:
+                self._discard_trimmed(audio, source)
+            if time_map is not None:
+                transcript = time_map.remap(transcript)
+            if cache is not None:
+                cache.put("transcripts", key, transcript.to_dict())
+            return transcript
+
+    def _cache_key(self, audio: Union[str, PCMAudio]) -> str:
+        if isinstance(audio, PCMAudio):
+            content = ("pcm_f32", audio.sample_rate, hash_bytes(audio.samples))
         else:
-            video_obj: DownloadedVideo = ctx.get("video")
-            if not video_obj:
-                raise RuntimeError("TranscribeStage: no video in ctx and no input_paths provided")
-            targets = video_obj.meta.get("all_video_paths", [])  # list of video file paths
+            content = hash_file(audio)
+        parts = ["transcribe", content, self.get_transcriber().cache_signature()]
+        if self.vad().enabled:
+            parts.append({"vad": self.vad().signature()})
+        return make_key(*parts)
 
-        transcripts: List[Transcript] = []
-        # 临时音频目录放在 downloads/<video_id>/audios/
-        project_root = Path(__file__).resolve().parents[2]
-        audio_tmp_root = (project_root / (getattr(self.config.video, "download_path", "downloads"))) / "tmp_audios"
-        audio_tmp_root = audio_tmp_root.resolve()
-        audio_tmp_root.mkdir(parents=True, exist_ok=True)
+    def concurrency(self) -> int:
+        if not self.get_transcriber().supports_concurrency:
+            return 1
+        return max(1, int(get_config_value(self.config, "transcriber.concurrency", 4)))
 
-        for vp in targets:
-            # 如果 vp 本身是音频文件（.wav/.mp3），直接传入；否则先抽音
-            p = Path(vp)
-            if p.suffix.lower() in (".wav", ".mp3", ".m4a"):
-                audio_path = str(p)
+    async def atranscribe_part(self, audio_path: str) -> Transcript:
+        """transcribe_part 的异步版本（仅音频文件）：缓存查找在线程池中做，转写走 transcriber.atranscribe"""
+        transcriber = self.get_transcriber()
+        part = Path(audio_path).name
+        cache = self.cache
+        key = None
+        if cache is not None:
+            key = await run_in_thread(self._cache_key, audio_path)
+            cached = cache.get("transcripts", key)
+            if cached is not None:
+                return Transcript.from_dict(cached)
+        source, time_map = await run_in_thread(self.apply_vad, audio_path)
+        try:
+            if source is None:
+                transcript = Transcript()
             else:
-                audio_path = extract_audio(str(p), str(audio_tmp_root))
-                if audio_path is None:
-                    raise RuntimeError(f"Failed to extract audio from {vp}")
-            # 转写单个音频
-            transcript = transcriber.transcribe(audio_path)
-            transcripts.append(transcript)
+                with get_tracer().external(f"{type(transcriber).__name__}.atranscribe", part=part):
+                    transcript = await transcriber.atranscribe(source)
+                self._record_bytes(audio_path, uploaded=transcriber.uploaded_bytes(source))
+        finally:
+            self._discard_trimmed(audio_path, source)
+        if time_map is not None:
+            transcript = time_map.remap(transcript)
+        if cache is not None:
+            cache.put("transcripts", key, transcript.to_dict())
+        return transcript
+
+    def transcribe_files(self, audio_paths: List[Optional[str]]) -> Dict[int, Transcript]:
+        """
+        并发转写多个音频文件（同时最多 concurrency() 个），返回 {下标: Transcript}，None 项跳过。
+        任一分P失败时，在其余分P结束后按分P顺序抛出第一个错误。
+        """
+        jobs = [(i, p) for i, p in enumerate(audio_paths) if p is not None]
+        if not jobs:
+            return {}
+        limit = self.concurrency()
+        logging.info(f"[TranscribeStage] 转写 {len(jobs)} 个分P，并发 {limit}")
+
+        async def _run():
+            sema = asyncio.Semaphore(limit)
+
+            async def _one(path: str) -> Transcript:
+                async with sema:
+                    return await self.atranscribe_part(path)
+
+            try:
+                return await asyncio.gather(*(_one(p) for _, p in jobs), return_exceptions=True)
+            finally:
+                await aclose_async_client()
+
+        results = asyncio.run(_run())
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return {i: result for (i, _), result in zip(jobs, results)}
+
+    def run(self, ctx: dict):
+        targets = self.resolve_targets(ctx)
+
+        # 字幕快速路径：有字幕的分P不抽音、不转写
+        results: Dict[int, Tuple[Transcript, Optional[str]]] = {}
+        errors: Dict[int, str] = {}
+        for idx, vp in enumerate(targets):
+            try:
+                transcript = self.subtitle_transcript(vp)
+            except TranscriptionError as e:
+                errors[idx] = str(e)
+                continue
+            if transcript is not None:
+                results[idx] = (transcript, None)
+        if results:
+            logging.info(f"[TranscribeStage] {len(results)}/{len(targets)} 个分P使用字幕，跳过 ASR")
+
+        asr_idx = [i for i in range(len(targets)) if i not in results and i not in errors]
+        asr_targets = [targets[i] for i in asr_idx]
+        if self.use_in_memory_audio():
+            # 内存模式：逐个解码（带一个预取），避免所有分P的 PCM 同时驻留内存
+            asr_errors: Dict[int, str] = {}
+            for j, (vp, audio) in enumerate(self._iter_in_memory(asr_targets, asr_errors)):
+                if audio is not None:
+                    results[asr_idx[j]] = (self.transcribe_part(audio), audio.wav_path)
+        else:
+            # 文件模式：各分P的转写请求并发发出（transcriber.concurrency）
+            audio_paths, asr_errors = self.prepare_audio_batch(asr_targets)
+            for j, transcript in self.transcribe_files(audio_paths).items():
+                results[asr_idx[j]] = (transcript, audio_paths[j])
+        errors.update({asr_idx[j]: msg for j, msg in asr_errors.items()})
+
+        order = sorted(results)
+        transcripts: List[Transcript] = [results[i][0] for i in order]
+        sources: List[str] = [targets[i] for i in order]
+        audio_paths: List[Optional[str]] = [results[i][1] for i in order]
 
         ctx["transcripts"] = transcripts
+        # 与 transcripts 一一对应的源视频路径（部分分P抽音失败时与 all_video_paths 不再等长）
+        ctx["transcript_sources"] = sources
+        ctx["audio_paths"] = audio_paths
+        # 与 transcripts 对应的关键帧（None 表示未随抽音提取）
+        ctx["keyframes"] = [self.pop_keyframes(src) for src in sources]
+        ctx["extract_errors"] = {targets[i]: msg for i, msg in errors.items()}
+        ctx["audio_bytes"] = [self.bytes_for(p) for p in audio_paths]
+        written = sum(b["written"] for b in ctx["audio_bytes"])
+        uploaded = sum(b["uploaded"] for b in ctx["audio_bytes"])
+        logging.info(f"[TranscribeStage] 中间音频写出 {written / 1024 / 1024:.1f} MB，"
+                     f"上传 {uploaded / 1024 / 1024:.1f} MB")
+        if errors:
+            logging.warning(f"[TranscribeStage] {len(errors)}/{len(targets)} 个分P没有可用的转写输入: "
+                            + "; ".join(f"P{i + 1}: {msg}" for i, msg in sorted(errors.items())))
+            if not transcripts:
+                raise TranscriptionError(f"TranscribeStage: no subtitles or audio available for all {len(targets)} parts")
         logging.info(f"[TranscribeStage] produced {len(transcripts)} transcripts")
 
 
@@ -88,7 +524,13 @@ class SummarizeStage(Stage):
     结果放到 ctx['notes'] 列表，元素为 dict {'note': Note, 'md_path': str}
     """
 
-    def run(self, ctx: dict):
+    def __init__(self, config, summarizer: Optional[Summarizer] = None):
+        super().__init__(config)
+        self._summarizer = summarizer
+
+    def get_summarizer(self) -> Summarizer:
+        if self._summarizer is not None:
+            return self._summarizer
         summarizer_provider = getattr(self.config, "summarizer", None)
         if summarizer_provider is None:
             # 兼容早期 config 结构
@@ -104,57 +546,134 @@ class SummarizeStage(Stage):
             summarizer = SummarizerFactory.create(self.config.ai.provider, self.config)
         except Exception:
             summarizer = SummarizerFactory.create(getattr(self.config, "summarizer", "rule"), self.config)
+        self._summarizer = summarizer
+        return summarizer
 
-        transcripts: List[Transcript] = ctx.get("transcripts", [])
-        if not transcripts:
-            raise RuntimeError("SummarizeStage: no transcripts in ctx")
-
-        # output dir
+    def output_dir(self) -> Path:
         project_root = Path(__file__).resolve().parents[2]
         md_output = Path(getattr(self.config.output, "markdown_path", "notes"))
         if not md_output.is_absolute():
             md_output = (project_root / md_output).resolve()
         md_output.mkdir(parents=True, exist_ok=True)
+        return md_output
+
+    def keyframes_for(self, video_path: Optional[str], transcript: Optional[Transcript] = None) -> List[KeyFrame]:
+        """
+        keyframes.enabled 时提取分P的关键帧（场景切换 + 感知哈希去重，见 transcriber/keyframes.py），
+        截图放在 {markdown_path}/frames/{分P名}/；纯音频分P或提取失败时返回 []。
+        给出 transcript 时各帧关联到所在片段；segments 模式按片段时间点 seek 截帧。
+        scene / interval 模式在文件模式下通常已由 TranscribeStage 随抽音提取，不会走到这里。
+        """
+        if not get_config_value(self.config, "keyframes.enabled", False) or not video_path:
+            return []
+        p = Path(video_path)
+        if p.suffix.lower() in AUDIO_SUFFIXES:
+            return []
+        try:
+            with get_tracer().span("keyframes_part", part=p.name):
+                return extract_keyframes(str(p), str(keyframes_dir(self.config, str(p))), self.config,
+                                         transcript=transcript)
+        except Exception as e:
+            logging.warning(f"[SummarizeStage] 关键帧提取失败 {p.name}: {e}")
+            return []
+
+    def summarize_part(self, idx: int, transcript: Transcript, video_path: Optional[str] = None,
+                       keyframes: Optional[List[KeyFrame]] = None) -> dict:
+        """
+        为单个分P生成笔记并写入 markdown，返回 {'note': Note, 'md_path': str}。
+        keyframes 为已提取的关键帧（None 时按 keyframes.enabled 自行提取）。
+        """
+        with get_tracer().span("summarize_part", part=Path(video_path).name if video_path else idx):
+            return self._summarize_part(idx, transcript, video_path, keyframes)
+
+    def _summarize_part(self, idx: int, transcript: Transcript, video_path: Optional[str] = None,
+                        keyframes: Optional[List[KeyFrame]] = None) -> dict:
+        text = transcript.get_full_text()
+        # call summarizer（启用缓存时按 转写文本 + 摘要设置 命中）
+        summarizer = self.get_summarizer()
+        if keyframes is None:
+            keyframes = self.keyframes_for(video_path, transcript)
+        elif keyframes:
+            link_segments(keyframes, transcript)
+        frames = [f.path for f in keyframes]
+        cache = self.cache
+        key = None
+        if cache:
+            parts = ["summarize", hash_text(text), summarizer.cache_signature()]
+            if frames:
+                parts.append(hash_text("\n".join(frames)))
+            key = make_key(*parts)
+        cached = cache.get("notes", key) if cache else None
+        if cached is not None:
+            note_obj = Note.from_dict(cached)
+        else:
+            with get_tracer().external(f"{type(summarizer).__name__}.summarize", part=idx):
+                note_obj: Note = summarizer.summarize(text, frames=frames or None)
+            if cache:
+                cache.put("notes", key, note_obj.to_dict())
+        if keyframes:
+            note_obj.frames = frames
+            note_obj.metadata["keyframes"] = [f.to_dict() for f in keyframes]
+        # build title per-video (prefer video file name)
+        if video_path:
+            title_base = Path(video_path).stem
+        else:
+            title_base = f"video_part_{idx + 1}"
+        # set title
+        note_obj.title = title_base
+        # save markdown
+        md_text = note_obj.to_markdown()
+        filename = f"{title_base}.md"
+        md_path = str((self.output_dir() / filename).resolve())
+        with open(md_path, "w", encoding="utf-8") as f:
+            f.write(md_text)
+        logging.info(f"[SummarizeStage] wrote note: {md_path}")
+        return {"note": note_obj, "md_path": md_path}
+
+    def run(self, ctx: dict):
+        transcripts: List[Transcript] = ctx.get("transcripts", [])
+        if not transcripts:
+            raise RuntimeError("SummarizeStage: no transcripts in ctx")
 
         notes = []
         # try to get associated video paths (if available)
-        video_paths = []
+        video_paths = ctx.get("transcript_sources") or []
         video_obj = ctx.get("video")
-        if video_obj:
-            video_paths = video_obj.meta.get("all_video_paths", [])
+        if not video_paths and video_obj:
+            video_paths = video_obj.part_paths()
 
+        keyframes = ctx.get("keyframes") or []
         for idx, transcript in enumerate(transcripts):
-            text = transcript.get_full_text()
-            # call summarizer
-            note_obj: Note = summarizer.summarize(text, frames=None)
-            # build title per-video (prefer video file name)
-            if idx < len(video_paths):
-                vp = Path(video_paths[idx])
-                title_base = vp.stem
-            else:
-                title_base = f"video_part_{idx + 1}"
-            # set title
-            note_obj.title = title_base
-            # save markdown
-            md_text = note_obj.to_markdown()
-            filename = f"{title_base}.md"
-            md_path = str((md_output / filename).resolve())
-            with open(md_path, "w", encoding="utf-8") as f:
-                f.write(md_text)
-            notes.append({"note": note_obj, "md_path": md_path})
-            logging.info(f"[SummarizeStage] wrote note: {md_path}")
+            video_path = video_paths[idx] if idx < len(video_paths) else None
+            notes.append(self.summarize_part(idx, transcript, video_path,
+                                             keyframes[idx] if idx < len(keyframes) else None))
 
         ctx["notes"] = notes
 
 
 class SyncStage(Stage):
-    def run(self, ctx: dict):
-        from video2note.notion.base import SyncerFactory
+    def __init__(self, config, syncer=None):
+        super().__init__(config)
+        self._syncer = syncer
+
+    def get_syncer(self):
+        if self._syncer is None:
+            from video2note.notion.base import SyncerFactory
+            self._syncer = SyncerFactory.create(self.config.notion.provider, self.config)
+        return self._syncer
 
-        note = ctx.get("note")
-        if note is None:
+    def sync_part(self, note: Note) -> bool:
+        syncer = self.get_syncer()
+        with get_tracer().external(f"{type(syncer).__name__}.sync", part=note.title):
+            return syncer.sync(note)
+
+    def run(self, ctx: dict):
+        # SummarizeStage 产出 ctx['notes']（每个分P一篇），兼容旧的单篇 ctx['note']
+        notes = [item["note"] for item in ctx.get("notes", [])]
+        if not notes and ctx.get("note") is not None:
+            notes = [ctx["note"]]
+        if not notes:
             raise RuntimeError("No note object in context")
 
-        syncer = SyncerFactory.create(self.config.notion.provider, self.config)
-        success = syncer.sync(note)
-        ctx["sync_success"] = success
+        results = [self.sync_part(note) for note in notes]
+        ctx["sync_success"] = all(results)
@@ -1,45 +1,172 @@
 # src/video2note/core/runner.py
 
+from contextlib import contextmanager
+from typing import Optional
+
+from video2note.config_manager.loader import get_config_value
+from video2note.core.manifest import RunManifest, video_key_from_url
 from video2note.core.pipeline import (
     DownloadStage, TranscribeStage, SummarizeStage, SyncStage
 )
 from video2note.core.exceptions import Video2NoteError
+from video2note.core.storage import StorageManager
+from video2note.transcriber.model_registry import warm_up_from_config
+from video2note.utils.tracing import get_tracer
 
 
 class Runner:
-    def __init__(self, config):
+    def __init__(self, config, downloader=None, transcriber=None, summarizer=None, syncer=None):
+        """
+        downloader / transcriber / summarizer / syncer 可选：传入时各阶段直接复用这些实例，
+        否则按 config 由对应工厂创建（用于共享实例、离线基准测试等）。
+        """
         self.config = config
+        self.downloader = downloader
+        self.transcriber = transcriber
+        self.summarizer = summarizer
+        self.syncer = syncer
+
+    def _download_stage(self, on_part=None) -> DownloadStage:
+        return DownloadStage(self.config, downloader=self.downloader, on_part=on_part)
+
+    def _transcribe_stage(self) -> TranscribeStage:
+        return TranscribeStage(self.config, transcriber=self.transcriber)
+
+    def _summarize_stage(self) -> SummarizeStage:
+        return SummarizeStage(self.config, summarizer=self.summarizer)
+
+    def _sync_stage(self) -> SyncStage:
+        return SyncStage(self.config, syncer=self.syncer)
+
+    def manifest(self) -> RunManifest:
+        """当前 config.video.url 对应的运行清单（downloads/<video_key>/run_manifest.json）"""
+        return RunManifest.for_url(self.config)
+
+    @contextmanager
+    def _storage_hold(self, ctx: dict):
+        """
+        启用 storage.max_size_mb 时：运行期间 pin 住当前视频的产物，
+        结束后（无论成功与否）记录 ctx 中的下载 / 中间文件并按配额淘汰其他视频的旧产物。
+        """
+        storage = StorageManager.from_config(self.config)
+        if storage is None:
+            yield
+            return
+        key = video_key_from_url(get_config_value(self.config, "video.url", ""))
+        with storage.hold(key):
+            try:
+                yield
+            finally:
+                storage.track_ctx(key, ctx)
+
+    def _run_stage(self, stage, ctx: dict, manifest: RunManifest):
+        # 每个阶段完成后立即落盘，崩溃后可以用 *-only 模式从断点继续
+        with get_tracer().span(type(stage).__name__):
+            stage.run(ctx)
+        manifest.update_from_ctx(ctx)
 
     def run_full(self):
+        if get_config_value(self.config, "pipeline.streaming", False):
+            return self.run_streaming()
+
+        # 本地 whisper 模型在后台预热，与下载阶段重叠
+        warm_up_from_config(self.config)
         ctx = {}
+        manifest = self.manifest()
         stages = [
-            DownloadStage(self.config),
-            TranscribeStage(self.config),
-            SummarizeStage(self.config),
-            SyncStage(self.config),
+            self._download_stage(),
+            self._transcribe_stage(),
+            self._summarize_stage(),
+            self._sync_stage(),
         ]
-        for stage in stages:
+        with self._storage_hold(ctx):
+            for stage in stages:
+                try:
+                    self._run_stage(stage, ctx, manifest)
+                except Video2NoteError as e:
+                    # 统一捕获流程级错误
+                    # 你可以在这里做日志 /回滚 /通知等
+                    raise
+        return ctx
+
+    def run_streaming(self):
+        """
+        流式模式：每个分P下载完成后立即进入流水线，独立地流过 抽音 → 转写 → 摘要 → 同步，
+        阶段之间以有界队列衔接（见 core/streaming.py）。
+        """
+        from video2note.core.streaming import StreamingPipeline
+
+        warm_up_from_config(self.config)
+        ctx = {}
+        tracer = get_tracer()
+        manifest = self.manifest()
+
+        sync_stage = self._sync_stage() if get_config_value(self.config, "pipeline.sync", True) else None
+        pipeline = StreamingPipeline(self.config, self._transcribe_stage(), self._summarize_stage(), sync_stage)
+        submitted = set()
+
+        def on_part(idx: int, path: str):
+            submitted.add(idx)
+            pipeline.submit(idx, path)
+
+        with self._storage_hold(ctx):
+            with tracer.span("StreamingPipeline"):
+                pipeline.start()
+                try:
+                    self._run_stage(self._download_stage(on_part=on_part), ctx, manifest)
+                    # 不支持 on_part 回调的 downloader：下载完成后补交其余分P
+                    for idx, path in enumerate(ctx["video"].part_paths()):
+                        if idx not in submitted:
+                            on_part(idx, path)
+                finally:
+                    pipeline.close()
+                    parts = pipeline.join()
             try:
-                stage.run(ctx)
-            except Video2NoteError as e:
-                # 统一捕获流程级错误
-                # 你可以在这里做日志 /回滚 /通知等
-                raise
+                StreamingPipeline.collect(parts, ctx)
+            finally:
+                # 部分分P失败时也记录已完成的部分
+                manifest.update_from_ctx(ctx)
+        return ctx
+
+    def run_batch(self, source: str = "-"):
+        """
+        批量模式：从文件（或 "-" 表示 stdin）读取 URL 列表，在一个进程内统一调度（见 core/batch.py）。
+        返回 BatchReport。
+        """
+        from video2note.core.batch import BatchRunner, read_urls
+
+        urls = read_urls(source)
+        if not urls:
+            raise Video2NoteError(f"no urls found in {source}")
+        return BatchRunner(self.config).run(urls)
+
+    def run_watch(self, path: Optional[str] = None, once: bool = False):
+        """
+        监视目录模式：轮询 path（或 watch.path），把新增 / 变化的本地媒体文件送入批量流水线（见 core/watch.py）。
+        once=True 时处理完当前已有的文件后返回本轮的 BatchReport。
+        """
+        from video2note.core.watch import FolderWatcher
+
+        return FolderWatcher(self.config, path).run(once=once)
 
     def run_download_only(self):
         ctx = {}
-        DownloadStage(self.config).run(ctx)
+        self._run_stage(self._download_stage(), ctx, self.manifest())
 
     def run_transcribe_only(self):
-        ctx = {}
-        # 假设 note 已经生成 / 从本地加载
-        TranscribeStage(self.config).run(ctx)
+        # 从运行清单加载已下载的分P，无需重新下载
+        manifest = self.manifest()
+        ctx = manifest.restore({}, ["video"])
+        self._run_stage(self._transcribe_stage(), ctx, manifest)
 
     def run_summarize_only(self):
-        ctx = {}
-        SummarizeStage(self.config).run(ctx)
+        # 从运行清单加载转写结果，可以只换 prompt 重跑摘要
+        manifest = self.manifest()
+        ctx = manifest.restore({}, ["video", "transcripts"])
+        self._run_stage(self._summarize_stage(), ctx, manifest)
 
     def run_sync_only(self):
-        ctx = {}
-        # 假设 note 已经生成 / 从本地加载
-        SyncStage(self.config).run(ctx)
+        # 从运行清单加载已生成的笔记
+        manifest = self.manifest()
+        ctx = manifest.restore({}, ["notes"])
+        self._run_stage(self._sync_stage(), ctx, manifest)
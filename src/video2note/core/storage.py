@@ -0,0 +1,214 @@
+# src/video2note/core/storage.py
+"""
+下载目录的磁盘配额管理：{download_path}/storage_ledger.json 按视频记录产物文件
+（download：下载到的分P视频 / 音频；intermediate：tmp_audios/<video_key>/ 中抽出的 wav 等中间文件）
+及其大小、最近使用时间。
+
+- 运行中的视频通过 pin 标记（同一进程内引用计数），其产物永远不会被淘汰
+- 视频的下游阶段全部结束后 release：更新最近使用时间，总占用超过配额时按 LRU 淘汰
+  未被 pin 的视频的产物，先淘汰中间文件，不够时再淘汰下载文件，直到降到配额的 90%
+- 只删除下载根目录之内的文件（local 下载器的源文件不受影响）；
+  run_manifest.json、转写 / 笔记 JSON 等小文件不计入也不删除
+
+被淘汰的下载在再次处理时由下载索引校验发现缺失并重新下载。
+
+配置（均可选）：
+    storage.max_size_mb   产物总占用上限，默认 0（不限制，不启用淘汰）
+    storage.ledger_path   账本文件，默认 {video.download_path}/storage_ledger.json
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from video2note.config_manager.loader import get_config_value
+from video2note.utils.file_utils import resolve_project_path
+
+ARTIFACT_KINDS = ("intermediate", "download")
+
+# 同一进程内所有 StorageManager 共享 pin 计数与账本文件锁（批量模式下各工作线程各自创建实例也能互相看到）
+_LOCK = threading.RLock()
+_PINS: Dict[str, int] = {}
+
+
+class StorageManager:
+    FILENAME = "storage_ledger.json"
+
+    def __init__(self, root, max_bytes: int, ledger_path=None):
+        self.root = Path(root).resolve()
+        self.max_bytes = int(max_bytes)
+        self.path = Path(ledger_path) if ledger_path else self.root / self.FILENAME
+
+    @classmethod
+    def from_config(cls, config) -> Optional["StorageManager"]:
+        """storage.max_size_mb > 0 时创建，否则返回 None"""
+        max_mb = float(get_config_value(config, "storage.max_size_mb", 0) or 0)
+        if max_mb <= 0:
+            return None
+        root = resolve_project_path(get_config_value(config, "video.download_path", "downloads"))
+        ledger = get_config_value(config, "storage.ledger_path", None)
+        return cls(root, int(max_mb * 1024 * 1024), resolve_project_path(ledger) if ledger else None)
+
+    # ---------- 账本读写 ----------
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {"videos": {}}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            data.setdefault("videos", {})
+            return data
+        except (OSError, ValueError) as e:
+            logging.warning(f"[StorageManager] 账本损坏，忽略: {self.path} ({e})")
+            return {"videos": {}}
+
+    def _save(self, data: dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def _managed(self, path) -> Optional[Path]:
+        """下载根目录内的文件返回绝对路径，根目录外的返回 None（不跟踪也不删除）"""
+        try:
+            p = Path(path).resolve()
+            p.relative_to(self.root)
+        except (TypeError, ValueError):
+            return None
+        return p if p != self.path.resolve() else None
+
+    # ---------- pin ----------
+
+    def pin(self, key: str):
+        with _LOCK:
+            _PINS[key] = _PINS.get(key, 0) + 1
+
+    def unpin(self, key: str):
+        with _LOCK:
+            n = _PINS.get(key, 0) - 1
+            if n > 0:
+                _PINS[key] = n
+            else:
+                _PINS.pop(key, None)
+
+    @staticmethod
+    def is_pinned(key: str) -> bool:
+        with _LOCK:
+            return _PINS.get(key, 0) > 0
+
+    @contextmanager
+    def hold(self, key: str):
+        """with storage.hold(key): ... 运行期间 pin 住视频，结束后 release"""
+        self.pin(key)
+        try:
+            yield self
+        finally:
+            self.release(key)
+
+    def release(self, key: str):
+        """视频的下游阶段已结束：解除 pin，刷新最近使用时间，并按配额淘汰"""
+        with _LOCK:
+            self.unpin(key)
+            data = self._load()
+            if key in data["videos"]:
+                data["videos"][key]["last_used"] = time.time()
+                self._save(data)
+        self.enforce()
+
+    # ---------- 跟踪 ----------
+
+    def track(self, key: str, paths: Iterable[Optional[str]], kind: str = "download"):
+        """记录视频的产物文件；已记录为 download 的文件不会被降级为 intermediate"""
+        if kind not in ARTIFACT_KINDS:
+            raise ValueError(f"Unknown artifact kind: {kind}")
+        files = {}
+        for path in paths:
+            p = self._managed(path) if path else None
+            if p is None or not p.is_file():
+                continue
+            files[str(p)] = p.stat().st_size
+        if not files:
+            return
+        with _LOCK:
+            data = self._load()
+            entry = data["videos"].setdefault(key, {"artifacts": {}})
+            entry["last_used"] = time.time()
+            for path, size in files.items():
+                prev = entry["artifacts"].get(path)
+                entry["artifacts"][path] = {
+                    "kind": "download" if prev and prev["kind"] == "download" else kind,
+                    "size": size,
+                }
+            self._save(data)
+
+    def track_ctx(self, key: str, ctx: dict):
+        """记录 Runner ctx 中的下载文件与中间音频"""
+        video = ctx.get("video")
+        if video is not None:
+            self.track(key, list(video.part_paths()) + [video.video_path, video.audio_path], "download")
+        audio_paths = list(ctx.get("audio_paths") or [])
+        # 流式模式下失败分P抽出的音频只在 ctx["parts"] 里
+        audio_paths += [getattr(p.audio_path, "wav_path", p.audio_path) for p in ctx.get("parts", [])]
+        self.track(key, audio_paths, "intermediate")
+
+    # ---------- 淘汰 ----------
+
+    def usage(self) -> int:
+        with _LOCK:
+            return sum(a["size"] for v in self._load()["videos"].values() for a in v["artifacts"].values())
+
+    def enforce(self) -> int:
+        """超过配额时按 LRU 淘汰未被 pin 的产物，返回释放的字节数"""
+        with _LOCK:
+            data = self._load()
+            videos = data["videos"]
+            # 刷新已被外部删除的文件
+            for entry in videos.values():
+                entry["artifacts"] = {p: a for p, a in entry["artifacts"].items() if os.path.exists(p)}
+            total = sum(a["size"] for v in videos.values() for a in v["artifacts"].values())
+            freed = 0
+            if total > self.max_bytes:
+                target = int(self.max_bytes * 0.9)
+                lru = sorted((k for k in videos if not self.is_pinned(k)),
+                             key=lambda k: videos[k].get("last_used", 0))
+                for kind in ARTIFACT_KINDS:
+                    for key in lru:
+                        if total <= target:
+                            break
+                        artifacts = videos[key]["artifacts"]
+                        for path in [p for p, a in artifacts.items() if a["kind"] == kind]:
+                            if self._remove(path):
+                                total -= artifacts[path]["size"]
+                                freed += artifacts.pop(path)["size"]
+                logging.info(f"[StorageManager] 淘汰 {freed / 1024 / 1024:.1f} MB，"
+                             f"当前占用 {total / 1024 / 1024:.1f} MB / 上限 {self.max_bytes / 1024 / 1024:.0f} MB")
+                if total > self.max_bytes:
+                    logging.warning("[StorageManager] 运行中的视频占用已超过配额，待其结束后再淘汰")
+            data["videos"] = {k: v for k, v in videos.items() if v["artifacts"] or self.is_pinned(k)}
+            self._save(data)
+            return freed
+
+    def _remove(self, path: str) -> bool:
+        p = Path(path)
+        try:
+            p.unlink()
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            logging.warning(f"[StorageManager] 删除失败 {p}: {e}")
+            return False
+        # 清理因此变空的分P目录（不越过下载根目录）
+        parent = p.parent
+        while parent != self.root and self.root in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+        return True
@@ -0,0 +1,223 @@
+# src/video2note/core/streaming.py
+"""
+流式执行模式：每个分P独立地依次经过 抽音 → 转写 → 摘要 → 同步，
+阶段之间用有界队列连接。某个分P一旦就绪即可进入下一阶段，
+整体耗时趋近于最慢阶段的耗时，而不是所有阶段耗时之和。
+"""
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List, Optional
+
+from video2note.config_manager.loader import get_config_value
+from video2note.core.exceptions import Video2NoteError
+from video2note.core.pipeline import TranscribeStage, SummarizeStage, SyncStage
+
+# 队列结束标记
+_DONE = object()
+
+
+class PartResult:
+    """单个分P在流式流水线中的状态与产物"""
+
+    def __init__(self, index: int, video_path: str):
+        self.index = index
+        self.video_path = video_path
+        self.audio_path: Optional[str] = None
+        self.audio_seconds: float = 0.0
+        # 抽音写出 / 上传到云端 ASR 的字节数
+        self.bytes_written: int = 0
+        self.bytes_uploaded: int = 0
+        # 与抽音一起提取的关键帧（None 表示由摘要阶段自行截帧）
+        self.keyframes = None
+        self.transcript = None
+        self.note = None
+        self.md_path: Optional[str] = None
+        self.sync_success: Optional[bool] = None
+        self.error: Optional[Exception] = None
+        self.failed_stage: Optional[str] = None
+
+    def __repr__(self):
+        return f"PartResult(P{self.index + 1}: {self.video_path}, error={self.error})"
+
+
+class _StageWorkers:
+    """
+    一个阶段的工作线程组：从 inbox 取分P，执行 fn，成功后放入 outbox。
+    所有线程都收到结束标记后，由最后一个退出的线程向下游转发结束标记。
+    """
+
+    def __init__(self, name: str, fn: Callable[[PartResult], None], inbox: queue.Queue,
+                 outbox: Optional[queue.Queue], workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+        self.workers = max(1, int(workers))
+        self._alive = self.workers
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"v2n-{self.name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def join(self):
+        for t in self._threads:
+            t.join()
+
+    def _loop(self):
+        while True:
+            part = self.inbox.get()
+            if part is _DONE:
+                # 把结束标记放回去，让同组其他线程也能退出
+                self.inbox.put(_DONE)
+                break
+            try:
+                self.fn(part)
+            except Exception as e:
+                logging.error(f"[StreamingPipeline] P{part.index + 1} {self.name} 失败: {e}")
+                part.error = e
+                part.failed_stage = self.name
+                continue
+            if self.outbox is not None:
+                self.outbox.put(part)
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last and self.outbox is not None:
+            self.outbox.put(_DONE)
+
+
+class StreamingPipeline:
+    """
+    用法：
+        pipeline = StreamingPipeline(config)
+        pipeline.start()
+        pipeline.submit(0, "P1.mp4")  # 每个分P下载完成后立即提交
+        ...
+        pipeline.close()
+        parts = pipeline.join()
+
+    配置（均可选）：
+        pipeline.queue_size          阶段间队列容量，默认 2
+        pipeline.workers.extract     抽音线程数，默认 1
+        pipeline.workers.transcribe  转写线程数，默认 1
+        pipeline.workers.summarize   摘要线程数，默认 1
+        pipeline.workers.sync        同步线程数，默认 1
+        pipeline.sync                是否执行同步阶段，默认 True
+    """
+
+    def __init__(self, config,
+                 transcribe_stage: Optional[TranscribeStage] = None,
+                 summarize_stage: Optional[SummarizeStage] = None,
+                 sync_stage: Optional[SyncStage] = None):
+        self.config = config
+        self.transcribe_stage = transcribe_stage or TranscribeStage(config)
+        self.summarize_stage = summarize_stage or SummarizeStage(config)
+        if sync_stage is None and get_config_value(config, "pipeline.sync", True):
+            sync_stage = SyncStage(config)
+        self.sync_stage = sync_stage
+
+        queue_size = int(get_config_value(config, "pipeline.queue_size", 2))
+        self._parts: Dict[int, PartResult] = {}
+        self._inbox: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        steps = [
+            ("extract", self._extract),
+            ("transcribe", self._transcribe),
+            ("summarize", self._summarize),
+        ]
+        if self.sync_stage is not None:
+            steps.append(("sync", self._sync))
+
+        self._groups: List[_StageWorkers] = []
+        inbox = self._inbox
+        for i, (name, fn) in enumerate(steps):
+            outbox = queue.Queue(maxsize=queue_size) if i < len(steps) - 1 else None
+            workers = get_config_value(config, f"pipeline.workers.{name}", 1)
+            self._groups.append(_StageWorkers(name, fn, inbox, outbox, workers))
+            inbox = outbox
+        self._started = False
+
+    # ---------- 各阶段的单分P处理 ----------
+
+    def _extract(self, part: PartResult):
+        # 有字幕的分P在这里直接得到 transcript，跳过抽音与转写
+        part.transcript = self.transcribe_stage.subtitle_transcript(part.video_path)
+        if part.transcript is None:
+            part.audio_path = self.transcribe_stage.prepare_audio(part.video_path)
+            part.keyframes = self.transcribe_stage.pop_keyframes(part.video_path)
+
+    def _transcribe(self, part: PartResult):
+        if part.transcript is None:
+            part.transcript = self.transcribe_stage.transcribe_part(part.audio_path)
+            stats = self.transcribe_stage.bytes_for(part.audio_path)
+            part.bytes_written, part.bytes_uploaded = stats["written"], stats["uploaded"]
+
+    def _summarize(self, part: PartResult):
+        result = self.summarize_stage.summarize_part(part.index, part.transcript, part.video_path,
+                                                     part.keyframes)
+        part.note = result["note"]
+        part.md_path = result["md_path"]
+
+    def _sync(self, part: PartResult):
+        part.sync_success = self.sync_stage.sync_part(part.note)
+
+    # ---------- 对外接口 ----------
+
+    def start(self):
+        if self._started:
+            return
+        # 提前创建各阶段的 provider 实例，避免多个工作线程并发懒加载时重复创建
+        self.transcribe_stage.get_transcriber()
+        self.summarize_stage.get_summarizer()
+        if self.sync_stage is not None:
+            self.sync_stage.get_syncer()
+        for group in self._groups:
+            group.start()
+        self._started = True
+
+    def submit(self, index: int, video_path: str):
+        """提交一个已就绪的分P；队列满时阻塞（背压）"""
+        if not self._started:
+            self.start()
+        part = PartResult(index, video_path)
+        self._parts[index] = part
+        self._inbox.put(part)
+
+    def close(self):
+        """声明不会再有新的分P提交"""
+        self._inbox.put(_DONE)
+
+    def join(self) -> List[PartResult]:
+        for group in self._groups:
+            group.join()
+        return [self._parts[i] for i in sorted(self._parts)]
+
+    def run(self, video_paths: List[str]) -> List[PartResult]:
+        self.start()
+        for idx, vp in enumerate(video_paths):
+            self.submit(idx, vp)
+        self.close()
+        return self.join()
+
+    @staticmethod
+    def collect(parts: List[PartResult], ctx: dict):
+        """把流式结果写回 ctx，与串行模式的 ctx 结构保持一致；有失败分P时抛错"""
+        ok = [p for p in parts if p.error is None]
+        ctx["transcripts"] = [p.transcript for p in ok]
+        ctx["transcript_sources"] = [p.video_path for p in ok]
+        ctx["audio_paths"] = [getattr(p.audio_path, "wav_path", p.audio_path) for p in ok]
+        ctx["keyframes"] = [p.keyframes for p in ok]
+        ctx["audio_bytes"] = [{"written": p.bytes_written, "uploaded": p.bytes_uploaded} for p in ok]
+        ctx["notes"] = [{"note": p.note, "md_path": p.md_path} for p in ok]
+        ctx["sync_success"] = all(p.sync_success is not False for p in ok)
+        ctx["parts"] = parts
+
+        failed = [p for p in parts if p.error is not None]
+        if failed:
+            detail = "; ".join(f"P{p.index + 1}@{p.failed_stage}: {p.error}" for p in failed)
+            raise Video2NoteError(f"{len(failed)}/{len(parts)} parts failed: {detail}")
@@ -0,0 +1,156 @@
+# src/video2note/core/watch.py
+"""
+监视目录模式（--mode watch）：轮询一个目录（例如 NAS 上的录播目录），
+把新增或变化的媒体文件送入批量流水线（BatchRunner，provider 为 local）。
+
+- 增量检测：size + mtime 未变的文件直接跳过；变化的文件需在两次轮询间保持不变
+  （仍在拷贝中的文件不处理），再比较内容 hash，只是 touch 过的文件不会重跑
+- 状态文件记录每个文件的 size / mtime / hash / 结果，重启后已处理的文件不会再处理
+- 并发由 batch.max_concurrency / batch.provider_limits 控制
+
+配置（均可选）：
+    watch.path           监视目录（--input 优先）
+    watch.interval       轮询间隔秒数，默认 30
+    watch.recursive      是否递归子目录，默认 true
+    watch.state_path     状态文件，默认 {watch.path}/.video2note_watch.json
+    watch.max_retries    失败文件的重试次数（文件未变化时），默认 2
+"""
+import copy
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from video2note.config_manager.loader import get_config_value
+from video2note.core.batch import BatchRunner
+from video2note.core.cache import hash_file
+from video2note.downloader.local_downloader import MEDIA_SUFFIXES
+from video2note.utils.file_utils import resolve_project_path
+
+
+class WatchState:
+    """{绝对路径: {size, mtime, hash, status, attempts, processed_at, error}}"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.files: Dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.files = json.load(f).get("files", {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"[FolderWatcher] 状态文件损坏，忽略: {self.path} ({e})")
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def get(self, path: str) -> Optional[dict]:
+        return self.files.get(path)
+
+    def record(self, path: str, size: int, mtime: float, digest: str, status: str, error: Optional[str] = None):
+        # 同一内容连续失败的次数；成功或内容变化后清零
+        prev = self.files.get(path, {})
+        attempts = 0
+        if status == "failed":
+            attempts = prev.get("attempts", 0) + 1 if prev.get("hash") == digest else 1
+        self.files[path] = {
+            "size": size,
+            "mtime": mtime,
+            "hash": digest,
+            "status": status,
+            "attempts": attempts,
+            "processed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "error": error,
+        }
+
+
+class FolderWatcher:
+    def __init__(self, config, path: Optional[str] = None):
+        root = path or get_config_value(config, "watch.path", None)
+        if not root:
+            raise ValueError("watch mode requires --input DIR or watch.path")
+        self.root = resolve_project_path(root)
+        self.interval = float(get_config_value(config, "watch.interval", 30))
+        self.recursive = bool(get_config_value(config, "watch.recursive", True))
+        self.max_retries = int(get_config_value(config, "watch.max_retries", 2))
+        state_path = get_config_value(config, "watch.state_path", None)
+        self.state = WatchState(resolve_project_path(state_path) if state_path
+                                else self.root / ".video2note_watch.json")
+
+        # 每个文件作为一个 local “视频”送入批量流水线；共享的 BatchRunner 让模型等在轮询之间保持加载
+        self.config = copy.deepcopy(config)
+        self.config.video.provider = "local"
+        self.runner = BatchRunner(self.config)
+        # 上一次轮询看到的 (size, mtime)，用于判断文件是否已写完
+        self._seen: Dict[str, tuple] = {}
+
+    def scan(self) -> Dict[str, tuple]:
+        """返回本轮需要处理的文件 {路径: (size, mtime, hash)}（已写完、且内容与上次处理成功时不同）"""
+        pattern = "**/*" if self.recursive else "*"
+        ready: Dict[str, tuple] = {}
+        seen: Dict[str, tuple] = {}
+        for p in sorted(self.root.glob(pattern)):
+            if not p.is_file() or p.suffix.lower() not in MEDIA_SUFFIXES or p.name.startswith("."):
+                continue
+            path = str(p.resolve())
+            st = p.stat()
+            sig = (st.st_size, st.st_mtime)
+            seen[path] = sig
+            entry = self.state.get(path)
+            if entry and (entry["size"], entry["mtime"]) == sig:
+                if entry["status"] == "done" or entry.get("attempts", 0) > self.max_retries:
+                    continue
+            elif self._seen.get(path) != sig:
+                # 新出现或仍在变化（拷贝中），等下一轮确认稳定后再处理
+                continue
+            digest = hash_file(path)
+            if entry and entry.get("hash") == digest and entry["status"] == "done":
+                # 只是 mtime 变了（touch / 复制时保留内容），更新记录即可
+                self.state.record(path, st.st_size, st.st_mtime, digest, "done")
+                continue
+            ready[path] = (st.st_size, st.st_mtime, digest)
+        self._seen = seen
+        return ready
+
+    def process(self, files: Dict[str, tuple]):
+        """把文件送入批量流水线并记录结果；没有文件时返回 None"""
+        if not files:
+            return None
+        logging.info(f"[FolderWatcher] 本轮处理 {len(files)} 个文件")
+        report = self.runner.run(list(files))
+        for job in report.jobs:
+            size, mtime, digest = files[job.url]
+            error = None if job.ok else str(job.error or "; ".join(
+                f"P{p.index + 1}@{p.failed_stage}: {p.error}" for p in job.parts if p.error is not None))
+            self.state.record(job.url, size, mtime, digest, "done" if job.ok else "failed", error)
+        return report
+
+    def poll(self):
+        """执行一轮 扫描 → 处理 → 保存状态"""
+        try:
+            return self.process(self.scan())
+        finally:
+            self.state.save()
+
+    def run(self, once: bool = False):
+        """
+        持续轮询；once=True 时只处理当前已存在的文件后返回（不等待跨轮询的稳定性确认）。
+        """
+        logging.info(f"[FolderWatcher] 监视 {self.root}，间隔 {self.interval:.0f}s，状态文件 {self.state.path}")
+        if once:
+            self.scan()  # 记录当前 size / mtime 作为稳定性基线
+            return self.poll()
+        while True:
+            try:
+                report = self.poll()
+                if report is not None:
+                    print(report.summary())
+            except Exception as e:
+                logging.error(f"[FolderWatcher] 本轮处理失败: {e}")
+            time.sleep(self.interval)
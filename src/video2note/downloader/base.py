@@ -1,6 +1,7 @@
 # src/video2note/downloader/base.py
 
 from abc import ABC, abstractmethod
+from typing import Callable, Optional
 
 
 class VideoDownloader(ABC):
@@ -8,9 +9,10 @@ class VideoDownloader(ABC):
         self.config = config
 
     @abstractmethod
-    def download(self, url: str):
+    def download(self, url: str, on_part: Optional[Callable[[int, str], None]] = None):
         """
         下载给定 url 的视频 / 音频 /截帧等，并返回 Video 对象（在 types.video 中定义）
+        on_part(分P下标, 文件路径)：可选，每个分P就绪时回调，便于下游在整个合集下载完之前开始处理
         """
         raise NotImplementedError
 
@@ -25,5 +27,8 @@ class DownloaderFactory:
         elif provider == "bilibili":
             from video2note.downloader.bilibili_downloader import BilibiliDownloader
             return BilibiliDownloader(config)
+        elif provider == "local":
+            from video2note.downloader.local_downloader import LocalDownloader
+            return LocalDownloader(config)
         else:
             raise ValueError(f"Unsupported video provider: {provider}")
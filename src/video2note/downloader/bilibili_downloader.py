@@ -2,18 +2,23 @@
 
 import asyncio
 import logging
-import os
+import shutil
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Optional, List
 
 import bilix.sites.bilibili.api
 from bilix.exception import APIError, APIResourceError, APIUnsupportedError
 from bilix.sites.bilibili import DownloaderBilibili
 
-from utils import ensure_dir, logger
+from video2note.config_manager.loader import get_config_value
+from video2note.utils.file_utils import ensure_dir
+from video2note.utils.aio import run_in_thread
 from video2note.downloader.base import VideoDownloader
+from video2note.downloader.download_index import DownloadIndex, bvid_from_url
 from video2note.types.video import DownloadedVideo
 
+logger = logging.getLogger(__name__)
+
 
 class BilibiliDownloader(VideoDownloader):
     def __init__(self, config):
@@ -34,26 +39,54 @@ class BilibiliDownloader(VideoDownloader):
 
         # 取你可能设置的帧间隔（以后截帧使用，可选）
         self.frame_interval = getattr(config.video, "frame_interval", 10)
-        self.quality = getattr(config.video, "quality", "best")
+        self.quality = self._bilix_quality(getattr(config.video, "quality", "best"))
+        # 仅下载 DASH 音频流：转写只需要音轨；开启关键帧提取时才下载视频
+        self.audio_only = bool(getattr(config.video, "audio_only", True)) \
+            and not get_config_value(config, "keyframes.enabled", False)
+        self.media_kind = "audio" if self.audio_only else "video"
+        # 同时下载的分P数
+        self.part_concurrency = max(1, int(getattr(config.video, "part_concurrency", 3)))
         logging.info(f"[BilibiliDownloader] download_root = {self.download_root}")
         # Bilibili 特定配置，比如 cookies
         self.cookies_path: Optional[str] = getattr(config.video.login, "cookies_path", None)
+        # 本地下载索引（bvid → cid → 文件），重复处理同一视频时跳过已完整的分P
+        self.index: Optional[DownloadIndex] = (
+            DownloadIndex(self.download_root) if getattr(config.video, "download_index", True) else None
+        )
 
-
-
-    def download(self, url: str) -> DownloadedVideo:
+    def download(self, url: str, on_part: Optional[Callable[[int, str], None]] = None) -> DownloadedVideo:
         """
         同步接口（对外），内部调用异步代码。
         将下载的视频文件 /音频 /（可选帧）封装为 DownloadedVideo 返回。
+        下载索引中已完整且校验通过的视频直接返回，不访问网络。
+        on_part(分P下标, 文件路径) 在每个分P就绪时回调（完成顺序，不一定按分P顺序）。
         """
         ensure_dir(self.download_root)
 
-        # 异步执行主下载逻辑
-        video_files = asyncio.run(self._download_bilibili_video_async(url))
+        video_files = None
+        bvid = bvid_from_url(url)
+        if self.index is not None and bvid:
+            video_files = self.index.lookup(bvid, self.media_kind)
+            if video_files:
+                logger.info(f"[BilibiliDownloader] 下载索引命中 {bvid}，{len(video_files)} 个分P均已完整，跳过下载")
+                if on_part is not None:
+                    for idx, path in enumerate(video_files):
+                        on_part(idx, path)
+
+        if not video_files:
+            # 异步执行主下载逻辑
+            video_files = asyncio.run(self._download_bilibili_video_async(url, on_part))
 
-        # video_files 为按顺序的分P视频路径列表
+        # video_files 为按顺序的分P文件路径列表（仅音频模式下为音频文件）
         primary = video_files[0] if video_files else None
 
+        if self.audio_only:
+            return DownloadedVideo(
+                video_path=None,
+                audio_path=primary,
+                duration=None,
+                meta={"all_video_paths": [], "all_audio_paths": video_files, "audio_only": True}
+            )
         return DownloadedVideo(
             video_path=primary,
             audio_path="",
@@ -62,18 +95,96 @@ class BilibiliDownloader(VideoDownloader):
             meta={"all_video_paths": video_files}
         )
 
-    async def _download_bilibili_video_async(self, url: str) -> List[str]:
+    @staticmethod
+    def _bilix_quality(quality):
+        """
+        把配置中的画质转换成 bilix 的 quality 参数：
+        best → 0（可观看的最高画质）；整数按 bilix 语义原样传入（越大画质越低）；
+        "720" / "1080" 等数字字符串补成 "720P"；其余字符串（如 "1080P 60帧"）原样按名称匹配。
+        """
+        if quality is None or str(quality).lower() == "best":
+            return 0
+        if isinstance(quality, int):
+            return quality
+        quality = str(quality).strip()
+        return f"{quality}P" if quality.isdigit() else quality
+
+    @staticmethod
+    async def _page_keys(d, bvid: Optional[str], count: int) -> List[str]:
+        """
+        每个分P在索引中的键：优先用 cid（分P被 UP 主调整顺序后仍能对上），
+        取不到时退化为 p<序号>。
+        """
+        fallback = [f"p{i + 1}" for i in range(count)]
+        if not bvid:
+            return fallback
+        try:
+            res = await d.client.get("https://api.bilibili.com/x/player/pagelist", params={"bvid": bvid})
+            data = res.json().get("data") or []
+            cids = [str(item["cid"]) for item in sorted(data, key=lambda x: x.get("page", 0))]
+            if len(cids) == count:
+                return cids
+        except Exception as e:
+            logger.warning(f"[BilibiliDownloader] 获取分P cid 失败，按分P序号建立索引: {e}")
+        return fallback
+
+    def _find_part_file(self, part_dir: Path) -> Optional[str]:
+        """
+        分P目录下的媒体文件（字幕等附加文件在 extra/ 子目录中）；有多个时取最大的。
+        bilix 把 DASH 音频（fMP4 容器）保存为 .aac，这里改名为 .m4a，便于 ffmpeg / 转写服务按扩展名识别。
+        """
+        if self.audio_only:
+            extensions = (".aac", ".m4a", ".flac", ".eac3")
+        else:
+            extensions = (".mp4", ".flv", ".mkv", ".webm")
+        candidates = [p for p in part_dir.iterdir() if p.is_file() and p.suffix.lower() in extensions]
+        if not candidates:
+            return None
+        path = max(candidates, key=lambda p: p.stat().st_size)
+        if path.suffix.lower() == ".aac":
+            path = path.rename(path.with_suffix(".m4a"))
+        return str(path)
+
+    async def _download_part(self, d, sema: asyncio.Semaphore, idx: int, page_url: str, key: str,
+                             out_base: Path, safe_vid: str) -> str:
+        """在并发上限内下载单个分P到 {out_base}/P{idx+1:03d}/{kind}/，记入下载索引并返回文件路径"""
+        async with sema:
+            part_dir = out_base / f"P{idx + 1:03d}" / self.media_kind
+            # 清掉上次中断留下的残缺文件，否则 bilix 会把同名文件当作“已存在”跳过
+            shutil.rmtree(part_dir, ignore_errors=True)
+            ensure_dir(part_dir)
+            await d.get_video(
+                url=page_url,
+                path=part_dir,
+                quality=self.quality,
+                subtitle=True,  # 下载字幕
+                image=False,  # 不下载封面
+                only_audio=self.audio_only,
+            )
+            path = self._find_part_file(part_dir)
+            if path is None:
+                raise FileNotFoundError(f"分P {idx + 1} 下载后未找到{'音频' if self.audio_only else '视频'}文件: {part_dir}")
+            if self.index is not None:
+                self.index.record_part(safe_vid, key, idx + 1, path)
+            logger.info(f"[BilibiliDownloader] P{idx + 1} 下载完成: {path}")
+            return path
+
+    async def _download_bilibili_video_async(self, url: str,
+                                             on_part: Optional[Callable[[int, str], None]] = None) -> List[str]:
         """
         内部异步下载实现，依赖 bilix DownloaderBilibili（如果可用）。
-        下载路径组织：
-            {download_root}/{video_id}/{files...}
-        返回: 所有视频文件的完整路径列表（按创建时间排序）
+        下载路径组织（每个分P一个子目录，分P顺序由目录名决定；音频 / 视频分开存放）：
+            {download_root}/{video_id}/P001/{audio|video}/{files...}
+        已在下载索引中且校验通过的分P直接复用，只下载缺失或被截断的分P；
+        缺失的分P作为独立任务并发下载（video.part_concurrency），共享同一个 bilix client。
+        返回: 所有分P文件的完整路径列表（按分P顺序；仅音频模式下为音频文件）
         """
 
         if DownloaderBilibili is None:
             raise RuntimeError("bilix DownloaderBilibili is not available. Please install bilix.")
 
-        d = DownloaderBilibili()
+        # 并发由下面的 Semaphore 控制，bilix 自身的视频并发数设为相同值，避免二次排队
+        d = DownloaderBilibili(video_concurrency=self.part_concurrency)
 
         # 获取视频信息用于命名（bvid /aid /title）
         try:
@@ -81,6 +192,7 @@ class BilibiliDownloader(VideoDownloader):
             video_info = await bilix.sites.bilibili.api.get_video_info(d.client, url)
         except Exception as e:
             logging.error(f"[BilibiliDownloader] 解析视频信息失败: {e}")
+            await d.aclose()
             raise
 
         # 构造输出目录
@@ -91,31 +203,42 @@ class BilibiliDownloader(VideoDownloader):
 
         logging.info(f"[BilibiliDownloader] download base dir: {out_base}")
 
+        async def _notify(idx: int, path: str):
+            # 回调可能阻塞（例如流式流水线的背压），放到线程里执行，不阻塞其他分P的下载
+            if on_part is not None:
+                await run_in_thread(on_part, idx, path)
+
         try:
-            # 如果多分P，使用 get_series，否则 get_video
             pages = getattr(video_info, "pages", []) or []
+            page_urls = [p.p_url for p in pages] or [url]
+            keys = await self._page_keys(d, getattr(video_info, "bvid", None), len(page_urls))
+            keys = [DownloadIndex.part_key(self.media_kind, k) for k in keys]
+            verified = self.index.verified_parts(safe_vid, self.media_kind) if self.index is not None else {}
+            if self.index is not None:
+                self.index.mark(safe_vid, video_info.title, keys, complete=False, kind=self.media_kind)
 
-            # 2. 根据分P数量选择API：pages长度>1则为合集，调用get_series；否则调用get_video
-            if len(video_info.pages) > 1:
-                logger.info(f"[BilibiliDownloader] 检测到合集，分P数 {len(video_info.pages)}，使用get_series下载")
-                await d.get_series(
-                    url=url,
-                    path=out_base,
-                    quality=80,  # 720p（非会员可用）
-                    subtitle=True,  # 下载字幕
-                    image=False,  # 不下载封面
-                    p_range=None  # 下载全部分P（如需指定范围可传(1,3)下载P1-P3）
-                )
-            else:
-                logger.info(f"[BilibiliDownloader] 检测到单P视频，使用get_video下载")
-                # 调用单视频下载API
-                await d.get_video(
-                    url=url,
-                    path=out_base,
-                    quality=80,
-                    subtitle=True,
-                    image=False
-                )
+            logger.info(f"[BilibiliDownloader] 分P数 {len(page_urls)}（{'仅音频' if self.audio_only else '视频'}），"
+                        f"索引中已完整 {sum(1 for k in keys if k in verified)} 个，并发 {self.part_concurrency}")
+            found: List[Optional[str]] = [verified.get(k) for k in keys]
+            for idx, path in enumerate(found):
+                if path is not None:
+                    await _notify(idx, path)
+
+            sema = asyncio.Semaphore(self.part_concurrency)
+
+            async def _fetch(idx: int):
+                found[idx] = await self._download_part(d, sema, idx, page_urls[idx], keys[idx], out_base, safe_vid)
+                await _notify(idx, found[idx])
+
+            results = await asyncio.gather(*[_fetch(i) for i, path in enumerate(found) if path is None],
+                                           return_exceptions=True)
+            # 已完成的分P都已写入索引，重试时只会下载失败的分P
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                raise errors[0]
+
+            if self.index is not None:
+                self.index.mark(safe_vid, video_info.title, keys, complete=True, kind=self.media_kind)
             logger.info(f"[BilibiliDownloader] 下载完成至 {out_base}")
 
         except (APIResourceError, APIUnsupportedError) as e:
@@ -133,18 +256,5 @@ class BilibiliDownloader(VideoDownloader):
             except Exception:
                 pass
 
-        # 收集所有视频文件（只查 out_base）
-        video_extensions = (".mp4", ".flv", ".mkv", ".webm")
-        found: List[str] = []
-        for root, _, files in os.walk(out_base):
-            for f in files:
-                if f.lower().endswith(video_extensions):
-                    found.append(os.path.join(root, f))
-        # 按创建时间排序（先下载的在前）
-        found.sort(key=lambda x: os.path.getctime(x))
-        if not found:
-            raise FileNotFoundError(f"下载目录 {out_base} 中未找到视频文件")
-
-        logger.info(f"[BilibiliDownloader] 共找到 {len(found)} 个视频文件（按分P顺序）")
+        logger.info(f"[BilibiliDownloader] 共找到 {len(found)} 个{'音频' if self.audio_only else '视频'}文件（按分P顺序）")
         return found
-
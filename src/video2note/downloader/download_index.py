@@ -0,0 +1,175 @@
+# src/video2note/downloader/download_index.py
+"""
+本地下载索引：{download_root}/download_index.json
+
+按 bvid → "<kind>:<cid>" 记录每个分P已下载文件的相对路径、大小、mtime 与快速校验和，
+kind 为 video（带音轨的视频）或 audio（仅音频下载），两种下载互不覆盖。
+重复处理同一视频（例如换一个摘要 prompt 重跑）时：
+- 索引标记为完整且所有分P校验通过 → 直接返回，不访问网络、不遍历目录
+- 否则只下载缺失或被截断（大小 / 校验和不一致）的分P
+
+快速校验和取 文件大小 + 头尾各 1MiB 的 sha1，GB 级视频也只需读 2MiB；
+size 与 mtime 都未变化时连这 2MiB 也不读。
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_BVID_RE = re.compile(r"(BV[0-9A-Za-z]{10})")
+
+# 同一进程内多个下载器（批量模式）共享同一个索引文件
+_FILE_LOCK = threading.Lock()
+
+QUICK_CHUNK = 1 << 20
+
+
+def bvid_from_url(url: str) -> Optional[str]:
+    m = _BVID_RE.search(url or "")
+    return m.group(1) if m else None
+
+
+def quick_checksum(path, size: Optional[int] = None) -> str:
+    """sha1(size + 头 1MiB + 尾 1MiB)"""
+    size = os.path.getsize(path) if size is None else size
+    h = hashlib.sha1(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        h.update(f.read(QUICK_CHUNK))
+        if size > QUICK_CHUNK:
+            f.seek(max(QUICK_CHUNK, size - QUICK_CHUNK))
+            h.update(f.read(QUICK_CHUNK))
+    return h.hexdigest()
+
+
+class DownloadIndex:
+    FILENAME = "download_index.json"
+    VERSION = 1
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.path = self.root / self.FILENAME
+
+    # ---------- 文件读写 ----------
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {"version": self.VERSION, "videos": {}}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            data.setdefault("videos", {})
+            return data
+        except (OSError, ValueError) as e:
+            logging.warning(f"[DownloadIndex] 索引损坏，忽略: {self.path} ({e})")
+            return {"version": self.VERSION, "videos": {}}
+
+    def _update(self, bvid: str, fn):
+        """读-改-写单个视频条目；其他视频的条目保持磁盘上的最新状态"""
+        with _FILE_LOCK:
+            data = self._load()
+            entry = data["videos"].setdefault(bvid, {"parts": {}})
+            fn(entry)
+            entry["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+
+    def entry(self, bvid: str) -> dict:
+        with _FILE_LOCK:
+            return self._load()["videos"].get(bvid, {"parts": {}})
+
+    # ---------- 校验 ----------
+
+    def _abs(self, rel: str) -> Path:
+        p = Path(rel)
+        return p if p.is_absolute() else self.root / p
+
+    def verify_part(self, part: dict) -> Optional[str]:
+        """分P文件完整时返回其绝对路径，缺失 / 截断 / 校验和不一致时返回 None"""
+        path = self._abs(part.get("path", ""))
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if st.st_size != part.get("size"):
+            logging.info(f"[DownloadIndex] 文件大小不一致（可能被截断）: {path}")
+            return None
+        if st.st_mtime != part.get("mtime") and quick_checksum(path, st.st_size) != part.get("checksum"):
+            logging.info(f"[DownloadIndex] 校验和不一致: {path}")
+            return None
+        return str(path)
+
+    @staticmethod
+    def part_key(kind: str, cid: str) -> str:
+        return f"{kind}:{cid}"
+
+    def verified_parts(self, bvid: str, kind: str = "video") -> Dict[str, str]:
+        """{part_key: 绝对路径}，只包含 kind 类型且校验通过的分P"""
+        verified = {}
+        for key, part in self.entry(bvid).get("parts", {}).items():
+            if not key.startswith(f"{kind}:"):
+                continue
+            path = self.verify_part(part)
+            if path:
+                verified[key] = path
+        return verified
+
+    def lookup(self, bvid: str, kind: str = "video") -> Optional[List[str]]:
+        """
+        索引中 kind 类型标记为完整且所有分P都校验通过时，返回按分P顺序的路径列表；否则返回 None。
+        """
+        entry = self.entry(bvid)
+        complete = entry.get("complete")
+        if not isinstance(complete, dict) or not complete.get(kind):
+            return None
+        parts = [p for k, p in entry.get("parts", {}).items() if k.startswith(f"{kind}:")]
+        if not parts or len(parts) != entry.get("pages"):
+            return None
+        ordered = sorted(parts, key=lambda p: p.get("page", 0))
+        paths = []
+        for part in ordered:
+            path = self.verify_part(part)
+            if path is None:
+                return None
+            paths.append(path)
+        return paths
+
+    # ---------- 写入 ----------
+
+    def record_part(self, bvid: str, key: str, page: int, path):
+        path = Path(path)
+        st = path.stat()
+        try:
+            rel = str(path.resolve().relative_to(self.root.resolve()))
+        except ValueError:
+            rel = str(path.resolve())
+        record = {
+            "page": page,
+            "path": rel,
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+            "checksum": quick_checksum(path, st.st_size),
+        }
+        self._update(bvid, lambda e: e["parts"].__setitem__(key, record))
+
+    def mark(self, bvid: str, title: str, keys: List[str], complete: bool, kind: str = "video"):
+        """更新视频条目；标记完整时丢弃 kind 类型中不在 keys 里的旧分P（分P被删除或替换）"""
+
+        def _set(e):
+            e["title"] = title
+            e["pages"] = len(keys)
+            if not isinstance(e.get("complete"), dict):
+                e["complete"] = {}
+            e["complete"][kind] = complete
+            if complete:
+                e["parts"] = {k: v for k, v in e.get("parts", {}).items()
+                              if k in keys or not k.startswith(f"{kind}:")}
+
+        self._update(bvid, _set)
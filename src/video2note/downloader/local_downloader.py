@@ -0,0 +1,63 @@
+# src/video2note/downloader/local_downloader.py
+"""
+本地媒体“下载器”：url 为本地文件路径（或 file:// URL）或目录。
+- 文件：作为单个分P
+- 目录：目录下的媒体文件按文件名自然排序作为各分P（不递归）
+文件原地使用，不做复制。
+"""
+import logging
+import re
+from pathlib import Path
+from typing import Callable, List, Optional
+from urllib.parse import unquote, urlparse
+
+from video2note.downloader.base import VideoDownloader
+from video2note.types.video import DownloadedVideo
+
+VIDEO_SUFFIXES = (".mp4", ".mkv", ".mov", ".flv", ".webm", ".avi", ".ts")
+AUDIO_FILE_SUFFIXES = (".wav", ".mp3", ".m4a", ".flac", ".aac", ".ogg", ".opus")
+MEDIA_SUFFIXES = VIDEO_SUFFIXES + AUDIO_FILE_SUFFIXES
+
+
+def local_path_from_url(url: str) -> Path:
+    if url.startswith("file://"):
+        return Path(unquote(urlparse(url).path))
+    return Path(url).expanduser()
+
+
+def _natural_key(path: Path):
+    # P2 排在 P10 前面
+    return [int(t) if t.isdigit() else t.lower() for t in re.split(r"(\d+)", path.name)]
+
+
+class LocalDownloader(VideoDownloader):
+    def download(self, url: str, on_part: Optional[Callable[[int, str], None]] = None) -> DownloadedVideo:
+        src = local_path_from_url(url).resolve()
+        if src.is_dir():
+            files = sorted((p for p in src.iterdir() if p.is_file() and p.suffix.lower() in MEDIA_SUFFIXES),
+                           key=_natural_key)
+        elif src.is_file():
+            files = [src]
+        else:
+            raise FileNotFoundError(f"[LocalDownloader] 路径不存在: {src}")
+        if not files:
+            raise FileNotFoundError(f"[LocalDownloader] 目录中没有媒体文件: {src}")
+
+        paths: List[str] = [str(p) for p in files]
+        logging.info(f"[LocalDownloader] {src}: {len(paths)} 个分P")
+        if on_part is not None:
+            for idx, path in enumerate(paths):
+                on_part(idx, path)
+
+        if all(p.suffix.lower() in AUDIO_FILE_SUFFIXES for p in files):
+            return DownloadedVideo(
+                video_path=None,
+                audio_path=paths[0],
+                meta={"all_video_paths": [], "all_audio_paths": paths, "source": "local"},
+            )
+        return DownloadedVideo(
+            video_path=paths[0],
+            audio_path="",
+            frame_paths=paths,
+            meta={"all_video_paths": paths, "source": "local"},
+        )
@@ -9,7 +9,7 @@ class YouTubeDownloader(VideoDownloader):
         super().__init__(config)
         # 你原来的 YouTube 下载配置可以拿进来，比如 api_key,保存目录等
 
-    def download(self, url: str) -> DownloadedVideo:
+    def download(self, url: str, on_part=None) -> DownloadedVideo:
         # 这里写你原先在 downloader.py 中对 YouTube 的逻辑
         # 例如用 pytube / youtube_dl / yt-dlp 实现视频下载
         # 然后提取音频 /生成音频文件路径 /截帧等
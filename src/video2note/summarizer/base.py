@@ -3,6 +3,7 @@
 import os
 from abc import ABC, abstractmethod
 
+from video2note.core.cache import settings_signature
 from video2note.types.note import Note
 from video2note.utils.file_utils import ensure_dir
 from video2note.utils.logger import logging
@@ -20,6 +21,12 @@ class Summarizer(ABC):
         """
         raise NotImplementedError
 
+    def cache_signature(self) -> dict:
+        """
+        参与缓存 key 计算的 provider / 模型 / prompt 等设置；设置变化后旧缓存自然失效。
+        """
+        return settings_signature(self)
+
 
 class SummarizerFactory:
     @staticmethod
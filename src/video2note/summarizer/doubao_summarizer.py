@@ -3,11 +3,21 @@
 from video2note.summarizer.base import Summarizer
 from video2note.types.note import Note, NoteSection
 from video2note.core.exceptions import SummarizationError
+from video2note.utils.http import get_session, http_timeout
 from video2note.utils.logger import logging
 
-import requests
 
 class DoubaoSummarizer(Summarizer):
+    def cache_signature(self) -> dict:
+        doubao_cfg = self.config.providers.doubao
+        return {
+            "class": type(self).__name__,
+            "endpoint": getattr(doubao_cfg, "endpoint", "https://api.doubao.com/v1/chat/completions"),
+            "model": getattr(self.config.ai, "model", "doubao-pro"),
+            "temperature": getattr(self.config.ai, "temperature", 0.7),
+            "prompt_template": getattr(doubao_cfg, "prompt_template", "{{transcript}}"),
+        }
+
     def summarize(self, text: str, frames: list[str] | None = None) -> Note:
         doubao_cfg = self.config.providers.doubao
         api_key = doubao_cfg.api_key
@@ -24,7 +34,8 @@ class DoubaoSummarizer(Summarizer):
 
         logging.info(f"[DoubaoSummarizer] 使用模型 {model} 生成笔记")
         try:
-            resp = requests.post(
+            # 共享连接池：各分P复用 keep-alive 连接，不再每次握手
+            resp = get_session(self.config).post(
                 url=endpoint,
                 headers={
                     "Authorization": f"Bearer {api_key}",
@@ -35,7 +46,7 @@ class DoubaoSummarizer(Summarizer):
                     "messages": [{"role": "user", "content": prompt}],
                     "temperature": temperature
                 },
-                timeout=60
+                timeout=http_timeout(self.config)
             )
             resp.raise_for_status()
             content = resp.json()["choices"][0]["message"]["content"]
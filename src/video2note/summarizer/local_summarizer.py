@@ -6,6 +6,10 @@ from video2note.core.exceptions import SummarizationError
 from video2note.utils.logger import logging
 
 class LocalSummarizer(Summarizer):
+    def cache_signature(self) -> dict:
+        method = getattr(self.config.providers.local, "summarizer", "rule").lower()
+        return {"class": type(self).__name__, "method": method}
+
     def summarize(self, text: str, frames: list[str] | None = None) -> Note:
         try:
             local_cfg = self.config.providers.local
@@ -3,6 +3,7 @@
 from video2note.summarizer.base import Summarizer
 from video2note.types.note import Note, NoteSection
 from video2note.core.exceptions import SummarizationError
+from video2note.utils.http import get_httpx_client
 from video2note.utils.logger import logging
 
 import openai
@@ -14,7 +15,8 @@ class OpenAISummarizer(Summarizer):
         self.api_key = openai_cfg.api_key
         if not self.api_key:
             raise ValueError("OpenAI API key not set")
-        openai.api_key = self.api_key
+        # 客户端实例持有 api_key，连接走进程级共享的 httpx 连接池
+        self.client = openai.OpenAI(api_key=self.api_key, http_client=get_httpx_client(config))
 
         self.model = openai_cfg.model
         self.temperature = getattr(openai_cfg, "temperature", 0.7)
@@ -25,7 +27,7 @@ class OpenAISummarizer(Summarizer):
         try:
             frames_str = "\n".join(frames) if frames else ""
             prompt = self.prompt_template.replace("{{transcript}}", text).replace("{{frames}}", frames_str)
-            response = openai.ChatCompletion.create(
+            response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=self.temperature
@@ -14,7 +14,6 @@ class QwenSummarizer(Summarizer):
         self.api_key = qwen_cfg.api_key
         if not self.api_key:
             raise ValueError("Qwen API key not configured")
-        dashscope.api_key = self.api_key
 
         # 模型 /温度
         self.model = getattr(self.config.ai, "model", "qwen-plus")
@@ -28,6 +27,7 @@ class QwenSummarizer(Summarizer):
             prompt = self.prompt_template.replace("{{transcript}}", text).replace("{{frames}}", frames_str)
             response = dashscope.Generation.call(
                 model=self.model,
+                api_key=self.api_key,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=self.temperature
             )
@@ -6,16 +6,57 @@ Transcriber 抽象基类与辅助函数
 """
 import logging
 import os
+import re
 import subprocess
+import tempfile
 import typing
+import wave
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-from utils import ensure_dir, logger
+from video2note.utils.file_utils import ensure_dir
+from video2note.core.cache import settings_signature
 from video2note.types.transcript import Transcript
+from video2note.utils.aio import run_in_thread
+from video2note.utils.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class PCMAudio:
+    """
+    内存中的单声道 float32 PCM（由 decode_audio 经 ffmpeg 管道解码一次得到）。
+    wav_path 为可选的落盘副本（由同一份 buffer 写出，不再二次解码）。
+    """
+
+    def __init__(self, samples, sample_rate: int = 16000, source: str = "", wav_path: typing.Optional[str] = None):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.source = source
+        self.wav_path = wav_path
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / float(self.sample_rate)
+
+    def __str__(self):
+        return self.wav_path or self.source
 
 
 class Transcriber(ABC):
+    # 为 True 表示 transcribe_array 直接消费内存中的 PCM，无需落盘 / 二次解码
+    supports_array_input = False
+    # 为 True 表示可以同时转写多个分P（云端 API）；本地模型在 TranscribeStage 中一次只转写一个
+    supports_concurrency = False
+    # 为 True 表示音频会上传到云端；TranscribeStage 据此统计上传字节数
+    uploads_audio = False
+    # 抽音时使用的中间音频编码（见 AUDIO_CODECS）：本地模型用 pcm，云端 provider 可在配置中改为压缩格式
+    audio_codec = "pcm"
+    audio_bitrate: typing.Optional[str] = None
+    # 云端 provider 的长音频分块上传（cloud_chunking.ChunkedUpload），未启用时为 None
+    chunked_upload = None
+
     def __init__(self, config):
         self.config = config
 
@@ -26,6 +67,36 @@ class Transcriber(ABC):
         """
         raise NotImplementedError
 
+    def transcribe_array(self, samples, sample_rate: int = 16000) -> Transcript:
+        """
+        转写内存中的 float32 单声道 PCM。
+        默认实现写出临时 wav 再调用 transcribe；支持数组输入的 provider 应覆盖此方法。
+        """
+        with tempfile.TemporaryDirectory(prefix="v2n-pcm-") as tmp:
+            wav_path = write_wav(samples, os.path.join(tmp, "audio.wav"), sample_rate)
+            return self.transcribe(wav_path)
+
+    async def atranscribe(self, audio_path: str) -> Transcript:
+        """
+        异步转写单个音频文件。默认把 transcribe 放到线程池执行（本地模型）；
+        云端 provider 覆盖为原生异步请求。
+        """
+        return await run_in_thread(self.transcribe, audio_path)
+
+    def uploaded_bytes(self, audio_path: str) -> int:
+        """最近一次转写 audio_path 时上传的字节数；本地模型为 0，分块上传时为各块压缩后的大小之和"""
+        if not self.uploads_audio:
+            return 0
+        if self.chunked_upload is not None and audio_path in self.chunked_upload.uploaded:
+            return self.chunked_upload.uploaded.pop(audio_path)
+        return os.path.getsize(audio_path)
+
+    def cache_signature(self) -> dict:
+        """
+        参与缓存 key 计算的 provider / 模型等设置；设置变化后旧缓存自然失效。
+        """
+        return settings_signature(self)
+
 
 class TranscriberFactory:
     @staticmethod
@@ -58,67 +129,259 @@ class TranscriberFactory:
 # 音频提取
 # -------------------------------
 
+# 中间音频编码：{名称: (文件后缀, ffmpeg 编码参数, 默认码率)}；pcm / flac 为无损，码率不适用
+AUDIO_CODECS = {
+    "pcm": (".wav", ["-acodec", "pcm_s16le"], None),
+    "flac": (".flac", ["-acodec", "flac"], None),
+    "opus": (".ogg", ["-acodec", "libopus", "-application", "voip"], "32k"),
+    "mp3": (".mp3", ["-acodec", "libmp3lame"], "64k"),
+}
+
+
+def audio_codec_args(codec: str = "pcm", bitrate: typing.Optional[str] = None) -> typing.Tuple[str, typing.List[str]]:
+    """返回 (文件后缀, ffmpeg 编码参数)；bitrate 为空时使用该编码的默认码率"""
+    try:
+        suffix, args, default_bitrate = AUDIO_CODECS[str(codec).lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported audio codec: {codec} (可选 {', '.join(AUDIO_CODECS)})")
+    bitrate = bitrate or default_bitrate
+    return suffix, args + (["-b:a", str(bitrate)] if bitrate and default_bitrate else [])
 
-def extract_audio(video_file: str, audio_dir: str, sample_rate: int = 16000) -> typing.Optional[str]:
+
+def _run_extract_audio(video_file: str, audio_dir: str, sample_rate: int = 16000, codec: str = "pcm",
+                       bitrate: typing.Optional[str] = None) -> str:
     """
-    从视频文件抽取音频到指定目录，返回音频文件路径（wav PCM 16k mono）。
-    若失败返回 None（调用方应处理异常）。
+    extract_audio 的实际实现：成功返回音频路径，失败抛出 RuntimeError（附 ffmpeg 错误信息）。
     """
+    suffix, codec_args = audio_codec_args(codec, bitrate)
     video_file = str(video_file)
     audio_dir = str(audio_dir)
     ensure_dir(audio_dir)
 
     video_p = Path(video_file)
     if not video_p.exists():
-        logging.error(f"[extract_audio] video file not found: {video_file}")
-        return None
-    audio_filename = video_p.stem + ".wav"
+        raise RuntimeError(f"video file not found: {video_file}")
+    audio_filename = video_p.stem + suffix
     audio_path = os.path.join(audio_dir, audio_filename)
 
     cmd = [
         "ffmpeg", "-y",
         "-i", video_file,
         "-vn",
-        "-acodec", "pcm_s16le",
+        *codec_args,
         "-ar", str(sample_rate),
         "-ac", "1",
         audio_path
     ]
 
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
-        logger.info(f"[extract_audio] 音频提取完成: {audio_path}")
-        return audio_path
+        with get_tracer().external("ffmpeg.extract_audio", part=video_p.name):
+            subprocess.run(cmd, check=True, capture_output=True)
     except subprocess.CalledProcessError as e:
-        logging.error(f"[extract_audio] ffmpeg 音频提取失败: {e.stderr.decode(errors='ignore') if e.stderr else e}")
-        return None
+        detail = e.stderr.decode(errors='ignore').strip()[-500:] if e.stderr else str(e)
+        raise RuntimeError(f"ffmpeg 音频提取失败: {detail}")
+    logger.info(f"[extract_audio] 音频提取完成: {audio_path}（{codec}，{os.path.getsize(audio_path) / 1024:.0f} KB）")
+    return audio_path
+
+
+def extract_audio(video_file: str, audio_dir: str, sample_rate: int = 16000, codec: str = "pcm",
+                  bitrate: typing.Optional[str] = None) -> typing.Optional[str]:
+    """
+    从视频文件抽取音频到指定目录，返回音频文件路径（16k mono）。
+    codec 见 AUDIO_CODECS：默认 pcm（wav），云端转写可用 opus / flac / mp3 减小体积。
+    若失败返回 None（调用方应处理异常）。
+    """
+    try:
+        return _run_extract_audio(video_file, audio_dir, sample_rate, codec, bitrate)
     except Exception as e:
         logging.error(f"[extract_audio] failed: {e}")
         return None
 
 
+def extract_audio_batch(video_files: typing.List[str], audio_dir: str, sample_rate: int = 16000,
+                        workers: typing.Optional[int] = None, codec: str = "pcm",
+                        bitrate: typing.Optional[str] = None
+                        ) -> typing.Tuple[typing.List[typing.Optional[str]], typing.Dict[int, str]]:
+    """
+    并行抽取多个视频的音频。
+    每个任务本身就是一个独立的 ffmpeg 子进程，这里用线程池并发调度这些子进程即可占满多核，
+    无需再额外 fork Python 进程。
+
+    返回 (audio_paths, errors)：
+      audio_paths 与 video_files 一一对应（保持分P顺序），失败的位置为 None；
+      errors 为 {分P下标: 错误信息}，单个分P失败不会中断其他分P。
+    """
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    audio_paths: typing.List[typing.Optional[str]] = [None] * len(video_files)
+    errors: typing.Dict[int, str] = {}
+    if not video_files:
+        return audio_paths, errors
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(video_files)),
+                            thread_name_prefix="v2n-extract") as pool:
+        futures = {
+            pool.submit(_run_extract_audio, vf, audio_dir, sample_rate, codec, bitrate): idx
+            for idx, vf in enumerate(video_files)
+        }
+        for fut in as_completed(futures):
+            idx = futures[fut]
+            try:
+                audio_paths[idx] = fut.result()
+            except Exception as e:
+                errors[idx] = str(e)
+                logging.error(f"[extract_audio_batch] P{idx + 1} 抽音失败: {e}")
+    logger.info(f"[extract_audio_batch] 完成 {len(video_files) - len(errors)}/{len(video_files)}，workers={workers}")
+    return audio_paths, errors
+
+
+
+def decode_audio(media_file: str, sample_rate: int = 16000):
+    """
+    用 ffmpeg 把音视频解码为 float32 单声道 PCM，经 stdout 管道直接读入 numpy 数组，不落盘。
+    失败时抛出 RuntimeError。
+    """
+    import numpy as np
+
+    media_file = str(media_file)
+    if not Path(media_file).exists():
+        raise RuntimeError(f"media file not found: {media_file}")
+    cmd = [
+        "ffmpeg", "-nostdin",
+        "-threads", "0",
+        "-i", media_file,
+        "-vn",
+        "-f", "f32le",
+        "-acodec", "pcm_f32le",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-"
+    ]
+    try:
+        with get_tracer().external("ffmpeg.decode_audio", part=Path(media_file).name):
+            proc = subprocess.run(cmd, check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        detail = e.stderr.decode(errors='ignore').strip()[-500:] if e.stderr else str(e)
+        raise RuntimeError(f"ffmpeg 音频解码失败: {detail}")
+    samples = np.frombuffer(proc.stdout, dtype=np.float32)
+    logger.info(f"[decode_audio] 解码完成: {media_file} ({len(samples) / sample_rate:.1f}s)")
+    return samples
+
+
+def write_wav(samples, wav_path: str, sample_rate: int = 16000) -> str:
+    """把 float32 PCM 写成 16-bit PCM wav（与 extract_audio 的输出格式一致）"""
+    import numpy as np
+
+    ensure_dir(os.path.dirname(os.path.abspath(wav_path)))
+    pcm16 = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(str(wav_path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm16.tobytes())
+    return str(wav_path)
+
+
+def write_audio(samples, audio_path: str, sample_rate: int = 16000, codec: str = "pcm",
+                bitrate: typing.Optional[str] = None) -> str:
+    """
+    把 float32 PCM 写成 codec 编码的音频（见 AUDIO_CODECS）。pcm 直接写 wav；
+    其他编码经 stdin 管道交给 ffmpeg 压缩，不产生中间 wav。
+    """
+    import numpy as np
+
+    if str(codec).lower() == "pcm":
+        return write_wav(samples, audio_path, sample_rate)
+    _, codec_args = audio_codec_args(codec, bitrate)
+    ensure_dir(os.path.dirname(os.path.abspath(audio_path)))
+    cmd = ["ffmpeg", "-y", "-nostdin",
+           "-f", "f32le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+           *codec_args, str(audio_path)]
+    try:
+        with get_tracer().external("ffmpeg.write_audio", part=Path(audio_path).name):
+            subprocess.run(cmd, input=np.ascontiguousarray(samples, dtype=np.float32).tobytes(),
+                           check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        detail = e.stderr.decode(errors='ignore').strip()[-500:] if e.stderr else str(e)
+        raise RuntimeError(f"ffmpeg 音频编码失败: {detail}")
+    return str(audio_path)
+
+
+def get_audio_duration(audio_path: str) -> float:
+    """
+    返回音频时长（秒）。PCMAudio 直接按采样数计算；wav 直接读文件头；其他格式解析 ffmpeg 输出的 Duration 行。
+    无法获取时返回 0.0。
+    """
+    if isinstance(audio_path, PCMAudio):
+        return audio_path.duration
+    try:
+        if str(audio_path).lower().endswith(".wav"):
+            with wave.open(str(audio_path), "rb") as w:
+                return w.getnframes() / float(w.getframerate() or 1)
+        proc = subprocess.run(["ffmpeg", "-hide_banner", "-i", str(audio_path)], capture_output=True)
+        m = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", proc.stderr.decode(errors="ignore"))
+        if m:
+            h, mi, sec = m.groups()
+            return int(h) * 3600 + int(mi) * 60 + float(sec)
+    except Exception as e:
+        logging.warning(f"[get_audio_duration] 读取时长失败 {audio_path}: {e}")
+    return 0.0
+
+
+def extract_audio_and_frames(video_file: str, audio_dir: str, frames_dir: str, extractor=None,
+                             sample_rate: int = 16000, codec: str = "pcm", bitrate: typing.Optional[str] = None):
+    """
+    一个 ffmpeg 进程同时抽音与截取关键帧（视频只解复用、解码一次），
+    返回 (音频路径, 按时间排序的 KeyFrame 列表)。extractor 为 keyframes.KeyframeExtractor，默认 scene 模式。
+    合并的命令失败时（如旧版 ffmpeg 不支持截帧参数）退回单独抽音 + 单独截帧，截帧再失败时关键帧为空列表；
+    只有抽音本身失败才抛出 RuntimeError。
+    """
+    from video2note.transcriber.keyframes import KeyframeExtractor
+
+    extractor = extractor or KeyframeExtractor()
+    suffix, codec_args = audio_codec_args(codec, bitrate)
+    video_p = Path(video_file)
+    if not video_p.exists():
+        raise RuntimeError(f"video file not found: {video_file}")
+    ensure_dir(audio_dir)
+    audio_path = os.path.join(str(audio_dir), video_p.stem + suffix)
+    cmd = [
+        "ffmpeg", "-y", "-nostdin", "-hide_banner",
+        "-i", str(video_file),
+        *extractor.output_args(str(frames_dir)),
+        "-map", "0:a:0", "-vn", *codec_args, "-ar", str(sample_rate), "-ac", "1", audio_path,
+    ]
+    try:
+        with get_tracer().external("ffmpeg.extract_media", part=video_p.name):
+            proc = subprocess.run(cmd, check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        detail = e.stderr.decode(errors='ignore').strip()[-500:] if e.stderr else str(e)
+        logger.warning(f"[extract_audio_and_frames] {video_p.name}: 合并抽音 / 截帧失败，分开重试: {detail}")
+        audio_path = _run_extract_audio(str(video_file), str(audio_dir), sample_rate, codec, bitrate)
+        try:
+            frames = extractor.extract(str(video_file), str(frames_dir))
+        except RuntimeError as frame_error:
+            logger.warning(f"[extract_audio_and_frames] {video_p.name}: 关键帧提取失败，跳过: {frame_error}")
+            frames = []
+        return audio_path, frames
+    frames = extractor.collect(str(video_file), str(frames_dir), proc.stdout, proc.stderr)
+    logger.info(f"[extract_audio_and_frames] {video_p.name}: 音频 {audio_path}，关键帧 {len(frames)} 张")
+    return audio_path, frames
+
 
 # -------------------------------
 # 关键帧提取
 # -------------------------------
 def extract_key_frames(video_file, output_dir, interval=10):
-    ensure_dir(output_dir)
-    frames = []
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", video_file,
-        "-vf", f"fps=1/{interval}",  # 每interval秒一帧
-        "-q:v", "2",  # 画质等级
-        os.path.join(output_dir, "frame_%04d.jpg")
-    ]
+    """
+    每 interval 秒取一帧，返回按时间排序的帧路径（不去重）。
+    场景切换选帧 + 感知哈希去重见 transcriber/keyframes.py 的 KeyframeExtractor。
+    """
+    from video2note.transcriber.keyframes import KeyframeExtractor
+
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
-        # 收集帧路径
-        for f in os.listdir(output_dir):
-            if f.startswith("frame_") and f.endswith(".jpg"):
-                frames.append(os.path.join(output_dir, f))
+        frames = KeyframeExtractor(mode="interval", interval=interval, hash_distance=-1).extract(video_file, output_dir)
         logger.info(f"[transcriber] 提取关键帧 {len(frames)} 张")
-        return frames
+        return [f.path for f in frames]
     except Exception as e:
         logger.error(f"[transcriber] 帧提取失败: {e}")
         return []
@@ -0,0 +1,180 @@
+# src/video2note/transcriber/chunking.py
+"""
+长音频分块并行转写（本地 whisper）：
+1. 按目标块长切分，切点落在目标位置附近能量最低的帧（静音处），避免把一句话切成两半
+2. 每个块交给独立的 worker 进程转写；每个进程加载一份模型并限制 torch 线程数，
+   workers × threads_per_worker ≈ CPU 核数即可占满整机
+3. 各块的段时间戳加上块偏移，拼回一个带绝对时间戳的 Transcript
+
+worker 进程池按 (模型, device, workers, 线程数, 语言) 在进程内只创建一次，多个分P复用，
+模型在每个 worker 里只加载一次；进程退出时（atexit）统一关闭。
+"""
+import atexit
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from video2note.types.transcript import Segment
+
+# worker 进程内的模型（由 _init_worker 加载，每个进程一份）
+_WORKER_MODEL = None
+_WORKER_LANGUAGE = "zh"
+
+# 主进程内复用的 worker 进程池：{(model_name, device, workers, threads_per_worker, language): pool}
+_POOLS: Dict[tuple, ProcessPoolExecutor] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def find_split_points(samples, sample_rate: int, chunk_seconds: float, search_seconds: float = 10.0,
+                      frame_ms: int = 30) -> List[int]:
+    """
+    返回切点（样本下标，不含首尾）。每个切点取 k*chunk_seconds 前后 search_seconds 范围内
+    RMS 能量最低的静音段的中点。
+    """
+    import numpy as np
+
+    total = len(samples)
+    chunk = int(chunk_seconds * sample_rate)
+    if chunk <= 0 or total <= chunk:
+        return []
+
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = total // frame
+    frames = np.asarray(samples[:n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+
+    search = int(search_seconds * sample_rate / frame)
+    points: List[int] = []
+    target = chunk
+    while target < total - chunk // 4:
+        center = target // frame
+        lo = max(center - search, (points[-1] // frame + 1) if points else 1)
+        hi = min(center + search, n_frames - 1)
+        if hi <= lo:
+            best = center
+        else:
+            best = lo + int(np.argmin(energy[lo:hi]))
+            # 取最低能量所在静音段的中点，让两侧块都留一点静音余量
+            quiet = energy[best] * 1.5 + 1e-6
+            left, right = best, best
+            while left > lo and energy[left - 1] <= quiet:
+                left -= 1
+            while right < hi - 1 and energy[right + 1] <= quiet:
+                right += 1
+            best = (left + right) // 2
+        point = best * frame
+        points.append(point)
+        target = point + chunk
+    return points
+
+
+def split_audio_array(samples, sample_rate: int, chunk_seconds: float,
+                      search_seconds: float = 10.0) -> List[Tuple[float, object]]:
+    """按静音切点切分，返回 [(块起点秒数, 块样本)]；块样本是原数组的视图，不复制"""
+    bounds = [0] + find_split_points(samples, sample_rate, chunk_seconds, search_seconds) + [len(samples)]
+    return [(bounds[i] / float(sample_rate), samples[bounds[i]:bounds[i + 1]]) for i in range(len(bounds) - 1)]
+
+
+def segments_from_whisper(result: dict, offset: float = 0.0) -> List[Segment]:
+    """把 whisper 的输出转换成 Segment 列表，时间戳加上 offset；confidence 取 exp(avg_logprob)"""
+    segments: List[Segment] = []
+    for s in result.get("segments") or []:
+        text = (s.get("text") or "").strip()
+        if not text:
+            continue
+        logprob = s.get("avg_logprob")
+        confidence = math.exp(logprob) if logprob is not None else None
+        segments.append(Segment(offset + float(s["start"]), offset + float(s["end"]), text, confidence))
+    if not segments and result.get("text"):
+        # 没有分段信息时退化为单段
+        segments.append(Segment(offset, offset, result["text"].strip()))
+    return segments
+
+
+def _init_worker(model_name: str, device: Optional[str], threads: int, language: str):
+    global _WORKER_MODEL, _WORKER_LANGUAGE
+    import torch
+    import whisper
+
+    torch.set_num_threads(max(1, threads))
+    _WORKER_MODEL = whisper.load_model(model_name, device=device)
+    _WORKER_LANGUAGE = language
+
+
+def _transcribe_chunk(offset: float, samples) -> List[tuple]:
+    import numpy as np
+
+    result = _WORKER_MODEL.transcribe(np.ascontiguousarray(samples, dtype=np.float32),
+                                      language=_WORKER_LANGUAGE, fp16=False)
+    # Segment 对象跨进程返回时用元组，减少 pickle 开销
+    return [(s.start, s.end, s.text, s.confidence) for s in segments_from_whisper(result, offset)]
+
+
+def get_worker_pool(model_name: str, device: Optional[str], workers: int, threads_per_worker: int,
+                    language: str) -> ProcessPoolExecutor:
+    """
+    返回复用的 worker 进程池，首次调用时创建。
+    使用 spawn 启动方式，避免在已有线程（预热、流水线 worker）的进程里 fork；worker 按需启动。
+    """
+    key = (model_name, device, workers, threads_per_worker, language)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            logging.info(f"[chunking] 创建 worker 进程池：{model_name}（device={device}），"
+                         f"{workers} 个进程 × {threads_per_worker} 线程")
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_worker,
+                                       initargs=(model_name, device, threads_per_worker, language))
+            _POOLS[key] = pool
+        return pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """worker 崩溃后进程池不可再用：从缓存中移除，下次调用重新创建"""
+    with _POOLS_LOCK:
+        for key, cached in list(_POOLS.items()):
+            if cached is pool:
+                del _POOLS[key]
+    pool.shutdown(wait=False)
+
+
+def shutdown_worker_pools():
+    """关闭所有 worker 进程池（进程退出时自动调用）"""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown_worker_pools)
+
+
+def transcribe_chunks_parallel(chunks: List[Tuple[float, object]], model_name: str,
+                               device: Optional[str] = None, workers: int = 0,
+                               threads_per_worker: int = 2, language: str = "zh") -> List[Segment]:
+    """
+    在复用的 worker 进程池（get_worker_pool）中并行转写各块，按块顺序拼接段。
+    workers 为 0 时取 CPU 核数 // threads_per_worker。
+    """
+    threads_per_worker = max(1, int(threads_per_worker))
+    if not workers:
+        workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+    workers = max(1, int(workers))
+    logging.info(f"[chunking] {len(chunks)} 个分块，最多 {min(workers, len(chunks))} 个进程并行")
+
+    pool = get_worker_pool(model_name, device, workers, threads_per_worker, language)
+    try:
+        futures = [pool.submit(_transcribe_chunk, offset, samples) for offset, samples in chunks]
+        segments: List[Segment] = []
+        for fut in futures:
+            segments.extend(Segment(*row) for row in fut.result())
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    return segments
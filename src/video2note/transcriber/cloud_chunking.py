@@ -0,0 +1,181 @@
+# src/video2note/transcriber/cloud_chunking.py
+"""
+云端 ASR 的长音频分块并发上传：
+1. 按固定块长切分，相邻块重叠 overlap_seconds，保证切点附近的句子至少在一个块里是完整的
+2. 每个块用 ffmpeg 直接从源音频截取并压缩（默认 Opus 32k，也可 FLAC / MP3），
+   体积通常只有 16k PCM wav 的 1/10 左右，也不会超过 provider 的单文件大小限制
+3. 各块并发上传（concurrency 个同时进行），结果按块顺序拼回一个带绝对时间戳的 Transcript：
+   - 带时间戳的结果：以重叠区中点为界，前一块保留之前开始的段，后一块保留之后开始的段
+   - 只有纯文本的结果：在前一块结尾与后一块开头之间找最长公共片段，去掉后一块中重复的开头
+
+配置（transcriber.chunked_upload，均可选）：
+    enabled               是否启用，默认 true
+    min_duration_seconds  音频达到该时长才分块，默认 900
+    chunk_seconds         块长，默认 600
+    overlap_seconds       相邻块重叠，默认 5
+    codec                 opus / flac / mp3，默认 opus
+    bitrate               码率（opus / mp3），默认按编码取值
+    concurrency           同时上传的块数，默认 4
+"""
+import asyncio
+import logging
+import os
+import subprocess
+import tempfile
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from video2note.config_manager.loader import get_config_value
+from video2note.transcriber.base import audio_codec_args, get_audio_duration
+from video2note.types.transcript import Segment, Transcript
+from video2note.utils.aio import run_in_thread
+from video2note.utils.tracing import get_tracer
+
+# 纯文本去重时比较的前后窗口字符数，以及认定为重复所需的最少字符数
+_TEXT_WINDOW = 300
+_MIN_TEXT_OVERLAP = 6
+
+
+def plan_chunks(duration: float, chunk_seconds: float, overlap_seconds: float) -> List[Tuple[float, float]]:
+    """返回 [(起点秒数, 时长)]；除最后一块外，每块都与下一块重叠 overlap_seconds"""
+    if duration <= 0:
+        return []
+    step = max(1.0, chunk_seconds - overlap_seconds)
+    chunks = []
+    start = 0.0
+    while True:
+        length = min(chunk_seconds, duration - start)
+        chunks.append((start, length))
+        if start + length >= duration:
+            break
+        start += step
+    return chunks
+
+
+def encode_chunk(audio_path: str, start: float, length: float, out_path: str,
+                 codec: str = "opus", bitrate: Optional[str] = None, sample_rate: int = 16000) -> str:
+    """用 ffmpeg 截取 [start, start + length) 并压缩为单声道 sample_rate 的音频"""
+    _, codec_args = audio_codec_args(codec, bitrate)
+    cmd = ["ffmpeg", "-y", "-nostdin",
+           "-ss", f"{start:.3f}", "-t", f"{length:.3f}",
+           "-i", str(audio_path),
+           "-vn", "-ac", "1", "-ar", str(sample_rate),
+           *codec_args, str(out_path)]
+    try:
+        with get_tracer().external("ffmpeg.encode_chunk", part=Path(out_path).name):
+            subprocess.run(cmd, check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        detail = e.stderr.decode(errors="ignore").strip()[-500:] if e.stderr else str(e)
+        raise RuntimeError(f"ffmpeg 分块编码失败: {detail}")
+    return str(out_path)
+
+
+def _has_timestamps(transcript: Transcript) -> bool:
+    return any(seg.end > seg.start for seg in transcript.segments)
+
+
+def _strip_repeated_head(prev_text: str, text: str) -> str:
+    """去掉 text 开头与 prev_text 结尾重复（重叠区被两个块各转写一次）的部分"""
+    tail = prev_text[-_TEXT_WINDOW:]
+    head = text[:_TEXT_WINDOW]
+    m = SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(0, len(tail), 0, len(head))
+    if m.size < _MIN_TEXT_OVERLAP:
+        return text
+    return text[m.b + m.size:].lstrip(" ,，。.!！?？")
+
+
+def merge_chunk_transcripts(chunks: List[Tuple[float, float, Transcript]], overlap_seconds: float) -> Transcript:
+    """
+    chunks 为按顺序的 [(块起点秒数, 块时长, 块内时间戳的 Transcript)]，返回绝对时间戳的 Transcript。
+    """
+    segments: List[Segment] = []
+    prev_text = ""
+    for i, (offset, length, transcript) in enumerate(chunks):
+        # 与前 / 后一块的分界：重叠区中点
+        lo = offset + overlap_seconds / 2.0 if i > 0 else float("-inf")
+        hi = chunks[i + 1][0] + overlap_seconds / 2.0 if i + 1 < len(chunks) else float("inf")
+        if _has_timestamps(transcript):
+            for seg in transcript.segments:
+                start = offset + seg.start
+                if lo <= start < hi:
+                    segments.append(Segment(start, offset + seg.end, seg.text, seg.confidence))
+            prev_text = transcript.get_full_text()
+            continue
+        # 没有时间戳：整块作为一个段，时间取本块独占的区间
+        text = transcript.get_full_text().strip()
+        if prev_text:
+            text = _strip_repeated_head(prev_text, text)
+        if text:
+            # 比重叠区还短的末块整块落在前一块的范围内，结束时间不早于开始时间
+            start = max(offset, lo)
+            segments.append(Segment(start, max(start, min(offset + length, hi)), text))
+        prev_text = transcript.get_full_text()
+    return Transcript(segments)
+
+
+class ChunkedUpload:
+    def __init__(self, enabled: bool = True, min_duration_seconds: float = 900, chunk_seconds: float = 600,
+                 overlap_seconds: float = 5, codec: str = "opus", bitrate: Optional[str] = None,
+                 concurrency: int = 4):
+        self.enabled = enabled
+        self.min_duration_seconds = float(min_duration_seconds)
+        self.chunk_seconds = float(chunk_seconds)
+        self.overlap_seconds = float(overlap_seconds)
+        self.codec = codec
+        self.bitrate = bitrate
+        self.concurrency = max(1, int(concurrency))
+        audio_codec_args(codec, bitrate)  # 提前校验编码名称
+        # {音频路径: 上传的字节数}，由 Transcriber.uploaded_bytes 取走
+        self.uploaded: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config) -> "ChunkedUpload":
+        def _get(name, default):
+            return get_config_value(config, f"transcriber.chunked_upload.{name}", default)
+
+        return cls(
+            enabled=bool(_get("enabled", True)),
+            min_duration_seconds=_get("min_duration_seconds", 900),
+            chunk_seconds=_get("chunk_seconds", 600),
+            overlap_seconds=_get("overlap_seconds", 5),
+            codec=_get("codec", "opus"),
+            bitrate=_get("bitrate", None),
+            concurrency=_get("concurrency", 4),
+        )
+
+    def applies(self, audio_path: str) -> bool:
+        return self.enabled and get_audio_duration(audio_path) >= self.min_duration_seconds
+
+    async def transcribe(self, audio_path: str, upload: Callable[[str], Awaitable[Transcript]]) -> Transcript:
+        """
+        分块、压缩并并发调用 upload(块文件路径)（返回块内时间戳的 Transcript），合并为一个 Transcript。
+        任一块失败时抛出该块的异常。
+        """
+        duration = get_audio_duration(audio_path)
+        plan = plan_chunks(duration, self.chunk_seconds, self.overlap_seconds)
+        suffix, _ = audio_codec_args(self.codec, self.bitrate)
+        stem = Path(audio_path).stem
+        logging.info(f"[ChunkedUpload] {stem}: {duration:.0f}s 分为 {len(plan)} 块（{self.codec}），并发 {self.concurrency}")
+        sema = asyncio.Semaphore(self.concurrency)
+
+        with tempfile.TemporaryDirectory(prefix="v2n-upload-") as tmp:
+            sizes: List[int] = [0] * len(plan)
+
+            async def _one(i: int, start: float, length: float) -> Transcript:
+                async with sema:
+                    out = os.path.join(tmp, f"{stem}.{i:03d}{suffix}")
+                    await run_in_thread(encode_chunk, audio_path, start, length, out, self.codec, self.bitrate)
+                    sizes[i] = os.path.getsize(out)
+                    with get_tracer().external("upload_chunk", part=Path(out).name, bytes=sizes[i]):
+                        return await upload(out)
+
+            results = await asyncio.gather(*(_one(i, s, n) for i, (s, n) in enumerate(plan)),
+                                           return_exceptions=True)
+        self.uploaded[audio_path] = sum(sizes)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        logging.info(f"[ChunkedUpload] {stem}: 上传 {sum(sizes) / 1024:.0f} KB"
+                     f"（源文件 {os.path.getsize(audio_path) / 1024:.0f} KB）")
+        return merge_chunk_transcripts([(s, n, t) for (s, n), t in zip(plan, results)], self.overlap_seconds)
@@ -0,0 +1,300 @@
+# src/video2note/transcriber/keyframes.py
+"""
+关键帧提取：一次 ffmpeg 解码同时得到截图和用于去重的缩略灰度图。
+1. 选帧：scene 模式用 select='gt(scene,T)'（画面变化超过阈值时取一帧，外加第一帧）；
+   interval 模式用 fps=1/N 每 N 秒取一帧
+2. 选中的帧经 showinfo 输出时间戳（stderr 的 pts_time），再 split 成两路：
+   一路写成 frame_%04d.jpg，一路缩成 9x8 灰度以 rawvideo 写到 stdout
+3. 用 NumPy 对灰度图算 dHash（相邻像素比较得到 64 bit），与某个已保留帧的汉明距离
+   不超过 hash_distance、且缩略图平均亮度差不超过 pixel_tolerance 的帧视为重复
+   （翻回前一页幻灯片也算），删除其截图。亮度条件用来区分 dHash 相同的纯色 / 横条纹画面
+
+讲幻灯片的视频里相邻的帧几乎都是同一页，去重后通常只剩每页一张。
+output_args / collect 也供 base.extract_audio_and_frames 使用：抽音与截帧合在同一个 ffmpeg 进程里。
+
+segments 模式不整段解码：按转写片段（或给定的时间点列表）在每个时间点用 -ss 放在 -i 之前做输入端 seek，
+只解码该时间点所在的一两个 GOP 取一帧，多个时间点并行截取，同样经 dHash 去重。
+每个 KeyFrame 记录所在片段的下标（link_segments），摘要可以引用对应的截图。
+"""
+import logging
+import os
+import re
+import subprocess
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from video2note.config_manager.loader import get_config_value
+from video2note.utils.file_utils import ensure_dir
+from video2note.utils.tracing import get_tracer
+
+KEYFRAME_MODES = ("scene", "interval", "segments")
+
+# dHash 用的缩略图尺寸：每行 9 个像素比较出 8 bit，共 8 行
+_HASH_W, _HASH_H = 9, 8
+_PTS_RE = re.compile(r"Parsed_showinfo.*?pts_time:\s*([-\d.]+)")
+
+
+class KeyFrame:
+    __slots__ = ("path", "timestamp", "hash", "segment")
+
+    def __init__(self, path: str, timestamp: float, hash: int = 0, segment: Optional[int] = None):
+        self.path = path
+        self.timestamp = timestamp
+        self.hash = hash
+        # 所在转写片段的下标（transcript.segments[segment]），未关联时为 None
+        self.segment = segment
+
+    def __repr__(self):
+        return f"KeyFrame({self.timestamp:.2f}s: {self.path})"
+
+    def to_dict(self) -> dict:
+        return {"path": self.path, "timestamp": self.timestamp, "hash": f"{self.hash:016x}", "segment": self.segment}
+
+
+def dhash_bits(gray):
+    """(N, 8, 9) 的灰度图 → (N, 64) 的 bool 数组：每个像素是否比右侧像素亮"""
+    import numpy as np
+
+    gray = np.asarray(gray, dtype=np.int16).reshape(-1, _HASH_H, _HASH_W)
+    return (gray[:, :, :-1] > gray[:, :, 1:]).reshape(-1, _HASH_H * (_HASH_W - 1))
+
+
+def bits_to_int(bits) -> int:
+    import numpy as np
+
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dedup_frames(timestamps: List[float], gray, hash_distance: int = 6, pixel_tolerance: float = 16.0,
+                 min_gap_seconds: float = 0.0) -> List[int]:
+    """
+    按时间顺序保留帧，返回保留的下标。gray 为 (N, 8, 9) 的缩略灰度图。
+    与某个已保留帧 dHash 汉明距离 ≤ hash_distance 且平均亮度差 ≤ pixel_tolerance 的帧，
+    以及距上一个保留帧不足 min_gap_seconds 的帧被丢弃。
+    """
+    import numpy as np
+
+    gray = np.asarray(gray, dtype=np.float32).reshape(len(timestamps), -1)
+    bits = dhash_bits(gray)
+    kept: List[int] = []
+    for i, t in enumerate(timestamps):
+        if kept and t - timestamps[kept[-1]] < min_gap_seconds:
+            continue
+        if kept:
+            dist = np.count_nonzero(bits[kept] != bits[i], axis=1)
+            diff = np.abs(gray[kept] - gray[i]).mean(axis=1)
+            if np.any((dist <= hash_distance) & (diff <= pixel_tolerance)):
+                continue
+        kept.append(i)
+    return kept
+
+
+def link_segments(frames: List[KeyFrame], transcript) -> List[KeyFrame]:
+    """按时间戳把每帧关联到所在（或之前最近）的转写片段，设置 frame.segment 并返回 frames"""
+    starts = [seg.start for seg in transcript.segments]
+    for frame in frames:
+        i = bisect_right(starts, frame.timestamp) - 1
+        frame.segment = i if i >= 0 else (0 if starts else None)
+    return frames
+
+
+def segment_timestamps(transcript, min_gap_seconds: float = 30.0, position: str = "middle") -> List[float]:
+    """
+    从转写片段选截帧时间点：依次取片段的中点（position="start" 时取起点），
+    与上一个时间点相隔不足 min_gap_seconds 的片段跳过。
+    """
+    times: List[float] = []
+    for seg in transcript.segments:
+        t = seg.start if position == "start" else (seg.start + max(seg.end, seg.start)) / 2.0
+        if times and t - times[-1] < min_gap_seconds:
+            continue
+        times.append(t)
+    return times
+
+
+class KeyframeExtractor:
+    def __init__(self, mode: str = "scene", scene_threshold: float = 0.3, interval: float = 10,
+                 hash_distance: int = 6, pixel_tolerance: float = 16.0, min_gap_seconds: float = 0.0,
+                 max_frames: int = 0, quality: int = 2, segment_gap_seconds: float = 30.0,
+                 segment_position: str = "middle", workers: int = 4):
+        if mode not in KEYFRAME_MODES:
+            raise ValueError(f"Unknown keyframe mode: {mode} (可选 {', '.join(KEYFRAME_MODES)})")
+        self.mode = mode
+        self.scene_threshold = float(scene_threshold)
+        self.interval = float(interval)
+        self.hash_distance = int(hash_distance)
+        self.pixel_tolerance = float(pixel_tolerance)
+        self.min_gap_seconds = float(min_gap_seconds)
+        self.max_frames = int(max_frames)
+        self.quality = int(quality)
+        self.segment_gap_seconds = float(segment_gap_seconds)
+        self.segment_position = segment_position
+        self.workers = max(1, int(workers))
+
+    @classmethod
+    def from_config(cls, config) -> "KeyframeExtractor":
+        def _get(name, default):
+            return get_config_value(config, f"keyframes.{name}", default)
+
+        return cls(
+            mode=str(_get("mode", "scene")).lower(),
+            scene_threshold=_get("scene_threshold", 0.3),
+            interval=_get("interval", None) or get_config_value(config, "video.frame_interval", 10),
+            hash_distance=_get("hash_distance", 6),
+            pixel_tolerance=_get("pixel_tolerance", 16),
+            min_gap_seconds=_get("min_gap_seconds", 0),
+            max_frames=_get("max_frames", 0),
+            segment_gap_seconds=_get("segment_gap_seconds", 30),
+            segment_position=str(_get("segment_position", "middle")).lower(),
+            workers=_get("workers", 4),
+        )
+
+    def select_filter(self) -> str:
+        if self.mode == "segments":
+            raise ValueError("segments 模式需要时间点，使用 grab / extract_for_transcript")
+        if self.mode == "scene":
+            return f"select='gt(scene\\,{self.scene_threshold})+eq(n\\,0)'"
+        return f"fps=1/{self.interval:g}"
+
+    def filter_graph(self) -> str:
+        """选帧 → showinfo（时间戳）→ split：[jpg] 原图，[hash] 9x8 灰度"""
+        return (f"[0:v]{self.select_filter()},showinfo,split=2[jpg][small];"
+                f"[small]scale={_HASH_W}:{_HASH_H}:flags=area,format=gray[hash]")
+
+    def output_args(self, output_dir: str) -> List[str]:
+        """
+        放在 ffmpeg -i 之后的截帧参数（filter_complex + 两个输出，缩略图写到 stdout）。
+        同时清除 output_dir 中旧的 frame_*.jpg。
+        """
+        ensure_dir(output_dir)
+        for f in Path(output_dir).glob("frame_*.jpg"):
+            f.unlink()
+        # -fps_mode 需要 ffmpeg 5.1+；-vsync 在 4.x（Ubuntu 22.04 apt 版本）到 7.x 都可用
+        return [
+            "-filter_complex", self.filter_graph(), "-vsync", "vfr",
+            "-map", "[jpg]", "-q:v", str(self.quality),
+            os.path.join(output_dir, "frame_%04d.jpg"),
+            "-map", "[hash]", "-f", "rawvideo", "-",
+        ]
+
+    def extract(self, video_file: str, output_dir: str) -> List[KeyFrame]:
+        """提取并去重，返回按时间排序的 KeyFrame；output_dir 中旧的 frame_*.jpg 会先被清除"""
+        cmd = ["ffmpeg", "-y", "-nostdin", "-hide_banner", "-i", str(video_file), *self.output_args(output_dir)]
+        try:
+            with get_tracer().external("ffmpeg.keyframes", part=Path(video_file).name):
+                proc = subprocess.run(cmd, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            detail = e.stderr.decode(errors="ignore").strip()[-500:] if e.stderr else str(e)
+            raise RuntimeError(f"ffmpeg 关键帧提取失败: {detail}")
+        return self.collect(video_file, output_dir, proc.stdout, proc.stderr)
+
+    def collect(self, video_file: str, output_dir: str, stdout: bytes, stderr: bytes) -> List[KeyFrame]:
+        """从 ffmpeg 的 stdout（缩略图）与 stderr（showinfo 时间戳）整理出去重后的 KeyFrame"""
+        import numpy as np
+
+        timestamps = [float(m) for m in _PTS_RE.findall(stderr.decode(errors="ignore"))]
+        gray = np.frombuffer(stdout, dtype=np.uint8)
+        n = min(len(timestamps), len(gray) // (_HASH_W * _HASH_H))
+        paths = [os.path.join(output_dir, f"frame_{i + 1:04d}.jpg") for i in range(n)]
+        return self._dedup(video_file, paths, timestamps[:n], gray[:n * _HASH_W * _HASH_H])
+
+    def _dedup(self, video_file: str, paths: List[str], timestamps: List[float], gray) -> List[KeyFrame]:
+        """对按时间排序的候选帧去重、按 max_frames 抽样，删除未保留的截图"""
+        n = len(paths)
+        if not n:
+            logging.warning(f"[KeyframeExtractor] {Path(video_file).name}: 没有选出任何帧")
+            return []
+        gray = gray.reshape(n, _HASH_H, _HASH_W)
+        bits = dhash_bits(gray)
+        kept = dedup_frames(timestamps, gray, self.hash_distance, self.pixel_tolerance, self.min_gap_seconds)
+        if self.max_frames > 0 and len(kept) > self.max_frames:
+            # 超出上限时在时间轴上均匀抽取
+            step = len(kept) / float(self.max_frames)
+            kept = [kept[int(i * step)] for i in range(self.max_frames)]
+        keep = set(kept)
+        for i, path in enumerate(paths):
+            if i not in keep and os.path.exists(path):
+                os.remove(path)
+        frames = [KeyFrame(paths[i], timestamps[i], bits_to_int(bits[i])) for i in kept]
+        logging.info(f"[KeyframeExtractor] {Path(video_file).name}: {self.mode} 模式选出 {n} 帧，"
+                     f"去重后保留 {len(frames)} 帧")
+        return frames
+
+    # ---------- seek 截帧 ----------
+
+    def grab_one(self, video_file: str, timestamp: float, out_path: str) -> bytes:
+        """
+        输入端 seek 到 timestamp 截取一帧写到 out_path，返回该帧 9x8 灰度缩略图（72 字节）。
+        -ss 在 -i 之前：从 timestamp 之前最近的关键帧开始解码，只解码一小段而不是整个视频。
+        """
+        cmd = [
+            "ffmpeg", "-y", "-nostdin", "-hide_banner", "-loglevel", "error",
+            "-ss", f"{max(0.0, timestamp):.3f}", "-i", str(video_file),
+            "-filter_complex",
+            f"[0:v]split=2[jpg][small];[small]scale={_HASH_W}:{_HASH_H}:flags=area,format=gray[hash]",
+            "-map", "[jpg]", "-frames:v", "1", "-q:v", str(self.quality), str(out_path),
+            "-map", "[hash]", "-frames:v", "1", "-f", "rawvideo", "-",
+        ]
+        try:
+            with get_tracer().external("ffmpeg.grab_frame", part=Path(out_path).name):
+                proc = subprocess.run(cmd, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            detail = e.stderr.decode(errors="ignore").strip()[-500:] if e.stderr else str(e)
+            raise RuntimeError(f"ffmpeg 截帧失败 @{timestamp:.2f}s: {detail}")
+        if len(proc.stdout) < _HASH_W * _HASH_H or not os.path.exists(out_path):
+            raise RuntimeError(f"ffmpeg 截帧失败 @{timestamp:.2f}s: 没有输出帧（超出视频时长？）")
+        return proc.stdout[:_HASH_W * _HASH_H]
+
+    def grab(self, video_file: str, timestamps: Sequence[float], output_dir: str) -> List[KeyFrame]:
+        """
+        在给定的时间点并行（workers 个 ffmpeg）截帧并去重，返回按时间排序的 KeyFrame。
+        个别时间点截取失败时跳过；output_dir 中旧的 frame_*.jpg 会先被清除。
+        """
+        import numpy as np
+
+        ensure_dir(output_dir)
+        for f in Path(output_dir).glob("frame_*.jpg"):
+            f.unlink()
+        times = sorted(set(float(t) for t in timestamps))
+        paths = [os.path.join(output_dir, f"frame_{i + 1:04d}.jpg") for i in range(len(times))]
+        if not times:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(times)), thread_name_prefix="v2n-grab") as pool:
+            futures = [pool.submit(self.grab_one, video_file, t, p) for t, p in zip(times, paths)]
+            thumbs: List[Optional[bytes]] = []
+            for t, fut in zip(times, futures):
+                try:
+                    thumbs.append(fut.result())
+                except Exception as e:
+                    logging.warning(f"[KeyframeExtractor] {e}")
+                    thumbs.append(None)
+        ok = [i for i, thumb in enumerate(thumbs) if thumb is not None]
+        if not ok:
+            return []
+        gray = np.frombuffer(b"".join(thumbs[i] for i in ok), dtype=np.uint8)
+        return self._dedup(video_file, [paths[i] for i in ok], [times[i] for i in ok], gray)
+
+    def extract_for_transcript(self, video_file: str, transcript, output_dir: str) -> List[KeyFrame]:
+        """
+        按转写片段取帧并关联片段：segments 模式在片段时间点 seek 截帧，其他模式整段提取后按时间戳关联。
+        """
+        if self.mode == "segments":
+            times = segment_timestamps(transcript, self.segment_gap_seconds, self.segment_position)
+            frames = self.grab(video_file, times, output_dir)
+        else:
+            frames = self.extract(video_file, output_dir)
+        return link_segments(frames, transcript)
+
+
+def extract_keyframes(video_file: str, output_dir: str, config=None,
+                      extractor: Optional[KeyframeExtractor] = None, transcript=None) -> List[KeyFrame]:
+    """
+    按 config 的 keyframes.* 设置（或给定的 extractor）提取关键帧。
+    给出 transcript 时各帧关联到所在片段（segments 模式必须给出）。
+    """
+    extractor = extractor or (KeyframeExtractor.from_config(config) if config is not None else KeyframeExtractor())
+    if transcript is not None:
+        return extractor.extract_for_transcript(video_file, transcript, output_dir)
+    return extractor.extract(video_file, output_dir)
@@ -1,37 +1,79 @@
 import os
 
-from video2note.transcriber.base import Transcriber
-from video2note.types.transcript import Transcript, Segment
+from video2note.config_manager.loader import get_config_value
+from video2note.transcriber.base import Transcriber, decode_audio
+from video2note.transcriber.chunking import segments_from_whisper, split_audio_array, transcribe_chunks_parallel
+from video2note.transcriber.model_registry import get_model_registry
+from video2note.types.transcript import Transcript
 from video2note.core.exceptions import TranscriptionError
 from video2note.utils.logger import logging
 
 import whisper
 
 class LocalWhisperTranscriber(Transcriber):
+    # whisper 的 model.transcribe 可直接接收 16k float32 数组，无需再用 ffmpeg 解码 wav
+    supports_array_input = True
+
     def __init__(self, config):
         super().__init__(config)
         cfg = config.providers.local
         self.model_name = cfg.whisper_model
+        self.device = getattr(cfg, "device", None)
+        self.language = "zh"  # 强制中文识别（避免误判语言）
+        # 长音频分块并行转写（providers.local.chunked）
+        self.chunked = bool(get_config_value(config, "providers.local.chunked.enabled", False))
+        self.chunk_seconds = float(get_config_value(config, "providers.local.chunked.chunk_seconds", 300))
+        self.chunk_min_seconds = float(get_config_value(config, "providers.local.chunked.min_duration_seconds", 600))
+        self.chunk_workers = int(get_config_value(config, "providers.local.chunked.workers", 0))
+        self.chunk_threads = int(get_config_value(config, "providers.local.chunked.threads_per_worker", 2))
         # 你可以为 local 还设置别的参数
         logging.info(f"[LocalWhisperTranscriber] 模型名称: {self.model_name}")
 
     def transcribe(self, audio_path: str) -> Transcript:
         logging.info(f"[LocalWhisperTranscriber] 转写音频 {audio_path} 使用本地 whisper")
+        # 检查音频文件是否存在
+        if not os.path.exists(audio_path):
+            logging.error(f"[LocalWhisperTranscriber] 转写失败: 音频文件不存在: {audio_path}")
+            raise TranscriptionError(f"Local whisper transcribe failed: 音频文件不存在: {audio_path}")
+        if self.chunked:
+            # 分块需要先拿到 PCM 才能找静音切点
+            try:
+                samples = decode_audio(audio_path, whisper.audio.SAMPLE_RATE)
+            except Exception as e:
+                raise TranscriptionError(f"Local whisper transcribe failed: {e}")
+            return self._transcribe(samples)
+        return self._transcribe(audio_path)
+
+    def transcribe_array(self, samples, sample_rate: int = 16000) -> Transcript:
+        logging.info(f"[LocalWhisperTranscriber] 转写内存音频 {len(samples) / sample_rate:.1f}s 使用本地 whisper")
+        if sample_rate != whisper.audio.SAMPLE_RATE:
+            raise TranscriptionError(f"Local whisper expects {whisper.audio.SAMPLE_RATE} Hz audio, got {sample_rate}")
+        return self._transcribe(samples)
+
+    def _use_chunks(self, audio) -> bool:
+        return self.chunked and not isinstance(audio, str) \
+            and len(audio) / whisper.audio.SAMPLE_RATE >= self.chunk_min_seconds
+
+    def _transcribe(self, audio) -> Transcript:
         try:
-            # 检查音频文件是否存在
-            if not os.path.exists(audio_path):
-                raise FileNotFoundError(f"音频文件不存在: {audio_path}")
-
-            model = whisper.load_model(self.model_name)
-            # 显式指定 audio 参数，避免版本兼容问题
-            result = model.transcribe(
-                audio_path,
-                language="zh",  # 强制中文识别（避免误判语言）
-                fp16=False  # 如无NVIDIA GPU，设为False（用CPU运行）
-            )
-            text = result.get("text", "")
-            seg = Segment(start=0.0, end=0.0, text=text)
-            return Transcript([seg])
+            if self._use_chunks(audio):
+                chunks = split_audio_array(audio, whisper.audio.SAMPLE_RATE, self.chunk_seconds)
+                segments = transcribe_chunks_parallel(
+                    chunks, self.model_name, self.device,
+                    workers=self.chunk_workers, threads_per_worker=self.chunk_threads, language=self.language)
+                return Transcript(segments)
+
+            # 模型由进程级注册表加载并缓存，所有分P共享同一份权重；
+            # 批量 / 流式模式下多个线程会同时转写，use() 保证同一模型上的推理串行
+            with get_model_registry(self.config).use(self.model_name, self.device) as model:
+                # 显式指定 audio 参数，避免版本兼容问题
+                result = model.transcribe(
+                    audio,
+                    language=self.language,
+                    fp16=False  # 如无NVIDIA GPU，设为False（用CPU运行）
+                )
+            # 保留 whisper 的分段时间戳
+            return Transcript(segments_from_whisper(result))
         except Exception as e:
             logging.error(f"[LocalWhisperTranscriber] 转写失败: {e}")
             raise TranscriptionError(f"Local whisper transcribe failed: {e}")
@@ -4,9 +4,15 @@ from video2note.transcriber.base import Transcriber
 from video2note.types.transcript import Transcript, Segment
 
 class MockTranscriber(Transcriber):
+    supports_array_input = True
+    supports_concurrency = True
+
     def __init__(self, config):
         super().__init__(config)
 
     def transcribe(self, audio_path: str) -> Transcript:
         # 模拟文本作为转写结果
         return Transcript([Segment(0.0, 0.0, "这是模拟的音频转写文本")])
+
+    def transcribe_array(self, samples, sample_rate: int = 16000) -> Transcript:
+        return self.transcribe("<memory>")
@@ -0,0 +1,176 @@
+# src/video2note/transcriber/model_registry.py
+"""
+进程级 Whisper 模型注册表：
+- 每个模型（按 名称 + device）在进程内只加载一次，被所有分P / 批量任务共享
+- 支持启动时在后台线程预热（与 DownloadStage 重叠执行）
+- 配置了多个模型尺寸时按 LRU 淘汰：超过 max_loaded_models，或可用内存低于 min_free_memory_mb
+- whisper 模型的 transcribe 不是线程安全的（每次解码在模型上挂 kv-cache hook），
+  共享模型的推理必须经 use() 取得，同一模型同一时刻只有一个线程在推理
+"""
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from video2note.config_manager.loader import get_config_value
+
+
+def _available_memory_mb() -> Optional[float]:
+    """读取 /proc/meminfo 的 MemAvailable；无法获取时返回 None（不做内存淘汰）"""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _load_whisper(name: str, device: Optional[str] = None):
+    import whisper
+    return whisper.load_model(name, device=device)
+
+
+class WhisperModelRegistry:
+    def __init__(self, max_models: int = 2, min_free_memory_mb: float = 0,
+                 loader: Callable = _load_whisper):
+        self.max_models = max(1, int(max_models))
+        self.min_free_memory_mb = float(min_free_memory_mb or 0)
+        self._loader = loader
+        self._models: "OrderedDict[tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 每个模型一把加载锁：并发请求同一模型时只加载一次，其余等待
+        self._load_locks = {}
+        # 每个模型一把推理锁：串行化同一模型上的 transcribe
+        self._infer_locks = {}
+
+    def configure(self, max_models: Optional[int] = None, min_free_memory_mb: Optional[float] = None):
+        with self._lock:
+            if max_models is not None:
+                self.max_models = max(1, int(max_models))
+            if min_free_memory_mb is not None:
+                self.min_free_memory_mb = float(min_free_memory_mb)
+
+    def get(self, name: str, device: Optional[str] = None):
+        key = (name, device)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self._models.get(key)
+                if model is not None:
+                    self._models.move_to_end(key)
+                    return model
+            self._make_room()
+            start = time.monotonic()
+            model = self._loader(name, device)
+            logging.info(f"[WhisperModelRegistry] 已加载模型 {name} (device={device})，"
+                         f"耗时 {time.monotonic() - start:.1f}s")
+            with self._lock:
+                self._models[key] = model
+                self._models.move_to_end(key)
+            return model
+
+    @contextmanager
+    def use(self, name: str, device: Optional[str] = None):
+        """with registry.use(name, device) as model: model.transcribe(...)  持有该模型的推理锁"""
+        model = self.get(name, device)
+        with self._lock:
+            infer_lock = self._infer_locks.setdefault((name, device), threading.Lock())
+        with infer_lock:
+            yield model
+
+    def _make_room(self):
+        """加载新模型前按 LRU 淘汰：数量超限或可用内存不足"""
+        while True:
+            with self._lock:
+                if not self._models:
+                    return
+                over_count = len(self._models) >= self.max_models
+                free = _available_memory_mb() if self.min_free_memory_mb > 0 else None
+                low_memory = free is not None and free < self.min_free_memory_mb
+                if not (over_count or low_memory):
+                    return
+                key, _ = self._models.popitem(last=False)
+            reason = "数量超限" if over_count else f"可用内存 {free:.0f}MB 不足"
+            logging.info(f"[WhisperModelRegistry] 淘汰模型 {key[0]} (device={key[1]})：{reason}")
+            self._release_memory()
+
+    @staticmethod
+    def _release_memory():
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def evict(self, name: str, device: Optional[str] = None) -> bool:
+        with self._lock:
+            removed = self._models.pop((name, device), None) is not None
+        if removed:
+            self._release_memory()
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+        self._release_memory()
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return [name for name, _ in self._models]
+
+    def warm_up(self, names: List[str], device: Optional[str] = None) -> threading.Thread:
+        """在后台线程依次加载 names，返回该线程；加载失败只记日志，真正转写时会再次尝试"""
+
+        def _run():
+            for name in names:
+                try:
+                    self.get(name, device)
+                except Exception as e:
+                    logging.warning(f"[WhisperModelRegistry] 预热模型 {name} 失败: {e}")
+
+        t = threading.Thread(target=_run, name="v2n-whisper-warmup", daemon=True)
+        t.start()
+        return t
+
+
+_registry = WhisperModelRegistry()
+
+
+def get_model_registry(config=None) -> WhisperModelRegistry:
+    """返回进程级单例；传入 config 时按 providers.local 更新淘汰参数"""
+    if config is not None:
+        _registry.configure(
+            max_models=get_config_value(config, "providers.local.max_loaded_models", None),
+            min_free_memory_mb=get_config_value(config, "providers.local.min_free_memory_mb", None),
+        )
+    return _registry
+
+
+def warm_up_from_config(config) -> Optional[threading.Thread]:
+    """
+    transcriber 为 local_whisper 且 providers.local.warmup 为 true 时，
+    在后台预热 whisper_model 以及 providers.local.warmup_models 中列出的模型。
+    """
+    provider = get_config_value(config, "transcriber.provider", get_config_value(config, "ai.provider", ""))
+    if str(provider).lower() != "local_whisper" or not get_config_value(config, "providers.local.warmup", False):
+        return None
+    names = [get_config_value(config, "providers.local.whisper_model", "base")]
+    for extra in get_config_value(config, "providers.local.warmup_models", []) or []:
+        if extra not in names:
+            names.append(extra)
+    device = get_config_value(config, "providers.local.device", None)
+    logging.info(f"[WhisperModelRegistry] 后台预热模型: {names}")
+    return get_model_registry(config).warm_up(names, device)
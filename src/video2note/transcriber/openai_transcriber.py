@@ -1,8 +1,14 @@
 # src/video2note/transcriber/openai_transcriber.py
 
+import asyncio
+from pathlib import Path
+
 from video2note.transcriber.base import Transcriber
+from video2note.transcriber.cloud_chunking import ChunkedUpload
 from video2note.types.transcript import Transcript, Segment
 from video2note.core.exceptions import TranscriptionError
+from video2note.utils.aio import run_in_thread
+from video2note.utils.http import aclose_async_client, get_async_httpx_client, get_httpx_client
 from video2note.utils.logger import logging
 
 import openai  # 假设你使用 openai 库
@@ -10,32 +16,75 @@ import openai  # 假设你使用 openai 库
 
 
 class OpenAITranscriber(Transcriber):
+    supports_concurrency = True
+    uploads_audio = True
+
     def __init__(self, config):
         super().__init__(config)
         openai_cfg = config.providers.openai  # 假定 config.providers.openai 是一个 Namespace
         self.api_key = openai_cfg.api_key
         if not self.api_key:
             raise ValueError("OpenAI API key not configured")
-        openai.api_key = self.api_key
+        self.client = openai.OpenAI(api_key=self.api_key, http_client=get_httpx_client(config))
 
         # 模型 /语言 /其他参数
         self.model = openai_cfg.model
         self.language = getattr(config.video, "language", "zh")
+        # 例如 whisper-1 的 "verbose_json"，返回带时间戳的分段
+        self.response_format = getattr(openai_cfg, "response_format", None)
+        # 上传前的中间音频编码（providers.openai.audio_codec / audio_bitrate）
+        self.audio_codec = getattr(openai_cfg, "audio_codec", None) or "opus"
+        self.audio_bitrate = getattr(openai_cfg, "audio_bitrate", None)
+        # 长音频分块压缩后并发上传（transcriber.chunked_upload）
+        self.chunked_upload = ChunkedUpload.from_config(config)
+
+    def _request_kwargs(self) -> dict:
+        kwargs = {"model": self.model, "language": self.language}
+        if self.response_format:
+            kwargs["response_format"] = self.response_format
+        return kwargs
+
+    @staticmethod
+    def _to_transcript(result) -> Transcript:
+        segments = getattr(result, "segments", None)
+        if segments:
+            return Transcript([Segment(float(s.start), float(s.end), s.text.strip()) for s in segments])
+        # 纯文本响应没有时间戳信息，整个文本作为一个 Segment
+        seg = Segment(start=0.0, end=0.0, text=result.text, confidence=None)
+        return Transcript([seg])
 
     def transcribe(self, audio_path: str) -> Transcript:
+        if self.chunked_upload.applies(audio_path):
+            async def _run():
+                try:
+                    return await self.chunked_upload.transcribe(audio_path, self._aupload)
+                finally:
+                    await aclose_async_client()
+
+            return asyncio.run(_run())
         logging.info(f"[OpenAITranscriber] 转写音频 {audio_path}，模型 {self.model}")
         try:
             with open(audio_path, "rb") as f:
-                result = openai.Audio.transcriptions.create(
-                    model=self.model,
-                    file=f,
-                    language=self.language
-                )
-            text = result.text
-            # 这里假设 OpenAI 接口只返回纯文本，没有时间戳信息
-            # 我们将整个文本作为一个 Segment
-            seg = Segment(start=0.0, end=0.0, text=text, confidence=None)
-            return Transcript([seg])
+                result = self.client.audio.transcriptions.create(file=f, **self._request_kwargs())
+            return self._to_transcript(result)
+        except Exception as e:
+            logging.error(f"[OpenAITranscriber] 转写失败: {e}")
+            raise TranscriptionError(f"OpenAI transcribe failed: {e}")
+
+    async def atranscribe(self, audio_path: str) -> Transcript:
+        if await run_in_thread(self.chunked_upload.applies, audio_path):
+            return await self.chunked_upload.transcribe(audio_path, self._aupload)
+        return await self._aupload(audio_path)
+
+    async def _aupload(self, audio_path: str) -> Transcript:
+        logging.info(f"[OpenAITranscriber] 异步转写音频 {audio_path}，模型 {self.model}")
+        try:
+            data = await run_in_thread(Path(audio_path).read_bytes)
+            # 异步客户端按事件循环共享连接池
+            client = openai.AsyncOpenAI(api_key=self.api_key, http_client=get_async_httpx_client(self.config))
+            result = await client.audio.transcriptions.create(file=(Path(audio_path).name, data),
+                                                              **self._request_kwargs())
+            return self._to_transcript(result)
         except Exception as e:
             logging.error(f"[OpenAITranscriber] 转写失败: {e}")
             raise TranscriptionError(f"OpenAI transcribe failed: {e}")
@@ -1,11 +1,19 @@
+import asyncio
+import os
+
 from video2note.transcriber.base import Transcriber
+from video2note.transcriber.cloud_chunking import ChunkedUpload
 from video2note.types.transcript import Transcript, Segment
 from video2note.core.exceptions import TranscriptionError
+from video2note.utils.aio import run_in_thread
 from video2note.utils.logger import logging
 
 import dashscope  # 你原来使用的库
 
 class QwenTranscriber(Transcriber):
+    supports_concurrency = True
+    uploads_audio = True
+
     def __init__(self, config):
         super().__init__(config)
         cfg = config.providers.qwen
@@ -13,13 +21,16 @@ class QwenTranscriber(Transcriber):
         if not self.api_key:
             raise ValueError("Qwen API key not configured")
         self.asr_model = cfg.asr_model
+        # 上传前的中间音频编码（providers.qwen.audio_codec / audio_bitrate）
+        self.audio_codec = getattr(cfg, "audio_codec", None) or "opus"
+        self.audio_bitrate = getattr(cfg, "audio_bitrate", None)
+        # 长音频分块压缩后并发上传（transcriber.chunked_upload）
+        self.chunked_upload = ChunkedUpload.from_config(config)
 
-    def transcribe(self, audio_path: str) -> Transcript:
+    def _request(self, audio_path: str) -> dict:
         if not audio_path or not os.path.exists(audio_path):
             raise TranscriptionError(f"Audio file does not exist: {audio_path}")
 
-        logging.info(f"[QwenTranscriber] 转写音频 {audio_path} 模型 {self.asr_model}")
-
         language_hint = getattr(self.config.video, "language", "zh")
         language_prompts = {
             "zh": "请将音频内容逐字转写为中文文本，不要总结。",
@@ -28,25 +39,22 @@ class QwenTranscriber(Transcriber):
             "ko": "오디오 내용을 한글 텍스트로 충실하게 받아쓰기 하세요。"
         }
         prompt_text = language_prompts.get(language_hint, "Transcribe the audio.")
+        return {
+            "model": "paraformer-v2",
+            "api_key": self.api_key,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"audio": audio_path},
+                        {"text": prompt_text}
+                    ]
+                }
+            ]
+        }
 
-        try:
-            response = dashscope.Generation.call(
-                model="paraformer-v2",
-                api_key=self.api_key,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"audio": audio_path},
-                            {"text": prompt_text}
-                        ]
-                    }
-                ]
-            )
-        except Exception as e:
-            logging.error(f"[QwenTranscriber] 请求失败: {e}")
-            raise TranscriptionError(f"Qwen ASR request failed: {e}")
-
+    @staticmethod
+    def _parse(response) -> Transcript:
         # 解析响应
         if response.status_code == 200:
             choices = response.output.get("choices", [])
@@ -57,3 +65,37 @@ class QwenTranscriber(Transcriber):
             return Transcript([seg])
         else:
             raise TranscriptionError(f"Qwen ASR failed [code={response.code}]: {response.message}")
+
+    def transcribe(self, audio_path: str) -> Transcript:
+        if self.chunked_upload.applies(audio_path):
+            return asyncio.run(self.chunked_upload.transcribe(audio_path, self._aupload))
+        return self._upload(audio_path)
+
+    async def atranscribe(self, audio_path: str) -> Transcript:
+        if await run_in_thread(self.chunked_upload.applies, audio_path):
+            return await self.chunked_upload.transcribe(audio_path, self._aupload)
+        return await self._aupload(audio_path)
+
+    def _upload(self, audio_path: str) -> Transcript:
+        request = self._request(audio_path)
+        logging.info(f"[QwenTranscriber] 转写音频 {audio_path} 模型 {self.asr_model}")
+        try:
+            response = dashscope.Generation.call(**request)
+        except Exception as e:
+            logging.error(f"[QwenTranscriber] 请求失败: {e}")
+            raise TranscriptionError(f"Qwen ASR request failed: {e}")
+        return self._parse(response)
+
+    async def _aupload(self, audio_path: str) -> Transcript:
+        # 较新的 dashscope 提供原生异步的 AioGeneration；旧版本退回线程池
+        aio_generation = getattr(dashscope, "AioGeneration", None)
+        if aio_generation is None:
+            return await run_in_thread(self._upload, audio_path)
+        request = self._request(audio_path)
+        logging.info(f"[QwenTranscriber] 异步转写音频 {audio_path} 模型 {self.asr_model}")
+        try:
+            response = await aio_generation.call(**request)
+        except Exception as e:
+            logging.error(f"[QwenTranscriber] 请求失败: {e}")
+            raise TranscriptionError(f"Qwen ASR request failed: {e}")
+        return self._parse(response)
@@ -0,0 +1,156 @@
+# src/video2note/transcriber/subtitles.py
+"""
+字幕快速路径：把下载到的字幕文件（SRT / B 站 JSON / ASS）解析成带时间戳的 Segment，
+有字幕的分P可以完全跳过 ASR。
+
+bilix 以 subtitle=True 下载时，字幕保存在分P目录的 extra/ 子目录中（B 站 JSON 已转成 SRT）；
+本地文件则按同名字幕（lecture.mp4 + lecture.srt / lecture.zh.srt）查找。
+"""
+import json
+import logging
+import re
+from pathlib import Path
+from typing import List, Optional
+
+from video2note.types.transcript import Segment, Transcript
+
+SUBTITLE_SUFFIXES = (".srt", ".json", ".ass", ".ssa")
+
+# 自动生成（AI）字幕的文件名标记，人工字幕优先
+_AUTO_MARKERS = ("自动生成", "ai-", "auto")
+
+_SRT_TIME = re.compile(r"(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})")
+_ASS_TAG = re.compile(r"\{[^}]*\}")
+
+
+def _read_text(path) -> str:
+    with open(path, "rb") as f:
+        raw = f.read()
+    for encoding in ("utf-8-sig", "utf-16", "gb18030"):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
+def _srt_seconds(h, m, s, ms) -> float:
+    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms.ljust(3, "0")) / 1000.0
+
+
+def parse_srt(text: str) -> List[Segment]:
+    segments: List[Segment] = []
+    for block in re.split(r"\r?\n\s*\r?\n", text.strip()):
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        for i, line in enumerate(lines):
+            if "-->" not in line:
+                continue
+            times = _SRT_TIME.findall(line)
+            if len(times) != 2:
+                break
+            content = " ".join(lines[i + 1:]).strip()
+            if content:
+                segments.append(Segment(_srt_seconds(*times[0]), _srt_seconds(*times[1]), content))
+            break
+    return segments
+
+
+def parse_bilibili_json(text: str) -> List[Segment]:
+    """B 站 CC 字幕 JSON（{"body": [{"from", "to", "content"}]}），也兼容 [{"start", "end", "text"}]"""
+    data = json.loads(text)
+    items = data.get("body", []) if isinstance(data, dict) else data
+    segments: List[Segment] = []
+    for item in items or []:
+        content = (item.get("content") or item.get("text") or "").strip()
+        if not content:
+            continue
+        start = float(item.get("from", item.get("start", 0.0)))
+        end = float(item.get("to", item.get("end", start)))
+        segments.append(Segment(start, end, content))
+    return segments
+
+
+def _ass_seconds(value: str) -> float:
+    h, m, s = value.strip().split(":")
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def parse_ass(text: str) -> List[Segment]:
+    """
+    解析 [Events] 中的 Dialogue 行，去掉 {\\...} 样式标签，\\N 换行替换为空格。
+    只采用 [Events] 段的 Format 行（[V4+ Styles] 段也有自己的 Format 行）。
+    """
+    fields: Optional[List[str]] = None
+    section = ""
+    segments: List[Segment] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].strip().lower()
+        elif line.startswith("Format:") and section == "events":
+            fields = [f.strip().lower() for f in line[len("Format:"):].split(",")]
+        elif line.startswith("Dialogue:"):
+            cols = fields or ["layer", "start", "end", "style", "name", "marginl", "marginr", "marginv",
+                              "effect", "text"]
+            values = line[len("Dialogue:"):].split(",", len(cols) - 1)
+            if len(values) < len(cols):
+                continue
+            row = dict(zip(cols, values))
+            content = _ASS_TAG.sub("", row["text"]).replace("\\N", " ").replace("\\n", " ").strip()
+            if content:
+                segments.append(Segment(_ass_seconds(row["start"]), _ass_seconds(row["end"]), content))
+    return segments
+
+
+def parse_subtitle_file(path) -> Transcript:
+    """按扩展名解析字幕文件，返回按开始时间排序的 Transcript"""
+    path = Path(path)
+    text = _read_text(path)
+    suffix = path.suffix.lower()
+    if suffix == ".srt":
+        segments = parse_srt(text)
+    elif suffix == ".json":
+        segments = parse_bilibili_json(text)
+    elif suffix in (".ass", ".ssa"):
+        segments = parse_ass(text)
+    else:
+        raise ValueError(f"Unsupported subtitle format: {path}")
+    segments.sort(key=lambda s: s.start)
+    return Transcript(segments)
+
+
+def find_subtitles(media_path) -> List[Path]:
+    """
+    查找分P对应的字幕文件，按优先级排序：
+    同名字幕 > 同目录 / extra/ 下的人工字幕 > 自动生成字幕。
+    """
+    media = Path(media_path)
+    folder = media.parent
+    candidates = []
+    for d in (folder, folder / "extra"):
+        if d.is_dir():
+            candidates.extend(p for p in d.iterdir() if p.is_file() and p.suffix.lower() in SUBTITLE_SUFFIXES)
+
+    def rank(p: Path):
+        same_stem = p.stem == media.stem or p.stem.startswith(media.stem + ".")
+        auto = any(m in p.name.lower() for m in _AUTO_MARKERS)
+        return (not same_stem, auto, p.suffix.lower() != ".srt", p.name)
+
+    # 同目录下的字幕只认同名的，避免本地目录里多个视频互相串字幕
+    candidates = [p for p in dict.fromkeys(candidates)
+                  if p.parent.name == "extra" or p.stem == media.stem or p.stem.startswith(media.stem + ".")]
+    return sorted(candidates, key=rank)
+
+
+def load_subtitles(media_path) -> Optional[Transcript]:
+    """返回第一个能解析出内容的字幕；没有可用字幕时返回 None"""
+    for path in find_subtitles(media_path):
+        try:
+            transcript = parse_subtitle_file(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"[subtitles] 字幕解析失败 {path}: {e}")
+            continue
+        if transcript.segments:
+            logging.info(f"[subtitles] 使用字幕 {path}（{len(transcript.segments)} 段）")
+            return transcript
+    return None
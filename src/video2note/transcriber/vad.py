@@ -0,0 +1,190 @@
+# src/video2note/transcriber/vad.py
+"""
+转写前的语音活动检测（VAD）：去掉长时间的静音（课间休息、调试设备、共享屏幕时的停顿），
+减少本地 ASR 的计算量和云端按时长计费的分钟数。
+
+1. 按 frame_ms 分帧，计算每帧的能量（dBFS）和过零率（ZCR）
+2. 能量高于阈值的帧判为语音；能量略低（threshold_db - zcr_margin_db 以内）但过零率高的帧
+   （清辅音等）也判为语音。阈值默认取 噪声底（能量的第 10 百分位）+ margin_db
+3. 平滑：短于 min_silence_ms 的静音并入语音，短于 min_speech_ms 的语音丢弃，
+   每段语音前后各留 pad_ms
+4. 拼接保留的语音段，同时生成 TimeMap：转写结果的时间戳通过它映射回原视频时间轴
+
+配置（transcriber.vad，均可选）：
+    enabled          是否启用，默认 false
+    frame_ms         帧长，默认 30
+    threshold_db     固定能量阈值（dBFS），默认按噪声底自适应
+    margin_db        自适应阈值高出噪声底的 dB 数，默认 10
+    zcr_margin_db    高过零率帧允许低于阈值的 dB 数，默认 6
+    zcr_threshold    高过零率的判定值（每个样本的过零比例），默认 0.25
+    min_speech_ms    最短语音段，默认 250
+    min_silence_ms   达到该时长的静音才会被去掉，默认 1000
+    pad_ms           语音段前后保留的余量，默认 200
+    min_saving       去掉的时长占比低于该值时不裁剪（避免为几秒静音重新编码），默认 0.05
+"""
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+from video2note.config_manager.loader import get_config_value
+from video2note.types.transcript import Segment, Transcript
+
+# 自适应阈值的下限：整段几乎无声时不至于把底噪判为语音
+_MIN_THRESHOLD_DB = -50.0
+# 判断是否落在拼接处时的容差（秒）：保留区间长度由浮点相减累加得到，会有 1e-16 量级的误差
+_SPLICE_EPS = 1e-6
+
+
+class TimeMap:
+    """
+    裁剪后音频与原音频的时间对应关系：第 i 段保留区间在裁剪后从 trimmed[i] 开始，
+    对应原音频的 original[i]，长度 lengths[i]（秒）。
+    """
+
+    def __init__(self, spans: List[Tuple[float, float]]):
+        """spans 为按时间排序、互不重叠的原音频保留区间 [(起点秒数, 终点秒数)]"""
+        self.original: List[float] = []
+        self.trimmed: List[float] = []
+        self.lengths: List[float] = []
+        pos = 0.0
+        for start, end in spans:
+            self.original.append(start)
+            self.trimmed.append(pos)
+            self.lengths.append(end - start)
+            pos += end - start
+
+    @property
+    def kept_seconds(self) -> float:
+        return sum(self.lengths)
+
+    def to_original(self, t: float, is_end: bool = False) -> float:
+        """
+        把裁剪后音频的时间 t 映射回原音频。恰好落在两段拼接处的时间，
+        作为段起点时归到后一段，作为段终点（is_end）时归到前一段。
+        """
+        if not self.trimmed:
+            return t
+        i = (bisect_left(self.trimmed, t - _SPLICE_EPS) if is_end
+             else bisect_right(self.trimmed, t + _SPLICE_EPS)) - 1
+        i = min(max(i, 0), len(self.trimmed) - 1)
+        return self.original[i] + min(max(t - self.trimmed[i], 0.0), self.lengths[i])
+
+    def remap(self, transcript: Transcript) -> Transcript:
+        """返回时间戳映射回原音频时间轴的 Transcript"""
+        return Transcript(
+            Segment(self.to_original(seg.start), max(self.to_original(seg.start), self.to_original(seg.end, True)),
+                    seg.text, seg.confidence)
+            for seg in transcript.segments
+        )
+
+    def __repr__(self):
+        return f"TimeMap({len(self.lengths)} spans, {self.kept_seconds:.1f}s kept)"
+
+
+def frame_features(samples, sample_rate: int, frame_ms: int = 30):
+    """返回 (每帧能量 dBFS, 每帧过零率)，末尾不足一帧的样本忽略"""
+    import numpy as np
+
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(samples) // frame
+    frames = np.asarray(samples[:n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame)
+    return energy_db, zcr
+
+
+def _runs(mask) -> List[Tuple[int, int]]:
+    """布尔数组中连续 True 的区间 [(起, 止)]（止不含）"""
+    import numpy as np
+
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+
+class VoiceActivityDetector:
+    def __init__(self, enabled: bool = False, frame_ms: int = 30, threshold_db: Optional[float] = None,
+                 margin_db: float = 10.0, zcr_margin_db: float = 6.0, zcr_threshold: float = 0.25,
+                 min_speech_ms: int = 250, min_silence_ms: int = 1000, pad_ms: int = 200,
+                 min_saving: float = 0.05):
+        self.enabled = enabled
+        self.frame_ms = int(frame_ms)
+        self.threshold_db = None if threshold_db is None else float(threshold_db)
+        self.margin_db = float(margin_db)
+        self.zcr_margin_db = float(zcr_margin_db)
+        self.zcr_threshold = float(zcr_threshold)
+        self.min_speech_ms = int(min_speech_ms)
+        self.min_silence_ms = int(min_silence_ms)
+        self.pad_ms = int(pad_ms)
+        self.min_saving = float(min_saving)
+
+    @classmethod
+    def from_config(cls, config) -> "VoiceActivityDetector":
+        def _get(name, default):
+            return get_config_value(config, f"transcriber.vad.{name}", default)
+
+        return cls(
+            enabled=bool(_get("enabled", False)),
+            frame_ms=_get("frame_ms", 30),
+            threshold_db=_get("threshold_db", None),
+            margin_db=_get("margin_db", 10.0),
+            zcr_margin_db=_get("zcr_margin_db", 6.0),
+            zcr_threshold=_get("zcr_threshold", 0.25),
+            min_speech_ms=_get("min_speech_ms", 250),
+            min_silence_ms=_get("min_silence_ms", 1000),
+            pad_ms=_get("pad_ms", 200),
+            min_saving=_get("min_saving", 0.05),
+        )
+
+    def signature(self) -> dict:
+        """参与转写缓存 key 的设置：VAD 设置变化后裁剪结果不同，旧缓存应失效"""
+        return {k: v for k, v in vars(self).items()}
+
+    def detect(self, samples, sample_rate: int) -> List[Tuple[int, int]]:
+        """返回语音区间 [(起始样本, 结束样本)]（已平滑、加余量并合并）"""
+        import numpy as np
+
+        energy_db, zcr = frame_features(samples, sample_rate, self.frame_ms)
+        if not len(energy_db):
+            return [(0, len(samples))] if len(samples) else []
+        threshold = self.threshold_db
+        if threshold is None:
+            threshold = max(float(np.percentile(energy_db, 10)) + self.margin_db, _MIN_THRESHOLD_DB)
+        speech = (energy_db > threshold) | \
+                 ((energy_db > threshold - self.zcr_margin_db) & (zcr > self.zcr_threshold))
+
+        frame = max(1, int(sample_rate * self.frame_ms / 1000))
+        min_silence = max(1, self.min_silence_ms // self.frame_ms)
+        min_speech = max(1, self.min_speech_ms // self.frame_ms)
+        # 填平短静音
+        for start, end in _runs(~speech):
+            if end - start < min_silence and start > 0 and end < len(speech):
+                speech[start:end] = True
+        pad = int(sample_rate * self.pad_ms / 1000)
+        spans: List[Tuple[int, int]] = []
+        for start, end in _runs(speech):
+            if end - start < min_speech:
+                continue
+            lo = max(0, start * frame - pad)
+            hi = len(samples) if end == len(speech) else min(len(samples), end * frame + pad)
+            if spans and lo <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], hi))
+            else:
+                spans.append((lo, hi))
+        return spans
+
+    def trim(self, samples, sample_rate: int):
+        """
+        返回 (裁剪后的样本, TimeMap)。检测不到语音时返回 (空数组, TimeMap([]))；
+        能去掉的时长不足 min_saving 时不裁剪，返回 (原样本, None)。
+        """
+        import numpy as np
+
+        spans = self.detect(samples, sample_rate)
+        kept = sum(end - start for start, end in spans)
+        if len(samples) and kept > len(samples) * (1.0 - self.min_saving):
+            return samples, None
+        time_map = TimeMap([(start / float(sample_rate), end / float(sample_rate)) for start, end in spans])
+        if not spans:
+            return np.zeros(0, dtype=np.float32), time_map
+        return np.concatenate([samples[start:end] for start, end in spans]), time_map
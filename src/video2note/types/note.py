@@ -20,3 +20,16 @@ class Note:
         for sec in self.sections:
             md += f"## {sec.title}\n\n{sec.content}\n\n"
         return md
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "sections": [{"title": sec.title, "content": sec.content} for sec in self.sections],
+            "metadata": self.metadata,
+            "frames": self.frames,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Note":
+        sections = [NoteSection(x["title"], x["content"]) for x in d.get("sections", [])]
+        return cls(d.get("title", ""), sections, metadata=d.get("metadata"), frames=d.get("frames"))
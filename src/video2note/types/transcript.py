@@ -1,9 +1,37 @@
 # src/video2note/types/transcript.py
+"""
+Transcript 采用列式紧凑存储：
+- start / end / confidence 为 float64 列（confidence 缺失记为 NaN）
+- 所有片段文本以 " " 连接成一个 UTF-8 缓冲区，offsets[i] 为第 i 段在缓冲区中的起始字节，
+  offsets[n] = len(缓冲区) + 1；第 i 段文本为 buf[offsets[i]:offsets[i + 1] - 1]
 
-from typing import List, Optional
+因此整篇文本就是缓冲区本身，按时间范围切片只是在列和缓冲区上取连续的子区间，都不复制数据。
+save / load 使用二进制文件（见 Transcript.save），load 默认 mmap 映射，数千小时的转写也不必整体读入内存。
+save 先写同目录的临时文件再 os.replace，不会截断仍被 mmap 映射的旧文件；
+从文件加载（或刚保存）且之后未修改的转写再次保存到同一路径时直接跳过。
+transcript.segments 仍可按下标 / 迭代得到 Segment 对象（按需从列中构造），也保留了原来列表的
+append / extend / 下标赋值：追加的片段先暂存，下次读取时一次性重建列（列本身从不原地扩容，
+已切出的视图和 mmap 映射不受影响）；下标赋值会重建整列，为 O(n)。
+"""
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Union
+
+# 二进制格式：header（魔数、字节序、段数、缓冲区长度）+ start / end / confidence / offsets 列 + 文本缓冲区
+_MAGIC = b"V2NTRS01"
+_HEADER = struct.Struct("<8sB7xQQ")
+_BYTEORDER = {"little": 0, "big": 1}
 
 
 class Segment:
+    __slots__ = ("start", "end", "text", "confidence")
+
     def __init__(self, start: float, end: float, text: str, confidence: Optional[float] = None):
         self.start = start
         self.end = end
@@ -13,12 +41,239 @@ class Segment:
     def __repr__(self):
         return f"Segment({self.start:.2f}-{self.end:.2f}: {self.text})"
 
+    def to_dict(self) -> dict:
+        return {"start": self.start, "end": self.end, "text": self.text, "confidence": self.confidence}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Segment":
+        return cls(d["start"], d["end"], d["text"], d.get("confidence"))
+
+
+class SegmentView:
+    """Transcript.segments：下标访问时才从列中构造 Segment；append / extend / 下标赋值写回 Transcript"""
+
+    __slots__ = ("_t",)
+
+    def __init__(self, transcript: "Transcript"):
+        self._t = transcript
+
+    def __len__(self):
+        return len(self._t)
+
+    def __getitem__(self, idx: Union[int, slice]):
+        n = len(self._t)
+        if isinstance(idx, slice):
+            return [self._t.segment(i) for i in range(*idx.indices(n))]
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("segment index out of range")
+        return self._t.segment(idx)
+
+    def __setitem__(self, idx: int, seg: Segment):
+        self._t.set_segment(idx, seg)
+
+    def append(self, seg: Segment):
+        self._t.append(seg)
+
+    def extend(self, segs: Iterable[Segment]):
+        self._t.extend(segs)
+
+    def __iter__(self) -> Iterator[Segment]:
+        for i in range(len(self._t)):
+            yield self._t.segment(i)
+
+    def __bool__(self):
+        return len(self._t) > 0
+
+    def __repr__(self):
+        return f"SegmentView({len(self)} segments)"
+
+
 class Transcript:
-    def __init__(self, segments: List[Segment]):
-        self.segments = segments
+    def __init__(self, segments: Iterable[Segment] = ()):
+        starts, ends, confs, offsets = array("d"), array("d"), array("d"), array("q")
+        texts: List[bytes] = []
+        pos = 0
+        for seg in segments:
+            starts.append(seg.start)
+            ends.append(seg.end)
+            confs.append(math.nan if seg.confidence is None else seg.confidence)
+            data = seg.text.encode("utf-8")
+            offsets.append(pos)
+            texts.append(data)
+            pos += len(data) + 1
+        offsets.append(pos)
+        self._set_columns(memoryview(starts), memoryview(ends), memoryview(confs), memoryview(offsets),
+                          memoryview(b" ".join(texts)), 0)
+
+    def _set_columns(self, starts, ends, confs, offsets, buf, base: int):
+        # offsets 为绝对字节位置，base 为本视图在 buf 中的起点（切片视图共享父对象的 buf）
+        self._starts = starts
+        self._ends = ends
+        self._confs = confs
+        self._offsets = offsets
+        self._buf = buf
+        self._base = base
+        self._text: Optional[str] = None
+        # append / extend 暂存的片段，下次读取列之前合并（_flush）
+        self._pending: Optional[List[Segment]] = None
+        # 内容与之一致的文件（load 的来源或最近一次 save 的目标）；内容变化后置为 None
+        self._path: Optional[str] = None
+
+    @classmethod
+    def _view(cls, starts, ends, confs, offsets, buf, base: int = 0) -> "Transcript":
+        obj = cls.__new__(cls)
+        obj._set_columns(starts, ends, confs, offsets, buf, base)
+        return obj
+
+    # ---------- Segment 兼容接口 ----------
+
+    def __len__(self):
+        return len(self._starts) + (len(self._pending) if self._pending else 0)
+
+    @property
+    def segments(self) -> SegmentView:
+        return SegmentView(self)
+
+    # ---------- 修改 ----------
+
+    def append(self, seg: Segment):
+        self.extend((seg,))
+
+    def extend(self, segs: Iterable[Segment]):
+        if self._pending is None:
+            self._pending = []
+        self._pending.extend(segs)
+        self._text = None
+        self._path = None
+
+    def set_segment(self, idx: int, seg: Segment):
+        segs = list(self.segments)
+        segs[idx] = seg
+        self._rebuild(segs)
+
+    def _flush(self):
+        if self._pending:
+            pending, self._pending = self._pending, None
+            self._rebuild([self._segment(i) for i in range(len(self._starts))] + pending)
+
+    def _rebuild(self, segs: List[Segment]):
+        # 在新的数组上重建列（旧列可能被切片视图 / mmap 引用，不能原地修改）
+        fresh = Transcript(segs)
+        self._set_columns(fresh._starts, fresh._ends, fresh._confs, fresh._offsets, fresh._buf, 0)
+
+    # ---------- 读取 ----------
+
+    def segment(self, i: int) -> Segment:
+        self._flush()
+        return self._segment(i)
+
+    def _segment(self, i: int) -> Segment:
+        conf = self._confs[i]
+        return Segment(self._starts[i], self._ends[i], str(self.text_bytes(i), "utf-8"),
+                       None if math.isnan(conf) else conf)
+
+    def text_bytes(self, i: Optional[int] = None) -> memoryview:
+        """第 i 段（或 i 为 None 时整篇）文本的 UTF-8 字节视图，不复制"""
+        self._flush()
+        if not len(self):
+            return self._buf[0:0]
+        if i is None:
+            return self._buf[self._offsets[0] - self._base:self._offsets[len(self)] - 1 - self._base]
+        return self._buf[self._offsets[i] - self._base:self._offsets[i + 1] - 1 - self._base]
 
     def get_full_text(self) -> str:
-        # 拼接所有片段的 text
-        return " ".join(seg.text for seg in self.segments)
+        # 缓冲区即 " " 连接后的全文，只需解码一次
+        if self._text is None:
+            self._text = str(self.text_bytes(), "utf-8")
+        return self._text
+
+    # ---------- 时间范围切片 ----------
+
+    def slice(self, start: float, end: float) -> "Transcript":
+        """返回与 [start, end) 有交集的连续片段组成的视图（要求片段按 start 排序），不复制数据"""
+        self._flush()
+        i = bisect_right(self._ends, start)
+        j = max(i, bisect_left(self._starts, end))
+        return self[i:j]
+
+    def __getitem__(self, idx: slice) -> "Transcript":
+        if not isinstance(idx, slice):
+            raise TypeError("Transcript supports slice indexing only; use transcript.segments[i]")
+        self._flush()
+        i, j, step = idx.indices(len(self))
+        if step != 1:
+            raise ValueError("Transcript slices must be contiguous")
+        j = max(i, j)
+        return self._view(self._starts[i:j], self._ends[i:j], self._confs[i:j], self._offsets[i:j + 1],
+                          self._buf, self._base)
+
+    # ---------- 序列化 ----------
+
+    def __reduce__(self):
+        # memoryview / mmap 无法 pickle，跨进程传递时按 Segment 列表重建
+        return type(self), (list(self.segments),)
+
+    def to_dict(self) -> dict:
+        return {"segments": [seg.to_dict() for seg in self.segments]}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Transcript":
+        return cls(Segment.from_dict(x) for x in d.get("segments", []))
 
+    def save(self, path) -> str:
+        """
+        写出二进制文件：header + start / end / confidence（float64）+ offsets（int64，相对于本视图）+ 文本。
+        先写临时文件再原子替换：目标文件可能正被本对象（或其他 Transcript）mmap 映射，不能原地截断。
+        """
+        self._flush()
+        target = os.path.abspath(path)
+        if self._path == target and os.path.exists(target):
+            return str(path)
+        n = len(self)
+        base = self._offsets[0]
+        offsets = array("q", (o - base for o in self._offsets))
+        text = self.text_bytes()
+        fd, tmp = tempfile.mkstemp(prefix=".trs-", suffix=".tmp", dir=os.path.dirname(target))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _BYTEORDER[sys.byteorder], n, len(text)))
+                for col in (self._starts, self._ends, self._confs):
+                    f.write(col)
+                f.write(offsets)
+                f.write(text)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._path = target
+        return str(path)
 
+    @classmethod
+    def load(cls, path, use_mmap: bool = True) -> "Transcript":
+        """读取 save 写出的文件；use_mmap 时各列直接映射文件内容，不读入内存"""
+        with open(path, "rb") as f:
+            if use_mmap:
+                data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                data = memoryview(f.read())
+        magic, order, n, text_len = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a transcript file: {path}")
+        pos = _HEADER.size
+        cols = []
+        for fmt, count in (("d", n), ("d", n), ("d", n), ("q", n + 1)):
+            size = count * 8
+            col = data[pos:pos + size].cast(fmt)
+            if order != _BYTEORDER[sys.byteorder]:
+                swapped = array(fmt, col)
+                swapped.byteswap()
+                col = memoryview(swapped)
+            cols.append(col)
+            pos += size
+        # 各列都是 mmap 上的 memoryview，随 Transcript 一起保持映射
+        obj = cls._view(*cols, data[pos:pos + text_len], 0)
+        obj._path = os.path.abspath(path)
+        return obj
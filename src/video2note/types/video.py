@@ -16,3 +16,10 @@ class DownloadedVideo:
         self.frame_paths = frame_paths or []
         self.duration = duration
         self.meta = meta or {}
+
+    def part_paths(self) -> List[str]:
+        """
+        每个分P用于转写的媒体文件（按分P顺序）：
+        仅音频下载时为 meta['all_audio_paths']，否则为 meta['all_video_paths']
+        """
+        return self.meta.get("all_audio_paths") or self.meta.get("all_video_paths", [])
@@ -0,0 +1,14 @@
+# src/video2note/utils/aio.py
+"""
+asyncio 辅助函数。项目支持 Python 3.8，不能使用 3.9 才有的 asyncio.to_thread。
+"""
+import asyncio
+import contextvars
+import functools
+
+
+async def run_in_thread(func, *args, **kwargs):
+    """在事件循环的默认线程池中执行同步函数（等价于 asyncio.to_thread，兼容 3.8）"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(None, functools.partial(ctx.run, func, *args, **kwargs))
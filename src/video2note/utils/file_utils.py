@@ -5,6 +5,19 @@ from pathlib import Path
 from typing import Any
 
 
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+def resolve_project_path(path) -> Path:
+    """
+    配置中的相对路径统一按项目根目录解析，返回绝对路径
+    """
+    p = Path(path)
+    if not p.is_absolute():
+        p = PROJECT_ROOT / p
+    return p.resolve()
+
+
 def ensure_dir(path: str):
     p = Path(path)
     if not p.exists():
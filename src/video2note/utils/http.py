@@ -0,0 +1,139 @@
+# src/video2note/utils/http.py
+"""
+进程级共享的 HTTP 连接池，供各 summarizer / transcriber provider 使用：
+- requests.Session：keep-alive 连接池（pool_size），连接失败与 429 按退避重试
+- httpx.Client：给 openai SDK 作为 http_client，可选 HTTP/2（需要安装 h2）
+- httpx.AsyncClient：给 openai 异步客户端使用，按事件循环各建一个（连接不能跨事件循环复用）
+
+同一进程内所有分P共享连接，不再每次调用都重新做 TCP + TLS 握手。
+
+配置（均可选）：
+    http.pool_size        每个 host 的最大连接数，默认 16
+    http.connect_timeout  连接超时秒数，默认 10
+    http.read_timeout     读超时秒数，默认 120
+    http.retries          连接错误 / 429 的重试次数，默认 2
+    http.backoff          重试退避系数，默认 0.5
+    http.http2            httpx 客户端是否启用 HTTP/2，默认 false
+"""
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Tuple
+
+from video2note.config_manager.loader import get_config_value
+
+_lock = threading.Lock()
+_session = None
+_httpx_client = None
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+# 只对 429 按状态码重试：429 表示请求未被处理，POST 重发是安全的；
+# 5xx 时服务端可能已经执行了请求（LLM 已计费），由 provider 自行决定是否重试
+RETRY_STATUS = (429,)
+
+
+def http_timeout(config=None) -> Tuple[float, float]:
+    """(connect_timeout, read_timeout)"""
+    return (float(get_config_value(config, "http.connect_timeout", 10)),
+            float(get_config_value(config, "http.read_timeout", 120)))
+
+
+def get_session(config=None):
+    """返回进程级共享的 requests.Session（首次调用时按 config 创建）"""
+    global _session
+    if _session is not None:
+        return _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            pool_size = int(get_config_value(config, "http.pool_size", 16))
+            retries = int(get_config_value(config, "http.retries", 2))
+            # 只重试连接错误与限流；读超时和 5xx 不重试，避免 POST 被重复执行、LLM 请求被重复计费
+            retry = Retry(total=retries, connect=retries, read=0, status=retries,
+                          status_forcelist=RETRY_STATUS, allowed_methods=None,
+                          backoff_factor=float(get_config_value(config, "http.backoff", 0.5)),
+                          respect_retry_after_header=True, raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+            logging.info(f"[http] 创建共享 requests.Session，pool_size={pool_size}，retries={retries}")
+    return _session
+
+
+def get_httpx_client(config=None):
+    """
+    返回进程级共享的 httpx.Client（openai SDK 的 http_client）。
+    http.http2 为 true 且安装了 h2 时启用 HTTP/2，否则退回 HTTP/1.1 keep-alive。
+    """
+    global _httpx_client
+    if _httpx_client is not None:
+        return _httpx_client
+    with _lock:
+        if _httpx_client is None:
+            import httpx
+
+            timeout, transport_kwargs = _httpx_options(config)
+            # 连接池参数在 transport 上设置（传入 transport 时 Client 自身的 limits / http2 不生效）
+            _httpx_client = httpx.Client(timeout=timeout, transport=httpx.HTTPTransport(**transport_kwargs))
+            logging.info(f"[http] 创建共享 httpx.Client，pool_size={transport_kwargs['limits'].max_connections}，"
+                         f"http2={transport_kwargs['http2']}")
+    return _httpx_client
+
+
+def get_async_httpx_client(config=None):
+    """返回当前事件循环共享的 httpx.AsyncClient；须在协程中调用，循环结束前用 aclose_async_client 关闭"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            import httpx
+
+            timeout, transport_kwargs = _httpx_options(config)
+            client = httpx.AsyncClient(timeout=timeout, transport=httpx.AsyncHTTPTransport(**transport_kwargs))
+            _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    """关闭当前事件循环的 AsyncClient（若已创建）"""
+    with _lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _httpx_options(config) -> tuple:
+    import httpx
+
+    pool_size = int(get_config_value(config, "http.pool_size", 16))
+    connect, read = http_timeout(config)
+    http2 = bool(get_config_value(config, "http.http2", False))
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logging.warning("[http] 未安装 h2，HTTP/2 不可用，使用 HTTP/1.1")
+            http2 = False
+    return httpx.Timeout(read, connect=connect), {
+        "http2": http2,
+        "limits": httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        "retries": int(get_config_value(config, "http.retries", 2)),
+    }
+
+
+def close_all():
+    """关闭共享连接（进程退出前可选调用）"""
+    global _session, _httpx_client
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _httpx_client is not None:
+            _httpx_client.close()
+            _httpx_client = None
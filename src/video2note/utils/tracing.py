@@ -0,0 +1,200 @@
+# src/video2note/utils/tracing.py
+"""
+按阶段 / 分P 的耗时与资源追踪。
+- 每个 span 记录：墙钟时间、线程 CPU 时间、读写字节数，
+  启用 tracemalloc 时额外记录 span 期间的 Python 堆分配峰值
+- 进程峰值 RSS（ru_maxrss）是整个进程生命周期的高水位，只会上涨，
+  因此只作为进程级数值记在 span 的 process_max_rss_kb 和汇总表末尾，不按 span 汇总
+- cat="external" 的 span 用于外部调用（ASR / LLM / Notion / ffmpeg）的延迟
+- 导出 Chrome trace-event JSON（可直接拖进 Perfetto / chrome://tracing）以及汇总表
+
+默认是空实现（NullTracer），不产生任何开销；CLI 传入 --trace 时才启用。
+读写字节数来自进程级计数器（含已结束的 ffmpeg 子进程），并发 span 之间会互相叠加，仅作参考。
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，RSS / 子进程 I/O 记为 0
+    resource = None
+
+# tracemalloc.reset_peak 在 Python 3.9 才加入；3.8 上改为记录 span 期间已分配内存的净增量
+_HAS_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+
+
+def _io_counters() -> tuple:
+    """(read_bytes, write_bytes)：本进程 rchar/wchar + 已结束子进程的块 I/O"""
+    read_b = write_b = 0
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                k, _, v = line.partition(":")
+                if k == "rchar":
+                    read_b = int(v)
+                elif k == "wchar":
+                    write_b = int(v)
+    except OSError:
+        pass
+    if resource is None:
+        return read_b, write_b
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return read_b + children.ru_inblock * 512, write_b + children.ru_oublock * 512
+
+
+def _max_rss_kb() -> int:
+    if resource is None:
+        return 0
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children)
+
+
+class NullTracer:
+    enabled = False
+
+    def span(self, name: str, cat: str = "stage", part=None, **args):
+        return nullcontext()
+
+    def external(self, name: str, part=None, **args):
+        return nullcontext()
+
+
+class Tracer:
+    enabled = True
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self._t0 = time.perf_counter_ns()
+        self._events = []
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._open_spans = 0
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "stage", part=None, **args):
+        tid = threading.get_ident()
+        with self._lock:
+            self._threads.setdefault(tid, threading.current_thread().name)
+            if self.trace_memory and self._open_spans == 0 and _HAS_RESET_PEAK:
+                tracemalloc.reset_peak()
+            self._open_spans += 1
+        mem0 = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        io0 = _io_counters()
+        cpu0 = time.thread_time()
+        start = time.perf_counter_ns()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end = time.perf_counter_ns()
+            cpu = time.thread_time() - cpu0
+            io1 = _io_counters()
+            event_args = dict(args)
+            if part is not None:
+                event_args["part"] = part
+            event_args.update({
+                "cpu_ms": round(cpu * 1000, 3),
+                "process_max_rss_kb": _max_rss_kb(),
+                "read_bytes": io1[0] - io0[0],
+                "write_bytes": io1[1] - io0[1],
+            })
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                if _HAS_RESET_PEAK:
+                    event_args["py_peak_kb"] = peak // 1024
+                else:
+                    event_args["py_net_kb"] = (current - mem0) // 1024
+            if error is not None:
+                event_args["error"] = repr(error)
+            with self._lock:
+                self._open_spans -= 1
+                self._events.append({
+                    "name": name,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": (start - self._t0) / 1000.0,
+                    "dur": (end - start) / 1000.0,
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": event_args,
+                })
+
+    def external(self, name: str, part=None, **args):
+        """外部调用（云端 API / 子进程）的延迟"""
+        return self.span(name, cat="external", part=part, **args)
+
+    # ---------- 导出 ----------
+
+    def to_chrome_trace(self) -> dict:
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": tname}}
+            for tid, tname in threads.items()
+        ]
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms"}
+
+    def summary_rows(self) -> list:
+        agg = defaultdict(lambda: {"count": 0, "wall_ms": 0.0, "max_ms": 0.0, "cpu_ms": 0.0,
+                                   "read_bytes": 0, "write_bytes": 0})
+        with self._lock:
+            events = list(self._events)
+        for e in events:
+            row = agg[(e["cat"], e["name"])]
+            dur_ms = e["dur"] / 1000.0
+            row["count"] += 1
+            row["wall_ms"] += dur_ms
+            row["max_ms"] = max(row["max_ms"], dur_ms)
+            row["cpu_ms"] += e["args"]["cpu_ms"]
+            row["read_bytes"] += e["args"]["read_bytes"]
+            row["write_bytes"] += e["args"]["write_bytes"]
+        rows = [{"cat": cat, "name": name, **vals} for (cat, name), vals in agg.items()]
+        rows.sort(key=lambda r: r["wall_ms"], reverse=True)
+        return rows
+
+    def summary(self) -> str:
+        header = f"{'cat':<9}{'name':<28}{'count':>6}{'wall_ms':>12}{'max_ms':>11}{'cpu_ms':>11}" \
+                 f"{'read_MB':>10}{'write_MB':>10}"
+        lines = [header, "-" * len(header)]
+        for r in self.summary_rows():
+            lines.append(
+                f"{r['cat']:<9}{r['name'][:27]:<28}{r['count']:>6}{r['wall_ms']:>12.1f}{r['max_ms']:>11.1f}"
+                f"{r['cpu_ms']:>11.1f}{r['read_bytes'] / 1e6:>10.1f}{r['write_bytes'] / 1e6:>10.1f}")
+        lines.append(f"进程峰值 RSS（整个进程生命周期，非单个 span）: {_max_rss_kb() / 1024:.1f} MB")
+        return "\n".join(lines)
+
+    def export(self, path: str) -> str:
+        """写出 Chrome trace JSON，并在旁边写一份 .summary.json 汇总；返回汇总表文本"""
+        path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        base = path[:-5] if path.endswith(".json") else path
+        with open(base + ".summary.json", "w", encoding="utf-8") as f:
+            json.dump(self.summary_rows(), f, ensure_ascii=False, indent=2)
+        return self.summary()
+
+
+_tracer = NullTracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]):
+    global _tracer
+    _tracer = tracer if tracer is not None else NullTracer()
@@ -0,0 +1,57 @@
+# tests/test_batch.py
+import threading
+import time
+
+from video2note.config_manager.loader import dict_to_namespace
+from video2note.core.batch import BatchRunner
+from video2note.downloader.base import VideoDownloader
+
+
+class _FailingDownloader(VideoDownloader):
+    """第一个分P就绪后下载失败"""
+
+    def download(self, url: str, on_part=None):
+        on_part(0, "/videos/P001.mp4")
+        raise RuntimeError("network down")
+
+
+def _config(tmp_path):
+    return dict_to_namespace({
+        "video": {"provider": "bilibili", "download_path": str(tmp_path / "downloads")},
+        "transcriber": {"provider": "mock"},
+        "ai": {"provider": "rule"},
+        "output": {"markdown_path": str(tmp_path / "notes")},
+        "notion": {"provider": "notion"},
+        "pipeline": {"sync": False},
+        "storage": {"max_size_mb": 1},
+    })
+
+
+def test_download_failure_waits_for_submitted_parts(tmp_path):
+    runner = BatchRunner(_config(tmp_path))
+    runner.download_stage._downloader = _FailingDownloader(runner.config)
+    events = []
+    lock = threading.Lock()
+
+    def process_part(job, part):
+        time.sleep(0.2)
+        with lock:
+            events.append("part_done")
+
+    release = runner.storage.release
+
+    def record_release(key):
+        with lock:
+            events.append("release")
+        release(key)
+
+    runner._process_part = process_part
+    runner.storage.release = record_release
+    report = runner.run(["https://www.bilibili.com/video/BV1xx411c7mD/"])
+
+    assert events == ["part_done", "release"]
+    job = report.jobs[0]
+    assert str(job.error) == "network down"
+    assert [p.index for p in job.parts] == [0]
+    assert "download: network down" in report.summary()
+    assert "1 part(s) completed" in report.summary()
@@ -0,0 +1,53 @@
+# tests/test_chunking.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from video2note.transcriber import chunking
+
+
+class _FakePool(ThreadPoolExecutor):
+    """用线程代替 spawn 进程，记录创建次数（不加载模型）"""
+    created = []
+
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        super().__init__(max_workers=max_workers)
+        self.initargs = initargs
+        self.closed = False
+        _FakePool.created.append(self)
+
+    def shutdown(self, wait=True, **kwargs):
+        self.closed = True
+        super().shutdown(wait=wait)
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    _FakePool.created = []
+    monkeypatch.setattr(chunking, "ProcessPoolExecutor", _FakePool)
+    monkeypatch.setattr(chunking, "_transcribe_chunk", lambda offset, samples: [(offset, offset + 1, "x", None)])
+    monkeypatch.setattr(chunking, "_POOLS", {})
+    yield
+    chunking.shutdown_worker_pools()
+
+
+def test_pool_is_reused_across_parts(fake_pool):
+    chunks = [(0.0, None), (600.0, None)]
+    for _ in range(3):
+        segments = chunking.transcribe_chunks_parallel(chunks, "base", "cpu", workers=2, threads_per_worker=1)
+        assert [s.start for s in segments] == [0.0, 600.0]
+    # 块数不同的分P也共用同一个进程池
+    chunking.transcribe_chunks_parallel(chunks[:1], "base", "cpu", workers=2, threads_per_worker=1)
+    assert len(_FakePool.created) == 1
+    assert _FakePool.created[0].initargs == ("base", "cpu", 1, "zh")
+
+
+def test_pools_are_keyed_by_model_and_shut_down(fake_pool):
+    a = chunking.get_worker_pool("base", "cpu", 2, 1, "zh")
+    assert chunking.get_worker_pool("base", "cpu", 2, 1, "zh") is a
+    b = chunking.get_worker_pool("small", "cpu", 2, 1, "zh")
+    assert b is not a
+
+    chunking.shutdown_worker_pools()
+    assert a.closed and b.closed
+    assert chunking.get_worker_pool("base", "cpu", 2, 1, "zh") is not a
@@ -0,0 +1,52 @@
+# tests/test_cloud_chunking.py
+from video2note.transcriber.cloud_chunking import _strip_repeated_head, merge_chunk_transcripts, plan_chunks
+from video2note.types.transcript import Segment, Transcript
+
+
+def _text_only(text: str) -> Transcript:
+    return Transcript([Segment(0.0, 0.0, text)])
+
+
+def _spans(transcript):
+    return [(s.start, s.end, s.text) for s in transcript.segments]
+
+
+def test_plan_chunks():
+    assert plan_chunks(1203, 600, 5) == [(0.0, 600), (595.0, 600), (1190.0, 13.0)]
+    assert plan_chunks(300, 600, 5) == [(0.0, 300)]
+    assert plan_chunks(0, 600, 5) == []
+
+
+def test_timestamped_chunks_keep_each_segment_once():
+    first = Transcript([Segment(0, 10, "a"), Segment(590, 596, "b"), Segment(597, 599, "c"), Segment(598, 600, "d")])
+    second = Transcript([Segment(2, 4, "c"), Segment(3, 5, "d"), Segment(100, 110, "e")])
+
+    merged = merge_chunk_transcripts([(0.0, 600.0, first), (595.0, 600.0, second)], 5.0)
+    assert _spans(merged) == [(0, 10, "a"), (590, 596, "b"), (597, 599, "c"), (598.0, 600.0, "d"),
+                              (695.0, 705.0, "e")]
+
+
+def test_text_only_chunks_strip_repeated_head():
+    merged = merge_chunk_transcripts([(0.0, 600.0, _text_only("今天我们讲线性代数的基本概念")),
+                                      (595.0, 600.0, _text_only("线性代数的基本概念，首先是向量"))], 5.0)
+    assert _spans(merged) == [(0.0, 597.5, "今天我们讲线性代数的基本概念"), (597.5, 1195.0, "首先是向量")]
+
+
+def test_strip_repeated_head_ignores_short_matches():
+    assert _strip_repeated_head("我们今天讲", "今天天气") == "今天天气"
+
+
+def test_last_chunk_shorter_than_overlap():
+    merged = merge_chunk_transcripts([(0.0, 600.0, _text_only("第一部分的内容讲完了，下课")),
+                                      (595.0, 2.0, _text_only("讲完了，下课再见"))], 5.0)
+    assert _spans(merged) == [(0.0, 597.5, "第一部分的内容讲完了，下课"), (597.5, 597.5, "再见")]
+
+    timed = merge_chunk_transcripts([(0.0, 600.0, Transcript([Segment(596, 597, "x")])),
+                                     (595.0, 2.0, Transcript([Segment(1, 2, "x")]))], 5.0)
+    assert _spans(timed) == [(596, 597, "x")]
+
+
+def test_single_chunk():
+    timed = Transcript([Segment(0, 1, "a"), Segment(1, 2, "b")])
+    assert _spans(merge_chunk_transcripts([(0.0, 300.0, timed)], 5.0)) == [(0, 1, "a"), (1, 2, "b")]
+    assert _spans(merge_chunk_transcripts([(0.0, 300.0, _text_only("全文"))], 5.0)) == [(0.0, 300.0, "全文")]
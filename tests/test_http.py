@@ -0,0 +1,12 @@
+# tests/test_http.py
+from video2note.utils import http
+
+
+def test_session_retries_post_only_on_429(monkeypatch):
+    monkeypatch.setattr(http, "_session", None)
+    retry = http.get_session().get_adapter("https://example.com").max_retries
+
+    assert retry.is_retry("POST", 429)
+    for status in (500, 502, 503, 504):
+        assert not retry.is_retry("POST", status)
+    assert retry.read == 0
@@ -0,0 +1,115 @@
+# tests/test_keyframes.py
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from video2note.transcriber.base import extract_audio_and_frames
+from video2note.transcriber.keyframes import (KeyFrame, KeyframeExtractor, bits_to_int, dedup_frames, dhash_bits,
+                                              link_segments, segment_timestamps)
+from video2note.types.transcript import Segment, Transcript
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+# 9x8 缩略灰度图：每行从左到右变亮 / 变暗
+SLIDE_A = np.tile(100 + 10 * np.arange(9), (8, 1))
+SLIDE_B = np.tile(180 - 10 * np.arange(9), (8, 1))
+
+
+def _frames(*grays):
+    return np.stack([np.asarray(g, dtype=np.uint8) for g in grays])
+
+
+def test_dhash_bits():
+    bits = dhash_bits(_frames(SLIDE_A, SLIDE_B))
+    assert bits.shape == (2, 64)
+    assert bits_to_int(bits[0]) == 0
+    assert bits_to_int(bits[1]) == (1 << 64) - 1
+
+
+def test_dedup_drops_near_duplicates_and_returns_to_earlier_slide():
+    gray = _frames(SLIDE_A, SLIDE_A + 3, SLIDE_B, SLIDE_A + 1, SLIDE_B)
+    assert dedup_frames([0, 1, 2, 3, 4], gray) == [0, 2]
+
+
+def test_dedup_hash_distance_threshold():
+    # 第一行反过来：dHash 差 8 bit，平均亮度差不到 6
+    flipped = SLIDE_A.copy()
+    flipped[0] = flipped[0][::-1]
+    gray = _frames(SLIDE_A, flipped)
+    assert dedup_frames([0, 1], gray, hash_distance=6) == [0, 1]
+    assert dedup_frames([0, 1], gray, hash_distance=8) == [0]
+
+
+def test_dedup_uses_brightness_for_flat_frames():
+    # 纯黑与纯白的 dHash 相同，靠平均亮度区分
+    gray = _frames(np.zeros((8, 9)), np.full((8, 9), 255), np.full((8, 9), 5))
+    assert dedup_frames([0, 1, 2], gray) == [0, 1]
+
+
+def test_dedup_min_gap():
+    gray = _frames(SLIDE_A, SLIDE_B, np.zeros((8, 9)))
+    assert dedup_frames([0.0, 1.0, 5.0], gray, min_gap_seconds=2.0) == [0, 2]
+
+
+def test_link_segments():
+    transcript = Transcript([Segment(0, 10, "a"), Segment(10, 20, "b"), Segment(20, 30, "c")])
+    frames = [KeyFrame(f"f{t}.jpg", t) for t in (-1.0, 0.0, 15.0, 20.0, 99.0)]
+    assert [f.segment for f in link_segments(frames, transcript)] == [0, 0, 1, 2, 2]
+    assert link_segments([KeyFrame("f.jpg", 3.0)], Transcript())[0].segment is None
+
+
+def test_segment_timestamps():
+    transcript = Transcript([Segment(0, 10, "a"), Segment(10, 20, "b"), Segment(50, 60, "c"), Segment(62, 64, "d"),
+                             Segment(100, 99, "e")])
+    assert segment_timestamps(transcript, 30.0) == [5.0, 55.0, 100.0]
+    assert segment_timestamps(transcript, 30.0, position="start") == [0, 50, 100]
+    assert segment_timestamps(transcript, 0.0) == [5.0, 15.0, 55.0, 63.0, 100.0]
+
+
+def test_output_args_work_on_ffmpeg_4(tmp_path):
+    args = KeyframeExtractor().output_args(str(tmp_path))
+    assert "-fps_mode" not in args and args[args.index("-vsync") + 1] == "vfr"
+
+
+class _OldFfmpegExtractor(KeyframeExtractor):
+    """模拟旧版 ffmpeg：前 bad_calls 次生成的截帧参数不被识别"""
+
+    def __init__(self, bad_calls: int, **kwargs):
+        super().__init__(**kwargs)
+        self.bad_calls = bad_calls
+
+    def output_args(self, output_dir):
+        args = super().output_args(output_dir)
+        if self.bad_calls > 0:
+            self.bad_calls -= 1
+            return ["-no_such_option", "1", *args]
+        return args
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "lecture.mp4"
+    subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=d=3:s=160x120:r=10",
+                    "-f", "lavfi", "-i", "sine=d=3", "-shortest", str(path)], check=True)
+    return path
+
+
+@needs_ffmpeg
+def test_extract_audio_and_frames_falls_back_to_separate_passes(tmp_path, video):
+    extractor = _OldFfmpegExtractor(1, mode="interval", interval=1, hash_distance=-1)
+    audio, frames = extract_audio_and_frames(str(video), str(tmp_path / "audio"), str(tmp_path / "frames"), extractor)
+
+    assert (tmp_path / "audio" / "lecture.wav").is_file() and audio.endswith("lecture.wav")
+    assert [round(f.timestamp) for f in frames] == [0, 1, 2]
+
+
+@needs_ffmpeg
+def test_extract_audio_and_frames_keeps_audio_when_keyframes_fail(tmp_path, video):
+    extractor = _OldFfmpegExtractor(2, mode="interval", interval=1, hash_distance=-1)
+    audio, frames = extract_audio_and_frames(str(video), str(tmp_path / "audio"), str(tmp_path / "frames"), extractor)
+
+    assert (tmp_path / "audio" / "lecture.wav").is_file()
+    assert frames == []
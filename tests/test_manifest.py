@@ -0,0 +1,36 @@
+# tests/test_manifest.py
+from video2note.core.manifest import RunManifest
+from video2note.types.transcript import Segment, Transcript
+
+
+def _transcript(n: int, tag: str = "") -> Transcript:
+    return Transcript(Segment(i * 1.5, i * 1.5 + 1.0, f"{tag}第{i}段 segment {i}", 0.5) for i in range(n))
+
+
+def test_restore_then_update_keeps_mmapped_transcripts(tmp_path):
+    # 只跑摘要阶段：转写从 .trs mmap 恢复，随后 update_from_ctx 又把它写回同一路径
+    path = tmp_path / "BV1xx" / RunManifest.FILENAME
+    manifest = RunManifest(path, "https://www.bilibili.com/video/BV1xx/")
+    original = _transcript(2000)
+    manifest.update_from_ctx({"transcripts": [original], "transcript_sources": ["/videos/P001.mp4"]})
+
+    ctx = RunManifest(path).restore({}, ["transcripts"])
+    RunManifest(path).update_from_ctx(ctx)
+
+    reloaded = RunManifest(path).load_transcripts()[0]
+    assert len(reloaded) == 2000
+    assert reloaded.get_full_text() == original.get_full_text()
+    assert ctx["transcripts"][0].get_full_text() == original.get_full_text()
+
+
+def test_overwrite_while_mapped(tmp_path):
+    # 目标文件仍被映射时写入不同的内容：旧映射保持可读，新文件完整
+    target = tmp_path / "part.trs"
+    _transcript(500, "a").save(target)
+    mapped = Transcript.load(target)
+    replacement = _transcript(800, "b")
+    replacement.save(target)
+
+    assert mapped.get_full_text() == _transcript(500, "a").get_full_text()
+    assert Transcript.load(target).get_full_text() == replacement.get_full_text()
+    assert list(tmp_path.iterdir()) == [target]
@@ -0,0 +1,39 @@
+# tests/test_model_registry.py
+import threading
+import time
+
+from video2note.transcriber.model_registry import WhisperModelRegistry
+
+
+class _FakeModel:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.guard = threading.Lock()
+
+    def transcribe(self):
+        with self.guard:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.guard:
+            self.active -= 1
+
+
+def test_use_serializes_inference_on_shared_model():
+    loads = []
+    registry = WhisperModelRegistry(loader=lambda name, device: loads.append(name) or _FakeModel())
+
+    def worker():
+        with registry.use("base") as model:
+            model.transcribe()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    model = registry.get("base")
+    assert loads == ["base"]
+    assert model.peak == 1
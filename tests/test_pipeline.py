@@ -0,0 +1,46 @@
+# tests/test_pipeline.py
+import threading
+import time
+
+import pytest
+
+from video2note.config_manager.loader import dict_to_namespace
+from video2note.core.pipeline import TranscribeStage
+from video2note.transcriber.base import Transcriber
+from video2note.types.transcript import Segment, Transcript
+
+
+class _SlowTranscriber(Transcriber):
+    supports_concurrency = True
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.done = []
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio_path: str) -> Transcript:
+        if audio_path == "bad.wav":
+            raise RuntimeError("upload failed")
+        time.sleep(0.1)
+        with self.lock:
+            self.done.append(audio_path)
+        return Transcript([Segment(0.0, 1.0, audio_path)])
+
+
+def test_transcribe_files_raises_after_siblings_finish():
+    config = dict_to_namespace({"transcriber": {"provider": "mock", "concurrency": 4}})
+    transcriber = _SlowTranscriber(config)
+    stage = TranscribeStage(config, transcriber=transcriber)
+
+    with pytest.raises(RuntimeError, match="upload failed"):
+        stage.transcribe_files(["a.wav", "bad.wav", None, "b.wav"])
+    assert sorted(transcriber.done) == ["a.wav", "b.wav"]
+
+
+def test_transcribe_files_keeps_part_indices():
+    config = dict_to_namespace({"transcriber": {"provider": "mock", "concurrency": 2}})
+    stage = TranscribeStage(config, transcriber=_SlowTranscriber(config))
+
+    results = stage.transcribe_files(["a.wav", None, "b.wav"])
+    assert sorted(results) == [0, 2]
+    assert results[2].segments[0].text == "b.wav"
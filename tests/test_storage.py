@@ -0,0 +1,40 @@
+# tests/test_storage.py
+from video2note.config_manager.loader import dict_to_namespace
+from video2note.core.pipeline import TranscribeStage
+from video2note.core.storage import StorageManager
+
+
+def _config(tmp_path, url=""):
+    return dict_to_namespace({
+        "video": {"url": url, "download_path": str(tmp_path / "downloads")},
+        "transcriber": {"provider": "mock"},
+    })
+
+
+def test_audio_tmp_root_is_per_video(tmp_path):
+    stage = TranscribeStage(_config(tmp_path, "https://www.bilibili.com/video/BV1xx411c7mD/"))
+    root = tmp_path / "downloads" / "tmp_audios"
+
+    assert stage.audio_tmp_root() == (root / "BV1xx411c7mD").resolve()
+    assert stage.audio_tmp_root("BV1yy411c7mE") == (root / "BV1yy411c7mE").resolve()
+    assert TranscribeStage(_config(tmp_path)).audio_tmp_root() == root.resolve()
+
+
+def test_same_stem_intermediates_of_pinned_video_survive_eviction(tmp_path):
+    stage = TranscribeStage(_config(tmp_path))
+    storage = StorageManager(tmp_path / "downloads", max_bytes=1500)
+    paths = {}
+    for key in ("BV1xx411c7mD", "BV1yy411c7mE"):
+        wav = stage.audio_tmp_root(key) / "P001.wav"
+        wav.write_bytes(b"\0" * 1000)
+        paths[key] = wav
+        storage.track(key, [str(wav)], "intermediate")
+
+    storage.pin("BV1yy411c7mE")
+    try:
+        storage.enforce()
+    finally:
+        storage.unpin("BV1yy411c7mE")
+
+    assert not paths["BV1xx411c7mD"].exists()
+    assert paths["BV1yy411c7mE"].exists()
@@ -0,0 +1,69 @@
+# tests/test_subtitles.py
+import json
+
+from video2note.transcriber.subtitles import (find_subtitles, load_subtitles, parse_ass, parse_bilibili_json,
+                                              parse_srt)
+
+ASS = """[Script Info]
+Title: lecture
+ScriptType: v4.00+
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, \
+Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, \
+MarginV, Encoding
+Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,2,10,10,10,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.50,0:00:03.00,Default,,0,0,0,,{\\b1}Hello{\\b0}\\Nworld
+Dialogue: 0,0:01:02.25,0:01:04.00,Default,,0,0,0,,first, second, third
+"""
+
+
+def _spans(segments):
+    return [(s.start, s.end, s.text) for s in segments]
+
+
+def test_parse_srt():
+    text = "1\r\n00:00:01,000 --> 00:00:02,500\r\nHello\r\nworld\r\n\r\n" \
+           "2\n00:01:00.5 --> 00:01:02.25\nsecond\n\n3\n00:01:03,000 --> 00:01:04,000\n\n"
+    assert _spans(parse_srt(text)) == [(1.0, 2.5, "Hello world"), (60.5, 62.25, "second")]
+
+
+def test_parse_bilibili_json():
+    body = {"body": [{"from": 0.5, "to": 1.5, "content": " 你好 "}, {"from": 2, "to": 3, "content": ""}]}
+    assert _spans(parse_bilibili_json(json.dumps(body))) == [(0.5, 1.5, "你好")]
+    assert _spans(parse_bilibili_json(json.dumps([{"start": 1, "end": 2, "text": "hi"}]))) == [(1.0, 2.0, "hi")]
+
+
+def test_parse_ass_uses_events_format_after_styles():
+    assert _spans(parse_ass(ASS)) == [(1.5, 3.0, "Hello world"), (62.25, 64.0, "first, second, third")]
+
+
+def test_parse_ass_without_format_line():
+    text = "[Events]\nDialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,a, b\n"
+    assert _spans(parse_ass(text)) == [(1.0, 2.0, "a, b")]
+
+
+def test_find_subtitles_ranking(tmp_path):
+    media = tmp_path / "lecture.mp4"
+    media.write_bytes(b"")
+    extra = tmp_path / "extra"
+    extra.mkdir()
+    for p in (tmp_path / "lecture.zh.ass", tmp_path / "lecture.srt", tmp_path / "other.srt",
+              extra / "P1.ai-zh.srt", extra / "P1.zh-CN.srt", extra / "P1.zh-CN.json", tmp_path / "notes.txt"):
+        p.write_text("", encoding="utf-8")
+
+    assert [p.relative_to(tmp_path).as_posix() for p in find_subtitles(media)] == [
+        "lecture.srt", "lecture.zh.ass", "extra/P1.zh-CN.srt", "extra/P1.zh-CN.json", "extra/P1.ai-zh.srt"]
+
+
+def test_load_subtitles_skips_empty_and_reads_ass(tmp_path):
+    media = tmp_path / "lecture.mp4"
+    media.write_bytes(b"")
+    (tmp_path / "lecture.srt").write_text("", encoding="utf-8")
+    (tmp_path / "lecture.ass").write_text(ASS, encoding="utf-8")
+
+    transcript = load_subtitles(media)
+    assert [s.text for s in transcript.segments] == ["Hello world", "first, second, third"]
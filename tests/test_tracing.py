@@ -0,0 +1,31 @@
+# tests/test_tracing.py
+import tracemalloc
+
+from video2note.utils import tracing
+from video2note.utils.tracing import Tracer
+
+
+def test_span_memory_without_reset_peak(monkeypatch):
+    """Python 3.8 的 tracemalloc 没有 reset_peak：记录净增量而不是报错"""
+    monkeypatch.setattr(tracing, "_HAS_RESET_PEAK", False)
+    monkeypatch.delattr(tracemalloc, "reset_peak", raising=False)
+    tracer = Tracer(trace_memory=True)
+    try:
+        with tracer.span("alloc"):
+            data = [bytearray(1024) for _ in range(256)]
+        args = tracer.to_chrome_trace()["traceEvents"][-1]["args"]
+        assert "py_peak_kb" not in args
+        assert args["py_net_kb"] >= 200
+        del data
+    finally:
+        tracemalloc.stop()
+
+
+def test_summary_reports_rss_at_process_level():
+    tracer = Tracer()
+    with tracer.span("stage"):
+        pass
+    rows = tracer.summary_rows()
+    assert "max_rss_kb" not in rows[0]
+    assert "process_max_rss_kb" in tracer.to_chrome_trace()["traceEvents"][-1]["args"]
+    assert tracer.summary().splitlines()[-1].startswith("进程峰值 RSS")
@@ -0,0 +1,57 @@
+# tests/test_transcript.py
+import pickle
+
+import pytest
+
+from video2note.types.transcript import Segment, Transcript
+
+
+def _segments(n: int):
+    return [Segment(float(i), i + 0.5, f"段{i} seg{i}", None if i % 2 else 0.9) for i in range(n)]
+
+
+def test_append_extend_like_a_list():
+    t = Transcript()
+    for seg in _segments(3):
+        t.segments.append(seg)
+    t.segments.extend(_segments(5)[3:])
+    t.append(Segment(5.0, 5.5, "末尾"))
+
+    assert len(t) == 6
+    assert [s.text for s in t.segments] == [s.text for s in _segments(5)] + ["末尾"]
+    assert t.get_full_text() == " ".join(s.text for s in t.segments)
+    assert t.segments[1].confidence is None and t.segments[0].confidence == 0.9
+
+
+def test_setitem_replaces_segment():
+    t = Transcript(_segments(4))
+    t.segments[2] = Segment(2.0, 2.5, "替换")
+    t.segments[-1] = Segment(3.0, 3.5, "最后")
+    assert [s.text for s in t.segments] == ["段0 seg0", "段1 seg1", "替换", "最后"]
+    with pytest.raises(IndexError):
+        t.segments[10] = Segment(0, 1, "x")
+
+
+def test_mutation_does_not_touch_views_or_mapped_file(tmp_path):
+    path = tmp_path / "t.trs"
+    Transcript(_segments(10)).save(path)
+    loaded = Transcript.load(path)
+    view = loaded.slice(2.0, 4.0)
+    before = view.get_full_text()
+
+    loaded.append(Segment(10.0, 10.5, "新增"))
+    assert view.get_full_text() == before
+    assert len(Transcript.load(path)) == 10
+
+    # 修改后保存到原路径必须真正写出（不会因“未修改”而跳过）
+    loaded.save(path)
+    again = Transcript.load(path)
+    assert len(again) == 11 and again.segments[-1].text == "新增"
+
+
+def test_builders_round_trip():
+    # 各 transcriber / 字幕解析 / 分块合并都通过 Transcript(segments) 构造
+    t = Transcript(_segments(20))
+    assert pickle.loads(pickle.dumps(t)).get_full_text() == t.get_full_text()
+    assert Transcript.from_dict(t.to_dict()).get_full_text() == t.get_full_text()
+    assert [s.start for s in t[5:8].segments] == [5.0, 6.0, 7.0]
@@ -0,0 +1,94 @@
+# tests/test_vad.py
+import numpy as np
+import pytest
+
+from video2note.transcriber.vad import TimeMap, VoiceActivityDetector
+from video2note.types.transcript import Segment, Transcript
+
+SR = 16000
+SPANS = [(10.0, 20.0), (30.0, 35.0), (50.0, 60.0)]  # 裁剪后分别从 0 / 10 / 15 秒开始
+
+
+def _to_trimmed(t: float) -> float:
+    """原时间轴 → 裁剪后时间轴（t 须落在某个保留区间内）"""
+    pos = 0.0
+    for start, end in SPANS:
+        if start <= t <= end:
+            return pos + t - start
+        pos += end - start
+    raise ValueError(t)
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(SR * seconds)) / SR
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(SR * seconds), dtype=np.float32)
+
+
+def test_splice_point_start_goes_to_next_span_end_to_previous():
+    tm = TimeMap(SPANS)
+    assert tm.to_original(10.0) == 30.0
+    assert tm.to_original(10.0, is_end=True) == 20.0
+    assert tm.to_original(15.0) == 50.0
+    assert tm.to_original(15.0, is_end=True) == 35.0
+
+
+def test_times_outside_kept_audio_are_clamped():
+    tm = TimeMap(SPANS)
+    assert tm.to_original(-1.0) == 10.0
+    assert tm.to_original(0.0) == 10.0
+    assert tm.to_original(0.0, is_end=True) == 10.0
+    assert tm.to_original(25.0) == 60.0
+    assert tm.to_original(99.0, is_end=True) == 60.0
+    assert tm.kept_seconds == 25.0
+
+
+def test_empty_time_map_is_identity():
+    tm = TimeMap([])
+    assert tm.to_original(3.5) == 3.5
+    assert tm.kept_seconds == 0.0
+
+
+def test_remap_round_trip():
+    original = [Segment(11.0, 19.5, "a", 0.9), Segment(30.0, 35.0, "b"), Segment(52.25, 60.0, "c")]
+    trimmed = Transcript(Segment(_to_trimmed(s.start), _to_trimmed(s.end), s.text, s.confidence) for s in original)
+
+    remapped = TimeMap(SPANS).remap(trimmed)
+    assert [(s.start, s.end, s.text, s.confidence) for s in remapped.segments] == \
+           [(s.start, s.end, s.text, s.confidence) for s in original]
+
+
+def test_remap_segment_across_splice_keeps_end_after_start():
+    remapped = TimeMap(SPANS).remap(Transcript([Segment(8.0, 12.0, "x")]))
+    seg = remapped.segments[0]
+    assert (seg.start, seg.end) == (18.0, 32.0)
+
+
+def test_detect_and_trim_drop_long_silence():
+    vad = VoiceActivityDetector(enabled=True, frame_ms=25)
+    samples = np.concatenate([_silence(1), _tone(1), _silence(2), _tone(1), _silence(1)])
+
+    assert vad.detect(samples, SR) == [(12800, 35200), (60800, 83200)]
+    trimmed, tm = vad.trim(samples, SR)
+    assert len(trimmed) == 2 * 22400
+    assert tm.to_original(0.0) == pytest.approx(0.8)
+    assert tm.to_original(1.4) == pytest.approx(3.8)
+    assert tm.to_original(1.4, is_end=True) == pytest.approx(2.2)
+
+
+def test_short_silence_is_kept():
+    vad = VoiceActivityDetector(enabled=True, frame_ms=25)
+    samples = np.concatenate([_tone(1), _silence(0.5), _tone(1)])
+    assert vad.detect(samples, SR) == [(0, len(samples))]
+    trimmed, tm = vad.trim(samples, SR)
+    assert tm is None and trimmed is samples
+
+
+def test_all_silence():
+    vad = VoiceActivityDetector(enabled=True, frame_ms=25)
+    trimmed, tm = vad.trim(_silence(3), SR)
+    assert len(trimmed) == 0
+    assert tm.kept_seconds == 0.0